@@ -0,0 +1,162 @@
+import os
+import threading
+import pygame
+import game_log
+from settings import *
+
+# Background image for each theme (in Assets/)
+BACKGROUND_FILES = {
+    'crystal': 'Back round Crystal.png',
+    'forest': 'Background forest gardioun.png',
+    'metal': 'Background Cyber runner.png',
+    'stone': 'Background anchiant explorer.png'
+}
+
+# Extra parallax layers drawn over a theme's background, back to front: (file in Assets/,
+# how fast it scrolls with the camera; 1 moves with the level, 0 stays still). The
+# background itself scrolls at 1 and the theme's bg_color, shown where nothing covers
+# it, stays still. Neighbouring layers with the same speed are composited into one tile.
+PARALLAX_LAYERS = {
+    # 'forest': [('Forest canopy.png', 1.5)],
+}
+
+class BackgroundCache:
+    """Theme backgrounds scaled to the screen, decoded the first time a theme is drawn
+
+    prefetch() decodes themes on a background thread ahead of time. A theme asked
+    for while the thread is still on it waits for it; one the thread hasn't got to
+    yet is decoded right away instead, so nothing waits behind other themes.
+    Converting to the display format always happens on the main thread.
+    renderer() gives the ParallaxBackground every screen draws a theme with.
+    """
+    def __init__(self, size=(SCREEN_WIDTH, SCREEN_HEIGHT)):
+        self.size = size
+        self.images = {}      # theme -> display-format Surface (None if it couldn't be loaded)
+        self.decoded = {}     # theme -> scaled Surface from the prefetch thread, not converted yet
+        self.pending = []     # Themes the prefetch thread has still to decode
+        self.decoding = None  # Theme the prefetch thread is decoding
+        self.renderers = {}   # theme -> ParallaxBackground
+        self.ready = threading.Condition()
+        self.worker = None
+
+    def decode(self, theme):
+        """Load and scale a theme's background (safe off the main thread); None if it can't be loaded"""
+        filename = BACKGROUND_FILES.get(theme)
+        if filename is None:
+            return None
+        try:
+            image = pygame.image.load(os.path.join("Assets", filename))
+            return pygame.transform.scale(image, self.size)
+        except Exception as e:
+            game_log.warning("assets", f"Warning: Could not load background for {theme}: {e}")
+            return None
+
+    def prefetch(self, themes=None):
+        """Decode themes (default: all of them, in order) on the background thread"""
+        with self.ready:
+            for theme in themes or BACKGROUND_FILES:
+                if theme not in self.images and theme not in self.decoded and theme not in self.pending:
+                    self.pending.append(theme)
+            if self.pending and (self.worker is None or not self.worker.is_alive()):
+                self.worker = threading.Thread(target=self.prefetch_worker, name="background-prefetch", daemon=True)
+                self.worker.start()
+
+    def prefetch_worker(self):
+        while True:
+            with self.ready:
+                if not self.pending:
+                    return
+                theme = self.decoding = self.pending.pop(0)
+            image = self.decode(theme)
+            with self.ready:
+                self.decoded[theme] = image
+                self.decoding = None
+                self.ready.notify_all()
+
+    def get(self, theme):
+        """A theme's background in the display format (None if it has none)"""
+        image = self.images.get(theme, False)
+        if image is not False:
+            return image
+
+        with self.ready:
+            while self.decoding == theme:
+                self.ready.wait()
+            found = theme in self.decoded
+            image = self.decoded.pop(theme, None)
+            if theme in self.pending:
+                self.pending.remove(theme)
+        if not found:
+            image = self.decode(theme)
+
+        if image is not None:
+            image = image.convert()
+        self.images[theme] = image
+        return image
+
+    def renderer(self, theme):
+        """The ParallaxBackground for a theme (built the first time it is drawn)"""
+        renderer = self.renderers.get(theme)
+        if renderer is None:
+            renderer = self.renderers[theme] = ParallaxBackground(theme, self.get(theme))
+        return renderer
+
+class ParallaxBackground:
+    """A theme's background layers, composited ahead of time into one screen-sized tile per scroll speed
+
+    Each tile repeats across the level, but only the copies that overlap the
+    screen are drawn: at most four per tile, and usually just the one background.
+    """
+    def __init__(self, theme_key, background):
+        self.bg_color = THEMES[theme_key]['bg_color']
+        self.tiles = []  # [(scroll speed, display-format Surface)], back to front
+
+        layers = [(background, 1)] if background is not None else []
+        for filename, speed in PARALLAX_LAYERS.get(theme_key, []):
+            image = load_layer(filename)
+            if image is not None:
+                layers.append((image, speed))
+
+        for image, speed in layers:
+            if self.tiles and self.tiles[-1][0] == speed:
+                tile = self.tiles[-1][1].copy()  # Not the cached background itself
+                tile.blit(image, (0, 0))
+                self.tiles[-1] = (speed, tile)
+            else:
+                self.tiles.append((speed, image))
+
+        # An opaque bottom tile covers the whole screen, so the fill would never be seen
+        self.fill = not self.tiles or bool(self.tiles[0][1].get_flags() & pygame.SRCALPHA)
+
+    def visible_tiles(self, camera_x, camera_y):
+        """(tile, screen position) for every tile copy overlapping the screen"""
+        blits = []
+        for speed, tile in self.tiles:
+            # Same truncation as the old 3x3 loop, so the background doesn't move
+            start_x = int(-((camera_x * speed) % SCREEN_WIDTH))
+            start_y = int(-((camera_y * speed) % SCREEN_HEIGHT))
+            for x in range(start_x, SCREEN_WIDTH, SCREEN_WIDTH):
+                for y in range(start_y, SCREEN_HEIGHT, SCREEN_HEIGHT):
+                    blits.append((tile, (x, y)))
+        return blits
+
+    def draw(self, screen, camera=None):
+        """Cover the screen with the background, scrolled for the camera (still when None)"""
+        if self.fill:
+            screen.fill(self.bg_color)
+        if camera is None:
+            screen.blits(self.visible_tiles(0, 0), doreturn=False)
+        else:
+            screen.blits(self.visible_tiles(camera.x, camera.y), doreturn=False)
+
+def load_layer(filename):
+    """A parallax layer scaled to the screen, keeping its transparency; None if it can't be loaded"""
+    try:
+        image = pygame.image.load(os.path.join("Assets", filename))
+        return pygame.transform.scale(image, (SCREEN_WIDTH, SCREEN_HEIGHT)).convert_alpha()
+    except Exception as e:
+        game_log.warning("assets", f"Warning: Could not load parallax layer {filename}: {e}")
+        return None
+
+# Shared by every screen, so each background is decoded once
+backgrounds = BackgroundCache()
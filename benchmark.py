@@ -0,0 +1,511 @@
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import platform
+import tempfile
+import contextlib
+import statistics
+
+# Benchmarks always run headless
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+# Assets and learning data are loaded relative to the project directory
+PROJECT_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, PROJECT_DIR)
+
+import pygame
+import game_log
+from settings import *
+
+SEED = 1234
+DEFAULT_RESULTS = "bench_results.json"
+DEFAULT_BASELINE = "bench_baseline.json"
+CHARACTER_CONFIG = {'theme': 'crystal', 'pattern': 'stripes', 'accessory': 'cape',
+                    'start_tutorial': False, 'start_demo': False}
+
+# name -> setup function returning (callable, calls per timing run)
+BENCHMARKS = {}
+
+def benchmark(name):
+    """Register a benchmark setup function"""
+    def register(setup):
+        BENCHMARKS[name] = setup
+        return setup
+    return register
+
+@contextlib.contextmanager
+def quiet():
+    """Silence the game's print and log output while benchmarking"""
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull), game_log.quiet():
+        yield
+
+_game = None
+
+def get_game():
+    """Shared headless Game with an initialized world"""
+    global _game
+    if _game is None:
+        from main import Game
+        _game = Game()
+        _game.character_config = dict(CHARACTER_CONFIG)
+        _game.init_game_world()
+        _game.state = GAME_STATE_PLAYING
+    return _game
+
+def make_player(config=None):
+    """Create a Player at the usual start position"""
+    from player import Player
+    return Player(200, WORLD_HEIGHT - 300, config or CHARACTER_CONFIG)
+
+def make_platforms(count, seed=SEED):
+    """Create count randomly placed basic platform bodies"""
+    # Bodies have no image, which keeps setup quick; building 2048 real Platforms would dominate the run
+    from simulation import PlatformBody, PlatformBodies
+    rng = random.Random(seed)
+    group = PlatformBodies()
+    for _ in range(count):
+        group.add(PlatformBody(rng.randrange(0, WORLD_WIDTH - 200), rng.randrange(0, WORLD_HEIGHT - 100),
+                               rng.randrange(80, 300), 25))
+    return group
+
+def make_learning_data(entries, seed=SEED):
+    """Synthetic learning tables in the JSON save format with about `entries` (state, action) keys"""
+    rng = random.Random(seed)
+    actions = ["move_right", "move_left", "jump_right", "jump_left", "jump_only", "wait"]
+    success, failure, attempts, progress, visits = {}, {}, {}, {}, {}
+    for _ in range(entries):
+        state = (f"{rng.randrange(25)}_{rng.randrange(16)}_{rng.choice(['on_ground', 'in_air'])}_"
+                 f"{rng.choice(['still', 'moving_right', 'moving_left'])}_"
+                 f"{rng.choice(['falling', 'rising', 'stable'])}_{rng.randrange(11)}")
+        key = f"{state}|{rng.choice(actions)}"
+        tries = rng.randrange(1, 40)
+        wins = rng.randrange(0, tries + 1)
+        attempts[key] = tries
+        success[key] = wins
+        failure[key] = tries - wins
+        progress[key] = rng.random() * 100
+        visits[state] = visits.get(state, 0) + tries
+    return {
+        "success_memory": success, "failure_memory": failure, "action_attempts": attempts,
+        "state_visit_count": visits, "average_progress": progress,
+        "positive_reinforcement": {a: rng.random() * 10 for a in actions},
+        "negative_reinforcement": {a: rng.random() * 10 for a in actions},
+        "personal_best_distance": 900, "pb_route": [], "total_deaths": 0, "victories": 0,
+        "recent_progress_feeling": 0.0, "inefficient_action_streak": 0
+    }
+
+def make_ai(learning_data):
+    """Create a LearningAI on the staircase level that never touches the save file"""
+    from demo import LearningAI
+    game = get_game()
+    player = make_player()
+    ai = LearningAI(player, game.platforms, game.powerups, game.victory_zone, learning_data)
+    ai.persist_to_disk = False
+    return ai
+
+@benchmark("level.create_large_level")
+def bench_create_large_level():
+    from enemy_manager import EnemyManager
+    from platforms import PlatformGroup
+    game = get_game()
+    def run():
+        game.all_sprites = pygame.sprite.Group()
+        game.platforms = PlatformGroup()
+        game.powerups = pygame.sprite.Group()
+        game.enemies = EnemyManager()
+        game.create_large_level()
+    return run, 5
+
+@benchmark("level.create_tutorial_world")
+def bench_create_tutorial_world():
+    from tutorial import TutorialLevel
+    from enemy_manager import EnemyManager
+    from platforms import PlatformGroup
+    level = TutorialLevel(get_game().screen, CHARACTER_CONFIG)
+    def run():
+        level.all_sprites = pygame.sprite.Group()
+        level.platforms = PlatformGroup()
+        level.powerups = pygame.sprite.Group()
+        level.enemies = EnemyManager()
+        level.create_tutorial_world()
+    return run, 3
+
+@benchmark("level.generate.10000")
+def bench_generate_level():
+    from level_generator import generate_level
+    return (lambda: generate_level(SEED, 10000)), 1
+
+@benchmark("level.validate.10000")
+def bench_validate_level():
+    from level_generator import generate_level, validate_level
+    level = generate_level(SEED, 10000)
+    return (lambda: validate_level(level)), 1
+
+@benchmark("level.load_compiled.10000")
+def bench_load_compiled_level():
+    from level_generator import generate_level
+    from level_format import Level, compile_level
+    data = compile_level(generate_level(SEED, 10000))
+    # Parsing the header and chunk table; platforms are decoded later, per chunk
+    return (lambda: Level(data)), 5
+
+@benchmark("level.graph.staircase")
+def bench_build_platform_graph():
+    from level_format import load_level
+    from platform_graph import GraphBuilder
+    level = load_level("staircase")
+    # A fresh builder each run so nothing is reused from the jump caches
+    return (lambda: GraphBuilder(level).build()), 1
+
+@benchmark("level.build_bodies.staircase")
+def bench_build_level_bodies():
+    from level_format import load_level, build_level_bodies
+    level = load_level("staircase")
+    return (lambda: build_level_bodies(level)), 200
+
+def _ground_benchmark(theme_key):
+    def setup():
+        from platforms import Ground
+        ground = Ground(0, WORLD_HEIGHT - GROUND_HEIGHT, WORLD_WIDTH, THEMES[theme_key])
+        return (lambda: ground.update(1 / FPS)), 10
+    return setup
+
+for _theme_key in THEMES:
+    benchmark(f"ground.update.{_theme_key}")(_ground_benchmark(_theme_key))
+
+@benchmark("platforms.update.1000")
+def bench_platforms_update():
+    from platforms import PlatformGroup, Platform, MovingPlatform, DisappearingPlatform, BouncyPlatform
+    rng = random.Random(SEED)
+    platforms = PlatformGroup()
+    # Mostly platforms that sit still until stepped on, as in a big level
+    for i in range(1000):
+        x, y = rng.randrange(0, WORLD_WIDTH - 300), rng.randrange(0, WORLD_HEIGHT - 100)
+        kind = i % 10
+        if kind == 0:
+            platforms.add(MovingPlatform(x, y, 120, 20, x + 200))
+        elif kind < 4:
+            platforms.add(DisappearingPlatform(x, y, 120, 20))
+        elif kind < 7:
+            platforms.add(BouncyPlatform(x, y, 120, 20))
+        else:
+            platforms.add(Platform(x, y, 120, 20))
+    def run():
+        platforms.timers.advance(1 / FPS)
+        platforms.update(1 / FPS)
+    return run, 200
+
+def _player_update_benchmark(platform_count):
+    def setup():
+        platforms = make_platforms(platform_count)
+        player = make_player()
+        player.controls.set_action("jump_right")
+        def run():
+            # Reset so every call simulates the same airborne step
+            player.rect.topleft = (200, WORLD_HEIGHT - 300)
+            player.vel_x, player.vel_y = PLAYER_SPEED, 0
+            player.apply_controls()
+            player.update(platforms)
+        return run, 200
+    return setup
+
+for _count in (16, 256, 2048):
+    benchmark(f"player.update.{_count}_platforms")(_player_update_benchmark(_count))
+
+def make_enemies(count, seed=SEED):
+    """An EnemyManager with count enemies of every type spread over the world"""
+    from enemies import Walker, Jumper, Flyer, Guard
+    from enemy_manager import EnemyManager
+    rng = random.Random(seed)
+    enemies = EnemyManager()
+    for i in range(count):
+        x, y = rng.randrange(100, WORLD_WIDTH - 300), rng.randrange(100, WORLD_HEIGHT - 200)
+        kind = i % 4
+        if kind == 0:
+            enemies.add(Walker(x, y, x - 100, x + 100))
+        elif kind == 1:
+            enemies.add(Jumper(x, y))
+        elif kind == 2:
+            enemies.add(Flyer(x, y))
+        else:
+            enemies.add(Guard(x, y))
+    return enemies
+
+def _enemy_update_benchmark(enemy_count):
+    def setup():
+        from simulation import PlatformBody
+        platforms = make_platforms(256)
+        platforms.add(PlatformBody(0, WORLD_HEIGHT - 50, WORLD_WIDTH, 50))  # Floor
+        enemies = make_enemies(enemy_count)
+        player = make_player()
+        # Let the jumpers land first, as they would have a few seconds into a level
+        for _ in range(3 * FPS):
+            enemies.timers.advance(1 / FPS)
+            enemies.update(1 / FPS, platforms, player.rect)
+        def run():
+            enemies.timers.advance(1 / FPS)
+            enemies.update(1 / FPS, platforms, player.rect)
+            enemies.touching(player.rect)
+        return run, 20
+    return setup
+
+for _count in (1000, 5000):
+    benchmark(f"enemies.update.{_count}")(_enemy_update_benchmark(_count))
+
+def _projectile_update_benchmark(projectile_count):
+    def setup():
+        import math
+        from enemy_manager import PlatformGrid
+        from entity_pool import ProjectilePool, PROJECTILE_SPEED
+        rng = random.Random(SEED)
+        grid = PlatformGrid()
+        grid.refresh(make_platforms(256))
+        player = make_player()
+        pool = ProjectilePool()
+        # Shots come from a fixed list of launches, so the same ones are fired every run
+        launches = []
+        for _ in range(projectile_count):
+            angle = rng.uniform(0, 2 * math.pi)
+            launches.append((rng.randrange(0, WORLD_WIDTH), rng.randrange(0, WORLD_HEIGHT),
+                             math.cos(angle) * PROJECTILE_SPEED, math.sin(angle) * PROJECTILE_SPEED,
+                             "bolt", rng.uniform(0.5, 3.0)))
+        def run():
+            # Refill what expired, keeping projectile_count in flight
+            for launch in launches[pool.count:]:
+                pool.fire(*launch)
+            pool.update(1 / FPS, grid, player.rect)
+        return run, 50
+    return setup
+
+for _count in (2000,):
+    benchmark(f"projectiles.update.{_count}")(_projectile_update_benchmark(_count))
+
+@benchmark("world.stream.steady")
+def bench_stream_steady():
+    from world_streaming import ChunkStreamer
+    from level_generator import generate_level
+    from level_format import level_from_dict
+    from main import Camera
+    level = level_from_dict(generate_level(SEED, 2000))
+    platforms, all_sprites = pygame.sprite.Group(), pygame.sprite.Group()
+    streamer = ChunkStreamer(level, THEMES['crystal'], platforms, all_sprites, threaded=False)
+    player_rect = pygame.Rect(level.spawn[0], level.spawn[1], PLAYER_WIDTH, PLAYER_HEIGHT)
+    camera = Camera(level.world_width, level.world_height)
+    camera.x, camera.y = player_rect.x - SCREEN_WIDTH // 2, player_rect.y - SCREEN_HEIGHT // 2
+    streamer.update(camera, player_rect)
+    # Per-frame cost once everything around the camera is loaded
+    return (lambda: streamer.update(camera, player_rect)), 200
+
+@benchmark("player.create_character_sprite")
+def bench_create_character_sprite():
+    player = make_player()
+    return player.create_character_sprite, 3
+
+@benchmark("player.clone")
+def bench_player_clone():
+    player = make_player()
+    player.add_powerup("jump_boost", 5.0)
+    return player.clone, 1000
+
+@benchmark("ai.make_smart_decision")
+def bench_make_smart_decision():
+    ai = make_ai(make_learning_data(2000))
+    def run():
+        random.seed(SEED)
+        ai.make_smart_decision()
+    return run, 200
+
+@benchmark("ai.ghosts.update.100")
+def bench_ghosts_update():
+    from demo import GhostAgents
+    game = get_game()
+    ai = make_ai(make_learning_data(2000))
+    random.seed(SEED)
+    ghosts = GhostAgents(ai, 100, (200, WORLD_HEIGHT - 200), CHARACTER_CONFIG, WORLD_WIDTH)
+    def run():
+        ghosts.update(1 / FPS, game.victory_zone, game.ground_y)
+    return run, 20
+
+@benchmark("demo.snapshot_restore")
+def bench_demo_snapshot_restore():
+    from demo import DemoLevel
+    game = get_game()
+    demo = DemoLevel(game.screen, dict(CHARACTER_CONFIG), game, learning_data={})
+    demo.ai.persist_to_disk = False
+    for _ in range(FPS):
+        demo.update(1 / FPS)
+    def run():
+        demo.restore(demo.snapshot())
+    return run, 200
+
+def _learning_io_benchmark(entries, operation):
+    def setup():
+        ai = make_ai(make_learning_data(entries))
+        ai.persist_to_disk = True
+        workdir = tempfile.mkdtemp(prefix="platformer-bench-")
+        
+        def in_workdir(action):
+            # save/load use a path relative to the working directory
+            cwd = os.getcwd()
+            os.chdir(workdir)
+            try:
+                action()
+            finally:
+                os.chdir(cwd)
+        
+        # load needs a file to read
+        in_workdir(ai.save_learning_data)
+        action = ai.save_learning_data if operation == "save" else ai.load_learning_data
+        return (lambda: in_workdir(action)), 3
+    return setup
+
+for _entries in (100, 1000, 10000):
+    benchmark(f"ai.save_learning_data.{_entries}")(_learning_io_benchmark(_entries, "save"))
+    benchmark(f"ai.load_learning_data.{_entries}")(_learning_io_benchmark(_entries, "load"))
+
+@benchmark("game.draw")
+def bench_game_draw():
+    game = get_game()
+    game.camera.update(game.player.rect)
+    return game.draw, 20
+
+def _draw_sprites_benchmark(count):
+    def setup():
+        from main import Camera
+        from render_queue import RenderQueue
+        rng = random.Random(SEED)
+        screen = get_game().screen
+        sprites = pygame.sprite.Group()
+        surface = pygame.Surface((120, 20)).convert()  # Platform-sized
+        for _ in range(count):
+            sprite = pygame.sprite.Sprite()
+            sprite.image = surface
+            sprite.rect = surface.get_rect(topleft=(rng.randrange(WORLD_WIDTH), rng.randrange(WORLD_HEIGHT)))
+            sprites.add(sprite)
+        camera = Camera()
+        camera.x, camera.y = WORLD_WIDTH / 4 + 0.5, WORLD_HEIGHT / 4 + 0.5
+        render_queue = RenderQueue(screen)
+        def run():
+            render_queue.add_sprites(sprites, camera)
+            render_queue.draw()
+        return run, 20
+    return setup
+
+for _count in (100, 2000):
+    benchmark(f"render.sprites.{_count}")(_draw_sprites_benchmark(_count))
+
+def time_benchmark(name, repeats):
+    """Time one benchmark, returning per-call statistics in microseconds"""
+    random.seed(SEED)
+    with quiet():
+        run, calls = BENCHMARKS[name]()
+        run()  # Warm-up
+        samples = []
+        for _ in range(repeats):
+            start = time.perf_counter()
+            for _ in range(calls):
+                run()
+            samples.append((time.perf_counter() - start) / calls * 1e6)
+    return {
+        "median_us": statistics.median(samples),
+        "min_us": min(samples),
+        "max_us": max(samples),
+        "calls": calls,
+        "repeats": repeats
+    }
+
+def time_replay(path, repeats):
+    """Macro-benchmark: replay a recorded session"""
+    from replay import replay_session
+    samples = [replay_session(path)["seconds"] * 1e6 for _ in range(repeats)]
+    return {"median_us": statistics.median(samples), "min_us": min(samples),
+            "max_us": max(samples), "calls": 1, "repeats": repeats}
+
+def compare(results, baseline, threshold):
+    """Compare results to a baseline; returns the names that regressed beyond threshold"""
+    regressions = []
+    print(f"\n{'benchmark':40} {'baseline':>12} {'current':>12} {'change':>8}")
+    for name, result in results["results"].items():
+        base = baseline.get("results", {}).get(name)
+        if base is None:
+            print(f"{name:40} {'-':>12} {result['median_us']:>10.1f}us {'new':>8}")
+            continue
+        change = result["median_us"] / base["median_us"] - 1 if base["median_us"] else 0.0
+        marker = ""
+        if change > threshold:
+            regressions.append(name)
+            marker = "  <-- slower"
+        print(f"{name:40} {base['median_us']:>10.1f}us {result['median_us']:>10.1f}us {change:>+7.1%}{marker}")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="Headless micro/macro benchmarks for the engine's hot paths")
+    parser.add_argument("-k", "--filter", action="append", default=[],
+                        help="only run benchmarks whose name contains this text (repeatable)")
+    parser.add_argument("--repeats", type=int, default=5, help="timing runs per benchmark (median is reported)")
+    parser.add_argument("--replay", action="append", default=[], metavar="FILE",
+                        help="also time a full replay of a recorded session (see replay.py)")
+    parser.add_argument("--output", default=DEFAULT_RESULTS, help="where to write the JSON results")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="baseline JSON to compare against")
+    parser.add_argument("--save-baseline", action="store_true", help="store these results as the new baseline")
+    parser.add_argument("--threshold", type=float, default=0.10, help="relative slowdown counted as a regression")
+    parser.add_argument("--fail-on-regression", action="store_true", help="exit with status 1 on any regression")
+    parser.add_argument("--list", action="store_true", help="list benchmark names and exit")
+    args = parser.parse_args()
+
+    if args.list:
+        print("\n".join(BENCHMARKS))
+        return 0
+
+    # Assets are loaded from relative paths
+    args.output = os.path.abspath(args.output)
+    args.baseline = os.path.abspath(args.baseline)
+    args.replay = [os.path.abspath(path) for path in args.replay]
+    os.chdir(PROJECT_DIR)
+
+    results = {
+        "meta": {
+            "python": platform.python_version(),
+            "pygame": pygame.version.ver,
+            "platform": platform.platform(),
+            "seed": SEED,
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S")
+        },
+        "results": {}
+    }
+
+    for name in BENCHMARKS:
+        if not args.filter or any(text in name for text in args.filter):
+            results["results"][name] = time_benchmark(name, args.repeats)
+            print(f"{name:40} {results['results'][name]['median_us']:>12.1f}us")
+
+    for path in args.replay:
+        name = f"replay.{os.path.basename(path)}"
+        results["results"][name] = time_replay(path, args.repeats)
+        print(f"{name:40} {results['results'][name]['median_us']:>12.1f}us")
+
+    with open(args.output, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"\nResults written to {args.output}")
+
+    regressions = []
+    if os.path.exists(args.baseline) and not args.save_baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f), args.threshold)
+
+    if args.save_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"Baseline saved to {args.baseline}")
+
+    if regressions and args.fail_on_regression:
+        print(f"\n{len(regressions)} benchmark(s) regressed by more than {args.threshold:.0%}")
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
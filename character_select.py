@@ -1,6 +1,7 @@
 import pygame
 import math
 from settings import *
+from assets import backgrounds
 
 class CharacterSelectScreen:
     def __init__(self, screen):
@@ -28,12 +29,14 @@ class CharacterSelectScreen:
         self.particle_timer = 0
         self.particles = []
         
+        # Dark overlay that keeps text readable over backgrounds (one surface alpha, built once)
+        self.overlay = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT)).convert()
+        self.overlay.fill(BLACK)
+        self.overlay.set_alpha(80)
+        
         # Load base humanoid sprite for preview
         self.base_humanoid = self.load_base_sprite()
         
-        # Load background images for preview
-        self.load_background_previews()
-        
     def load_base_sprite(self):
         """Load the base humanoid sprite for preview"""
         try:
@@ -165,7 +168,7 @@ class CharacterSelectScreen:
         """Handle input for character selection"""
         # Helper function to safely check if key was just pressed
         def is_key_just_pressed(key):
-            return keys_just_pressed.get(key, False)
+            return key in keys_just_pressed
         
         if is_key_just_pressed(pygame.K_UP) or is_key_just_pressed(pygame.K_w):
             self.current_selection = (self.current_selection - 1) % 5
@@ -285,17 +288,12 @@ class CharacterSelectScreen:
         theme = THEMES[self.selected_theme]
         
         # Background - use themed background if available
-        if self.selected_theme in self.background_previews and self.background_previews[self.selected_theme]:
-            # Draw the themed background
-            self.screen.blit(self.background_previews[self.selected_theme], (0, 0))
-            
+        # (Backgrounds are shared with the game and decoded when a theme is first shown)
+        background = backgrounds.renderer(self.selected_theme)
+        background.draw(self.screen)
+        if background.tiles:
             # Add subtle overlay to make text more readable
-            overlay = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT), pygame.SRCALPHA)
-            overlay.fill((*BLACK, 80))  # Semi-transparent dark overlay
-            self.screen.blit(overlay, (0, 0))
-        else:
-            # Fallback to solid color background
-            self.screen.fill(theme['bg_color'])
+            self.screen.blit(self.overlay, (0, 0))
         
         # Title
         title_text = self.font_large.render("Choose Your Character", True, WHITE)
@@ -365,27 +363,4 @@ class CharacterSelectScreen:
             'accessory': self.selected_accessory,
             'start_tutorial': self.start_tutorial,
             'start_demo': self.start_demo
-        }
-    
-    def load_background_previews(self):
-        """Load background images for theme previews"""
-        self.background_previews = {}
-        
-        # Background file mapping for each theme
-        background_files = {
-            'crystal': 'Back round Crystal.png',
-            'forest': 'Background forest gardioun.png', 
-            'metal': 'Background Cyber runner.png',
-            'stone': 'Background anchiant explorer.png'
-        }
-        
-        # Load all theme backgrounds at a smaller size for preview
-        for theme_name, filename in background_files.items():
-            try:
-                bg_image = pygame.image.load(f"Assets/{filename}").convert()
-                # Scale to screen size for preview
-                bg_image = pygame.transform.scale(bg_image, (SCREEN_WIDTH, SCREEN_HEIGHT))
-                self.background_previews[theme_name] = bg_image
-            except Exception as e:
-                print(f"Warning: Could not load background preview for {theme_name}: {e}")
-                self.background_previews[theme_name] = None 
\ No newline at end of file
+        }
\ No newline at end of file
@@ -0,0 +1,99 @@
+import pygame
+
+# Keyboard bindings for the abstract player controls
+LEFT_KEYS = frozenset((pygame.K_LEFT, pygame.K_a))
+RIGHT_KEYS = frozenset((pygame.K_RIGHT, pygame.K_d))
+JUMP_KEYS = frozenset((pygame.K_SPACE, pygame.K_UP, pygame.K_w))
+
+# AI action name -> (left, right, jump)
+ACTION_CONTROLS = {
+    "move_right": (False, True, False),
+    "move_left": (True, False, False),
+    "jump_right": (False, True, True),
+    "jump_left": (True, False, True),
+    "jump_only": (False, False, True),
+    "wait": (False, False, False)
+}
+
+class ControlState:
+    """Abstract left/right/jump controls that both humans and the AI write into"""
+    __slots__ = ("left", "right", "jump")
+
+    def __init__(self):
+        self.left = False
+        self.right = False
+        self.jump = False
+
+    def clear(self):
+        """Release every control"""
+        self.left = False
+        self.right = False
+        self.jump = False
+
+    def set_action(self, action):
+        """Set the controls from an AI action name (unknown actions release everything)"""
+        self.left, self.right, self.jump = ACTION_CONTROLS.get(action, ACTION_CONTROLS["wait"])
+
+    def set_from_keys(self, keys):
+        """Set the controls from a pygame.key.get_pressed()-style key array"""
+        self.left = any(keys[key] for key in LEFT_KEYS)
+        self.right = any(keys[key] for key in RIGHT_KEYS)
+        self.jump = any(keys[key] for key in JUMP_KEYS)
+
+class InputManager:
+    """Edge-triggered keyboard state built from KEYDOWN/KEYUP events"""
+    def __init__(self):
+        self.held = set()            # Keys currently down
+        self.just_pressed = set()    # Keys that went down this frame
+        self.just_released = set()   # Keys that went up this frame
+
+        # Human controls, only recomputed when a key event arrives
+        self.controls = ControlState()
+
+    def begin_frame(self):
+        """Forget last frame's edges (call once per frame before processing events)"""
+        if self.just_pressed:
+            self.just_pressed.clear()
+        if self.just_released:
+            self.just_released.clear()
+
+    def process_event(self, event):
+        """Feed a pygame event into the input state"""
+        if event.type == pygame.KEYDOWN:
+            if event.key not in self.held:
+                self.held.add(event.key)
+                self.just_pressed.add(event.key)
+                self.refresh_controls()
+        elif event.type == pygame.KEYUP:
+            if event.key in self.held:
+                self.held.discard(event.key)
+                self.just_released.add(event.key)
+                self.refresh_controls()
+        elif event.type == pygame.WINDOWFOCUSLOST:
+            # We never see the KEYUPs for keys released while unfocused
+            self.release_all()
+
+    def release_all(self):
+        """Treat every held key as released"""
+        self.just_released.update(self.held)
+        self.held.clear()
+        self.refresh_controls()
+
+    def refresh_controls(self):
+        """Recompute the abstract controls from the held keys"""
+        held = self.held
+        self.controls.left = not LEFT_KEYS.isdisjoint(held)
+        self.controls.right = not RIGHT_KEYS.isdisjoint(held)
+        self.controls.jump = not JUMP_KEYS.isdisjoint(held)
+
+    def is_held(self, key):
+        """Check if a key is currently down"""
+        return key in self.held
+
+    def was_just_pressed(self, key):
+        """Check if a key went down this frame"""
+        return key in self.just_pressed
+
+    def was_just_released(self, key):
+        """Check if a key went up this frame"""
+        return key in self.just_released
@@ -4,14 +4,54 @@ import random
 import json
 import os
 import time
+from collections import deque
+import game_log
 from settings import *
 from player import Player
 from powerups import PowerUp
+from level_format import build_level
+from platforms import PlatformGroup
+from timers import Scheduler
+from planner import GraphPlanner
+from q_learning import QLearner, ACTIONS
+from eligibility_traces import EligibilityTraces
+from render_queue import RenderQueue
+from assets import backgrounds
+from ghosts import Ghost, GHOST_LAYER
+from frontier import FrontierArchive, FRONTIER_START_CHANCE
+
+# Q-learning backend: each action is held for a few frames (jump only pressed on the first),
+# rewarded for getting closer to the victory zone, with a final reward for dying or winning
+Q_ACTION_REPEAT = 4
+Q_STEP_COST = 0.05
+Q_DEATH_REWARD = -10.0
+Q_VICTORY_REWARD = 20.0
+
+# Learning memory limits: states remembered before the least useful are evicted, and the
+# eviction policies ("recent": least recently visited first, "information": fewest visits first)
+MEMORY_BUDGET = 5000
+MEMORY_POLICIES = ("recent", "information")
+
+# Temporal credit: each decision (other than "wait") decays an action's eligibility trace by
+# TRACE_DECAY, and rewards reach back until it falls under TRACE_CUTOFF (about 29 decisions)
+TRACE_DECAY = 0.9
+TRACE_CUTOFF = 0.05
+
+# Per-attempt AI state kept in world snapshots (see DemoLevel.snapshot); the learning tables are never rolled back
+EPISODE_FIELDS = ("last_distance", "last_position", "last_on_ground", "last_action", "action_start_distance",
+                  "stuck_timer", "inefficient_action_streak", "last_meaningful_progress_distance")
+
+# Learning memory ghost agents read and write on the AI they explore for (see GhostAI);
+# everything else about an agent (its player, feelings, route and episode) is its own
+SHARED_MEMORY = ("success_memory", "failure_memory", "action_attempts", "state_visit_count",
+                 "confidence_by_key", "total_confidence", "confidence_count", "well_explored_count",
+                 "progress_memory", "average_progress", "positive_reinforcement", "negative_reinforcement",
+                 "evicted_states", "memory_budget", "memory_policy", "count_decay")
 
 class LearningAI:
     """Learning AI that gets smarter over time by remembering what works"""
     
-    def __init__(self, player, platforms, powerups, victory_zone):
+    def __init__(self, player, platforms, powerups, victory_zone, learning_data=None, backend="emotion"):
         self.player = player
         self.platforms = platforms
         self.powerups = powerups
@@ -23,10 +63,16 @@ class LearningAI:
         
         # NEW: Enhanced learning with confidence tracking
         self.action_attempts = {}  # {(position_key, action): attempt_count}
-        self.state_visit_count = {}  # {position_key: visit_count}
+        self.state_visit_count = {}  # {position_key: visit_count}, least recently visited first
+        
+        # Running aggregates for get_learning_stats (kept in sync by track_action_attempt)
+        self.confidence_by_key = {}  # {(position_key, action): last counted confidence}
+        self.total_confidence = 0.0
+        self.confidence_count = 0
+        self.well_explored_count = 0  # States with 3+ visits
         
         # Enhanced memory for progress efficiency
-        self.progress_memory = {}  # {(position_key, action): [progress_amounts]}
+        self.progress_memory = {}  # {(position_key, action): deque of the last 10 progress amounts}
         self.average_progress = {}  # {(position_key, action): average_progress}
         
         # Emotional memory system
@@ -43,9 +89,9 @@ class LearningAI:
         # Manual override system
         self.manual_pb_override = False
         
-        # Enhanced temporal learning - track recent actions for reward propagation
-        self.recent_actions = []  # List of (position, action, timestamp) for temporal learning
-        self.max_recent_actions = 5  # Number of recent actions to remember
+        # Temporal learning - eligibility traces of recent actions for reward propagation
+        self.traces = EligibilityTraces(TRACE_DECAY, TRACE_CUTOFF)
+        self.last_visited_state = None  # State visits are counted on entering a state
         
         # PB route failure tracking
         self.pb_step_failure_count = {}  # Track failures for specific PB route steps
@@ -67,8 +113,30 @@ class LearningAI:
         # UCB1 exploration parameters
         self.ucb1_c = 1.4  # Exploration parameter (sqrt(2) is theoretical optimum)
         
+        # Memory limits (see enforce_memory_budget)
+        self.memory_budget = MEMORY_BUDGET  # Most states kept (None: unlimited)
+        self.memory_policy = "recent"  # One of MEMORY_POLICIES
+        self.count_decay = 1.0  # Counts are multiplied by this after every attempt (1.0: no decay)
+        self.evicted_states = 0  # States dropped so far, by eviction or decay
+        
+        # Learning backend: "emotion" (success/failure counts and feelings) or "qlearning"
+        self.backend = backend
+        self.q_learner = QLearner() if backend == "qlearning" else None
+        self.q_learning_data = None  # Saved Q-table kept as-is while another backend runs
+        self.q_step = None  # (state key, action index, potential) of the step being played
+        self.q_hold = 0  # Frames left to hold the current Q-learning action
+        
+        # Optional GraphPlanner whose action is tried first when exploring ("guided" demo)
+        self.planner = None
+        self.planner_prior = 0.5  # Chance to follow the planner instead of exploring at random
+        self.planner_action = None
+        
+        # Dice for exploration (ghost agents each roll their own random.Random stream)
+        self.rng = random
+        
         # Learning control
         self.learning_active = True
+        self.persist_to_disk = True  # False for replays - never touch ai_learning_data.json
         
         # Game knowledge and position tracking
         self.game_knowledge = {
@@ -92,46 +160,50 @@ class LearningAI:
             }
         }
         
-        # Load existing learning data
-        self.load_learning_data()
+        # Load existing learning data (or start from the tables we were given)
+        if learning_data is not None:
+            self.apply_learning_data(learning_data)
+        else:
+            self.load_learning_data()
         
         # Print game tutorial for reference
         self.print_game_tutorial()
     
     def print_game_tutorial(self):
         """Print the game rules and mechanics for the AI to understand"""
-        print("\n" + "="*60)
-        print("🎓 GAME TUTORIAL FOR AI")
-        print("="*60)
-        print(f"🎯 GOAL: {self.game_knowledge['goal']}")
-        print("🔑 KEY STRATEGY: MOVE RIGHT AND UP TO WIN!")
-        print("   Victory zone is at the TOP-RIGHT of the world")
-        print("   Moving RIGHT = Horizontal progress toward victory")
-        print("   Moving UP = Vertical progress toward victory") 
-        print("   You need BOTH rightward AND upward movement!")
-        print("   Moving LEFT or DOWN = Away from victory = SADNESS!")
-        print(f"💀 DEATH: {self.game_knowledge['rule_3']}")
-        print(f"🏆 VICTORY: {self.game_knowledge['rule_4']}")
-        print(f"🎮 MOVEMENT: {self.game_knowledge['rule_1']}")
-        print(f"⬆️ JUMPING: {self.game_knowledge['rule_2']}")
-        
-        print("\n📋 PLATFORM TYPES:")
+        lines = ["="*60]
+        lines.append("🎓 GAME TUTORIAL FOR AI")
+        lines.append("="*60)
+        lines.append(f"🎯 GOAL: {self.game_knowledge['goal']}")
+        lines.append("🔑 KEY STRATEGY: MOVE RIGHT AND UP TO WIN!")
+        lines.append("   Victory zone is at the TOP-RIGHT of the world")
+        lines.append("   Moving RIGHT = Horizontal progress toward victory")
+        lines.append("   Moving UP = Vertical progress toward victory") 
+        lines.append("   You need BOTH rightward AND upward movement!")
+        lines.append("   Moving LEFT or DOWN = Away from victory = SADNESS!")
+        lines.append(f"💀 DEATH: {self.game_knowledge['rule_3']}")
+        lines.append(f"🏆 VICTORY: {self.game_knowledge['rule_4']}")
+        lines.append(f"🎮 MOVEMENT: {self.game_knowledge['rule_1']}")
+        lines.append(f"⬆️ JUMPING: {self.game_knowledge['rule_2']}")
+        
+        lines.append("📋 PLATFORM TYPES:")
         for platform_type, description in self.game_knowledge['platforms'].items():
-            print(f"  • {platform_type.upper()}: {description}")
+            lines.append(f"  • {platform_type.upper()}: {description}")
         
-        print("\n💎 POWER-UPS:")
+        lines.append("💎 POWER-UPS:")
         for powerup_type, description in self.game_knowledge['powerups'].items():
-            print(f"  • {powerup_type.upper()}: {description}")
-        
-        print("\n🧠 LEARNING STRATEGY:")
-        print("  • PRIORITY #1: Move RIGHT and UP toward victory!")
-        print("  • Start with HIGH EXPLORATION, solidify knowledge over time")
-        print("  • Try different actions at each position")
-        print("  • Remember what works and what fails")
-        print("  • Feel EXTRA good about rightward AND upward progress")
-        print("  • Strongly prefer actions that felt good before")
-        print("  • Build emotional associations with actions")
-        print("="*60 + "\n")
+            lines.append(f"  • {powerup_type.upper()}: {description}")
+        
+        lines.append("🧠 LEARNING STRATEGY:")
+        lines.append("  • PRIORITY #1: Move RIGHT and UP toward victory!")
+        lines.append("  • Start with HIGH EXPLORATION, solidify knowledge over time")
+        lines.append("  • Try different actions at each position")
+        lines.append("  • Remember what works and what fails")
+        lines.append("  • Feel EXTRA good about rightward AND upward progress")
+        lines.append("  • Strongly prefer actions that felt good before")
+        lines.append("  • Build emotional associations with actions")
+        lines.append("="*60)
+        game_log.info("tutorial", "\n".join(lines))
     
     def feel_emotion(self, emotion_type, intensity, action=None):
         """AI experiences emotions about actions and outcomes"""
@@ -170,9 +242,9 @@ class LearningAI:
             # Enhanced: Amplify if progress was made efficiently
             if hasattr(self, 'inefficient_action_streak') and self.inefficient_action_streak <= 3:
                 intensity = min(10, intensity * 1.3)  # 30% bonus for efficient progress
-                print(f"🚀 EFFICIENT rightward progress! (intensity: {intensity:.1f})")
+                game_log.debug("progress", f"🚀 EFFICIENT rightward progress! (intensity: {intensity:.1f})")
             else:
-                print(f"🚀 Rightward progress (intensity: {intensity:.1f})")
+                game_log.debug("progress", f"🚀 Rightward progress (intensity: {intensity:.1f})")
             self.recent_progress_feeling = min(10, self.recent_progress_feeling + intensity)
     
     def get_position_key(self):
@@ -253,42 +325,125 @@ class LearningAI:
             else:
                 return "multiple_platforms"
     
-    def remember_success(self, position_key, action):
+    def remember_success(self, position_key, action, weight=1):
         """Store successful action in memory with progress tracking"""
         key = (position_key, action)
-        self.success_memory[key] = self.success_memory.get(key, 0) + 1
+        self.success_memory[key] = self.success_memory.get(key, 0) + weight
         
         # Track this action attempt
-        self.track_action_attempt(position_key, action)
+        self.track_action_attempt(position_key, action, weight)
         
         # Track progress efficiency
         if hasattr(self, 'last_distance') and hasattr(self, 'last_meaningful_progress_distance'):
             progress_made = self.last_distance - getattr(self, 'action_start_distance', self.last_meaningful_progress_distance)
+            # Update average progress (keep last 10 measurements)
             if key not in self.progress_memory:
-                self.progress_memory[key] = []
+                self.progress_memory[key] = deque(maxlen=10)
             self.progress_memory[key].append(max(0, progress_made))  # Only positive progress
             
-            # Update average progress (keep last 10 measurements)
-            if len(self.progress_memory[key]) > 10:
-                self.progress_memory[key] = self.progress_memory[key][-10:]
-            
             self.average_progress[key] = sum(self.progress_memory[key]) / len(self.progress_memory[key])
     
-    def remember_failure(self, position_key, action):
+    def remember_failure(self, position_key, action, weight=1):
         """Store failed action in memory"""
         key = (position_key, action)
-        self.failure_memory[key] = self.failure_memory.get(key, 0) + 1
+        self.failure_memory[key] = self.failure_memory.get(key, 0) + weight
         
         # Enhanced tracking for UCB1
-        self.track_action_attempt(position_key, action)
+        self.track_action_attempt(position_key, action, weight)
     
-    def track_action_attempt(self, position_key, action):
-        """Track that an action was attempted at a position"""
+    def track_action_attempt(self, position_key, action, weight=1):
+        """Track that an action was attempted at a position (weight < 1 for partial credit)"""
         key = (position_key, action)
-        self.action_attempts[key] = self.action_attempts.get(key, 0) + 1
+        self.action_attempts[key] = self.action_attempts.get(key, 0) + weight
         
-        # Track state visits
-        self.state_visit_count[position_key] = self.state_visit_count.get(position_key, 0) + 1
+        # Keep the confidence aggregate current (covers the success count bumped by remember_success)
+        self.update_confidence_aggregate(key)
+    
+    def count_state_visit(self, position_key):
+        """Track a visit to a state (re-inserting keeps the dict in least-recently-visited order)"""
+        visits = self.state_visit_count.pop(position_key, 0) + 1
+        self.state_visit_count[position_key] = visits
+        if visits >= 3 > visits - 1:  # Crossed 3 (counts are fractional once count_decay has run)
+            self.well_explored_count += 1
+    
+    def update_confidence_aggregate(self, key):
+        """Replace a key's old contribution to the running average confidence"""
+        old_confidence = self.confidence_by_key.get(key, 0.0)
+        new_confidence = self.get_action_confidence(*key)
+        
+        if old_confidence > 0:
+            self.total_confidence -= old_confidence
+            self.confidence_count -= 1
+        if new_confidence > 0:
+            self.total_confidence += new_confidence
+            self.confidence_count += 1
+            self.confidence_by_key[key] = new_confidence
+        else:
+            self.confidence_by_key.pop(key, None)
+        
+        # Guard against float drift once every contribution has been removed
+        if self.confidence_count == 0:
+            self.total_confidence = 0.0
+    
+    def rebuild_learning_stats(self):
+        """Recompute the running aggregates from scratch (after load or erase)"""
+        self.confidence_by_key = {}
+        self.total_confidence = 0.0
+        self.confidence_count = 0
+        for key in self.action_attempts:
+            self.update_confidence_aggregate(key)
+        
+        self.well_explored_count = sum(1 for visits in self.state_visit_count.values() if visits >= 3)
+    
+    def enforce_memory_budget(self, decay=True):
+        """Decay the learning counts and evict states beyond the memory budget
+        
+        Decayed counts that drop below one visit are forgotten. Over budget, states go
+        least recently visited first ("recent") or fewest visits first ("information"),
+        down to 90% of the budget so eviction doesn't run after every attempt.
+        """
+        forgotten = set()
+        
+        if decay and self.count_decay < 1.0:
+            rate = self.count_decay
+            for table in (self.success_memory, self.failure_memory, self.action_attempts):
+                for key in table:
+                    table[key] *= rate
+            for position_key in self.state_visit_count:
+                self.state_visit_count[position_key] *= rate
+                if self.state_visit_count[position_key] < 1:
+                    forgotten.add(position_key)
+            # Actions tried less than once are as good as untried
+            for key in [key for key, attempts in self.action_attempts.items() if attempts < 1]:
+                self.drop_action_key(key)
+        
+        kept = len(self.state_visit_count) - len(forgotten)
+        if self.memory_budget is not None and kept > self.memory_budget:
+            candidates = [key for key in self.state_visit_count if key not in forgotten]
+            if self.memory_policy == "information":
+                # Fewest visits first; the stable sort keeps least recently visited first among equals
+                candidates.sort(key=self.state_visit_count.get)
+            evict = kept - int(self.memory_budget * 0.9)
+            forgotten.update(candidates[:evict])
+            game_log.info("memory", f"🧹 Memory budget: evicted {evict} states ({self.memory_policy}), {kept - evict} kept")
+        
+        if forgotten:
+            for position_key in forgotten:
+                del self.state_visit_count[position_key]
+            for table in (self.success_memory, self.failure_memory, self.action_attempts,
+                          self.progress_memory, self.average_progress):
+                for key in [key for key in table if key[0] in forgotten]:
+                    del table[key]
+            self.evicted_states += len(forgotten)
+        
+        if forgotten or (decay and self.count_decay < 1.0):
+            self.rebuild_learning_stats()
+    
+    def drop_action_key(self, key):
+        """Forget everything about one (position_key, action)"""
+        for table in (self.success_memory, self.failure_memory, self.action_attempts,
+                      self.progress_memory, self.average_progress):
+            table.pop(key, None)
     
     def get_action_confidence(self, position_key, action):
         """Calculate confidence for an action at a position"""
@@ -342,33 +497,18 @@ class LearningAI:
         
         return average_reward + exploration_bonus + progress_bonus
     
-    def add_to_recent_actions(self, position_key, action):
-        """Add action to recent actions for temporal learning"""
-        import time
-        timestamp = time.time()
-        self.recent_actions.append((position_key, action, timestamp))
-        
-        # Keep only recent actions
-        if len(self.recent_actions) > self.max_recent_actions:
-            self.recent_actions.pop(0)
-    
     def propagate_temporal_reward(self, reward_type, intensity):
-        """Propagate rewards back to recent actions (Temporal Difference Learning)"""
-        if not self.recent_actions:
-            return
-        
-        # Propagate reward back with diminishing strength
-        for i, (pos_key, action, timestamp) in enumerate(reversed(self.recent_actions)):
-            # More recent actions get more credit
-            temporal_discount = 0.8 ** i  # Discount factor
-            discounted_intensity = intensity * temporal_discount
+        """Propagate a reward back to recent actions in proportion to their eligibility traces"""
+        for pos_key, action, trace in self.traces.traced():
+            discounted_intensity = intensity * trace
             
             if discounted_intensity > 0.1:  # Only propagate significant rewards
+                # Credit counts as a partial attempt but not as a state visit
                 if reward_type == "success":
-                    self.remember_success(pos_key, action)
+                    self.remember_success(pos_key, action, trace)
                     self.feel_emotion("success", discounted_intensity, action)
                 elif reward_type == "failure":
-                    self.remember_failure(pos_key, action)
+                    self.remember_failure(pos_key, action, trace)
                     self.feel_emotion("failure", discounted_intensity, action)
     
     def get_learned_action(self, position_key):
@@ -403,6 +543,10 @@ class LearningAI:
         if not self.learning_active:
             return
         
+        if self.q_learner is not None:
+            self.update_q_learning(dt)
+            return
+        
         # Update personal best tracking
         self.update_personal_best()
         
@@ -413,38 +557,35 @@ class LearningAI:
         # Log emotional state periodically
         if self.attempts % 5 == 0 and self.attempts > 0:
             if anger_level > 3:
-                print(f"😤 AI Emotional State: ANGRY ({anger_level:.1f}/10)")
+                game_log.debug("emotion", f"😤 AI Emotional State: ANGRY ({anger_level:.1f}/10)")
             elif happiness_level > 3:
-                print(f"😊 AI Emotional State: HAPPY ({happiness_level:.1f}/10)")
+                game_log.debug("emotion", f"😊 AI Emotional State: HAPPY ({happiness_level:.1f}/10)")
             else:
-                print(f"😐 AI Emotional State: NEUTRAL (feeling: {self.recent_progress_feeling:.1f})")
+                game_log.debug("emotion", f"😐 AI Emotional State: NEUTRAL (feeling: {self.recent_progress_feeling:.1f})")
+        
+        # The planner keeps track of its jump every frame, whether or not it gets followed
+        if self.planner is not None:
+            self.planner_action = self.planner.next_action()
         
         # Make smart decision based on new logic
         chosen_action = self.make_smart_decision()
         
-        # Add current action to recent actions for temporal learning
+        # Add current action to the eligibility traces for temporal learning
         if chosen_action != "wait":  # Don't track wait actions for temporal learning
             current_position = self.get_position_key()
-            self.add_to_recent_actions(current_position, chosen_action)
+            if current_position != self.last_visited_state:
+                self.count_state_visit(current_position)
+                self.last_visited_state = current_position
+            self.traces.visit(current_position, chosen_action)
             
             # Track action start distance for progress efficiency calculation
             self.action_start_distance = self.player.rect.centerx
         
-        # Create keys dictionary and apply the chosen action
-        keys = {
-            pygame.K_LEFT: False, 
-            pygame.K_RIGHT: False, 
-            pygame.K_a: False,
-            pygame.K_d: False,
-            pygame.K_SPACE: False,
-            pygame.K_UP: False,
-            pygame.K_w: False
-        }
-        
-        self.apply_action(keys, chosen_action)
+        # Write the chosen action into the player's controls
+        self.apply_action(self.player.controls, chosen_action)
         
-        # CRITICAL: Actually apply the keys to the player
-        self.player.handle_input(keys)
+        # CRITICAL: Actually apply the controls to the player
+        self.player.apply_controls()
         
         # Update player (this handles collision with platforms)
         self.player.update(self.platforms)
@@ -479,9 +620,9 @@ class LearningAI:
                 
                 # Provide feedback when streak gets concerning
                 if self.inefficient_action_streak == 6:
-                    print(f"🔄 AI making inefficient moves (streak: {self.inefficient_action_streak})")
+                    game_log.debug("progress", f"🔄 AI making inefficient moves (streak: {self.inefficient_action_streak})")
                 elif self.inefficient_action_streak >= 10:
-                    print(f"⚠️ AI very inefficient (streak: {self.inefficient_action_streak})")
+                    game_log.debug("progress", f"⚠️ AI very inefficient (streak: {self.inefficient_action_streak})")
         
         # Enhanced stuck detection and timer management
         old_x = self.last_position[0] if self.last_position else self.player.rect.centerx
@@ -496,7 +637,7 @@ class LearningAI:
         if horizontal_progress or significant_vertical_progress or ground_state_changed:
             self.stuck_timer = 0.0
             if significant_vertical_progress:
-                print(f"📈 Vertical progress detected: {old_y - self.player.rect.centery:.1f} pixels up")
+                game_log.debug("progress", f"📈 Vertical progress detected: {old_y - self.player.rect.centery:.1f} pixels up")
         else:
             self.stuck_timer += dt
         
@@ -504,9 +645,19 @@ class LearningAI:
         self.last_position = (self.player.rect.centerx, self.player.rect.centery)
         self.last_on_ground = self.player.on_ground
         
+        self.update_world(dt)
+        
+        # NOTE: Death/victory checking is handled by DemoLevel to avoid double counting
+        # The DemoLevel will call self.on_death() and self.on_victory() when appropriate
+        
+        # Auto-save every 10 attempts (but don't increment attempts here!)
+        if self.attempts % 10 == 0 and self.attempts > 0:
+            self.save_learning_data()
+    
+    def update_world(self, dt):
+        """Update platforms and power-ups after the player has moved"""
         # Update moving platforms and other dynamic elements
-        for platform in self.platforms:
-            platform.update(dt)
+        self.platforms.update(dt)
         
         # Update power-ups
         for powerup in self.powerups:
@@ -520,14 +671,76 @@ class LearningAI:
                 if powerup.powerup_type == "jump_boost":
                     self.player.add_powerup("jump_boost", 10.0)
                 self.powerups.remove(powerup)
+    
+    def get_progress_potential(self):
+        """Closeness to the victory zone (Q-learning rewards are the change in this)"""
+        dx = self.victory_zone.centerx - self.player.rect.centerx
+        dy = self.victory_zone.centery - self.player.rect.centery
+        return -math.hypot(dx, dy) / 100
+    
+    def update_q_learning(self, dt):
+        """One frame of the Q-learning backend: pick (or keep holding) an action and learn from the last one"""
+        if self.q_hold == 0:
+            state = self.get_position_key()
+            potential = self.get_progress_potential()
+            
+            # Reward the finished step for the progress it made
+            if self.q_step is not None:
+                key, action, old_potential = self.q_step
+                self.q_learner.observe(key, action, potential - old_potential - Q_STEP_COST, state, False)
+            
+            action = self.q_learner.choose(state)
+            self.q_step = (state, action, potential)
+            self.q_hold = Q_ACTION_REPEAT
+            self.last_action = ACTIONS[action]
+            self.apply_action(self.player.controls, self.last_action)
+        else:
+            # Keep steering, but a held jump would double jump straight away
+            self.player.controls.jump = False
+        self.q_hold -= 1
         
-        # NOTE: Death/victory checking is handled by DemoLevel to avoid double counting
-        # The DemoLevel will call self.on_death() and self.on_victory() when appropriate
+        self.player.apply_controls()
+        self.player.update(self.platforms)
         
-        # Auto-save every 10 attempts (but don't increment attempts here!)
+        self.last_distance = self.player.rect.centerx
+        self.personal_best_distance = max(self.personal_best_distance, self.last_distance)
+        
+        self.update_world(dt)
+        
+        # Auto-save every 10 attempts
         if self.attempts % 10 == 0 and self.attempts > 0:
             self.save_learning_data()
     
+    def finish_q_episode(self, final_reward):
+        """Learn from the last step of an attempt, then sweep the Q-table"""
+        if self.q_step is not None:
+            key, action, old_potential = self.q_step
+            reward = self.get_progress_potential() - old_potential + final_reward
+            self.q_learner.observe(key, action, reward, None, True)
+        self.q_step = None
+        self.q_hold = 0
+        self.q_learner.end_episode()
+        replayed = len(self.q_learner.replay) if self.q_learner.replay is not None else 0
+        game_log.info("q_learning", f"📊 Q-learning: {len(self.q_learner.table)} states, {replayed} replayable steps, "
+                      f"exploration {self.q_learner.epsilon:.2f}")
+    
+    def on_restart(self):
+        """Called when the player is put back at the start without dying or winning"""
+        if self.q_learner is not None:
+            self.q_learner.forget_pending()
+            self.q_step = None
+            self.q_hold = 0
+        self.traces.clear()
+        self.last_visited_state = None
+    
+    def snapshot(self):
+        """This attempt's state (EPISODE_FIELDS), for restore()"""
+        return {name: getattr(self, name) for name in EPISODE_FIELDS if hasattr(self, name)}
+    
+    def restore(self, state):
+        for name, value in state.items():
+            setattr(self, name, value)
+    
     def update_personal_best(self):
         """Update Personal Best with intelligent route filtering for efficiency"""
         current_x = self.player.rect.centerx
@@ -590,7 +803,7 @@ class LearningAI:
                     if len(self.pb_route) > 50:  # Keep only most recent 50 efficient actions
                         self.pb_route = self.pb_route[-40:]  # Trim to 40, keeping most recent
             
-            print(f"🏆 NEW PB: {current_x:.0f} (+{current_x - old_pb:.0f}) | Route: {len(self.pb_route)} efficient actions")
+            game_log.info("personal_best", f"🏆 NEW PB: {current_x:.0f} (+{current_x - old_pb:.0f}) | Route: {len(self.pb_route)} efficient actions")
             
             # Feel AMAZING about setting a new PB
             self.feel_emotion("success", 5)
@@ -613,12 +826,12 @@ class LearningAI:
         really_struggling = (self.stuck_timer > 4.0)  # Longer stuck time required
         
         # Add some randomness - don't always use PB recovery even when conditions are met
-        random_factor = random.random() < 0.6  # Only 60% chance when conditions are met
+        random_factor = self.rng.random() < 0.6  # Only 60% chance when conditions are met
         
         should_recover = (very_far_behind and has_route and really_struggling and random_factor)
         
         if should_recover:
-            print(f"🆘 AI is REALLY struggling (far behind: {very_far_behind}, feeling: {self.recent_progress_feeling:.1f}) - considering PB recovery")
+            game_log.debug("pb_recovery", f"🆘 AI is REALLY struggling (far behind: {very_far_behind}, feeling: {self.recent_progress_feeling:.1f}) - considering PB recovery")
         
         return should_recover
     
@@ -627,7 +840,7 @@ class LearningAI:
         if not self.pb_route or self.pb_route_index >= len(self.pb_route):
             self.pb_recovery_mode = False
             self.pb_route_index = 0
-            print("📍 PB recovery route completed - resuming exploration")
+            game_log.debug("pb_recovery", "📍 PB recovery route completed - resuming exploration")
             return None
         
         # Increase exploration chance if stuck during PB recovery
@@ -635,10 +848,10 @@ class LearningAI:
         stuck_induced_exploration_bonus = 0.0
         if self.stuck_timer > 3.5:  # If stuck for a notable duration
             stuck_induced_exploration_bonus = 0.40  # Add 40% chance, making it 65% total
-            print(f"🎲 PB Recovery: AI is stuck (timer: {self.stuck_timer:.1f}s), increasing exploration likelihood.")
+            game_log.debug("pb_recovery", f"🎲 PB Recovery: AI is stuck (timer: {self.stuck_timer:.1f}s), increasing exploration likelihood.")
 
-        if random.random() < (base_exploration_chance + stuck_induced_exploration_bonus):
-            print("🎲 PB Recovery: Choosing to explore (possibly due to being stuck) instead of following route step.")
+        if self.rng.random() < (base_exploration_chance + stuck_induced_exploration_bonus):
+            game_log.debug("pb_recovery", "🎲 PB Recovery: Choosing to explore (possibly due to being stuck) instead of following route step.")
             # Optionally, slightly reduce frustration here too, as it's trying something new
             self.recent_progress_feeling = max(-10, self.recent_progress_feeling + 0.5)
             return None  # Fall back to exploration logic in make_smart_decision
@@ -672,7 +885,7 @@ class LearningAI:
             self.pb_route_index = best_match_index
             route_pos, route_action_for_pos, route_distance = self.pb_route[self.pb_route_index]
             
-            print(f"📍 PB Recovery: Found matching position at step {self.pb_route_index}, action: {route_action_for_pos}")
+            game_log.debug("pb_recovery", f"📍 PB Recovery: Found matching position at step {self.pb_route_index}, action: {route_action_for_pos}")
             
             # Track this PB step attempt for failure analysis
             self.last_pb_step_attempted = self.pb_route_index
@@ -680,7 +893,7 @@ class LearningAI:
             # Check if this step has failed multiple times
             failure_count = self.pb_step_failure_count.get(self.pb_route_index, 0)
             if failure_count >= 3:  # Step has failed 3+ times
-                print(f"⚠️ PB Recovery: Step {self.pb_route_index} has failed {failure_count} times - forcing exploration instead")
+                game_log.debug("pb_recovery", f"⚠️ PB Recovery: Step {self.pb_route_index} has failed {failure_count} times - forcing exploration instead")
                 self.last_pb_step_attempted = None  # Don't track this as a PB attempt
                 return None  # Force exploration instead
             
@@ -692,7 +905,7 @@ class LearningAI:
             # No good match found, try next action in sequence anyway
             if self.pb_route_index < len(self.pb_route):
                 route_pos, route_action_for_pos, route_distance = self.pb_route[self.pb_route_index]
-                print(f"📍 PB Recovery: No exact match, trying sequential action at step {self.pb_route_index}: {route_action_for_pos}")
+                game_log.debug("pb_recovery", f"📍 PB Recovery: No exact match, trying sequential action at step {self.pb_route_index}: {route_action_for_pos}")
                 
                 # Track this PB step attempt for failure analysis
                 self.last_pb_step_attempted = self.pb_route_index
@@ -700,7 +913,7 @@ class LearningAI:
                 # Check if this step has failed multiple times
                 failure_count = self.pb_step_failure_count.get(self.pb_route_index, 0)
                 if failure_count >= 3:  # Step has failed 3+ times
-                    print(f"⚠️ PB Recovery: Step {self.pb_route_index} has failed {failure_count} times - forcing exploration instead")
+                    game_log.debug("pb_recovery", f"⚠️ PB Recovery: Step {self.pb_route_index} has failed {failure_count} times - forcing exploration instead")
                     self.last_pb_step_attempted = None  # Don't track this as a PB attempt
                     return None  # Force exploration instead
                 
@@ -710,7 +923,7 @@ class LearningAI:
                 # Somehow got past the end
                 self.pb_recovery_mode = False
                 self.pb_route_index = 0
-                print("📍 PB recovery exceeded route length - resuming exploration")
+                game_log.debug("pb_recovery", "📍 PB recovery exceeded route length - resuming exploration")
                 return None
     
     def is_at_pb_location(self):
@@ -802,7 +1015,7 @@ class LearningAI:
         
         # Only log when in recovery mode
         if self.pb_recovery_mode:
-            print(f"📍 PB Recovery: Step {self.pb_route_index}/{len(self.pb_route)}")
+            game_log.debug("pb_recovery", f"📍 PB Recovery: Step {self.pb_route_index}/{len(self.pb_route)}")
             # if self.pb_route_index < len(self.pb_route):
             #     route_pos, route_action, route_dist = self.pb_route[self.pb_route_index]
             #     print(f"   Next PB step: {route_action} at {route_pos} (dist: {route_dist})")
@@ -877,12 +1090,12 @@ class LearningAI:
             # Disable any PB recovery mode - we're feeling good!
             if self.pb_recovery_mode:
                 self.pb_recovery_mode = False
-                print(f"😊 HAPPY - Disabling PB recovery to explore!")
+                game_log.debug("decision", f"😊 HAPPY - Disabling PB recovery to explore!")
             
             # At PB location or feeling happy = maximum exploration!
             if at_pb_location:
                 # MAXIMUM JITTERY EXPLORATION at PB - this creates the jittery behavior
-                print(f"🎯 AT PB: MAXIMUM UP+RIGHT EXPLORATION!")
+                game_log.debug("decision", f"🎯 AT PB: MAXIMUM UP+RIGHT EXPLORATION!")
                 return self.choose_exploration_action(position_key, exploration_boost=0.95)  # 95% exploration (was 80%)
             else:
                 # Happy but not at PB = confident exploration
@@ -895,7 +1108,7 @@ class LearningAI:
             if self.inefficient_action_streak > 5:
                 inefficiency_boost = min(0.3, (self.inefficient_action_streak - 5) * 0.05)
                 if inefficiency_boost > 0.1:
-                    print(f"🔄 Boosting exploration due to inefficiency (streak: {self.inefficient_action_streak})")
+                    game_log.debug("decision", f"🔄 Boosting exploration due to inefficiency (streak: {self.inefficient_action_streak})")
             
             # Get dynamic exploration rate based on distance from PB
             exploration_rate = self.get_dynamic_exploration_rate()
@@ -903,12 +1116,12 @@ class LearningAI:
             # Try learned behavior first, but skip it if exploration rate is very high
             learned_action = self.get_learned_action(position_key)
             if learned_action and inefficiency_boost < 0.2 and exploration_rate < 50:  # Only use learned when exploration is low
-                print(f"📚 Using learned action: {learned_action}")
+                game_log.debug("decision", f"📚 Using learned action: {learned_action}")
                 return learned_action
             
             # Otherwise explore with dynamic rate + inefficiency boost
             total_boost = (exploration_rate / 100) + inefficiency_boost
-            print(f"🎲 EXPLORING: Dynamic rate {exploration_rate:.0f}% (distance-based)")
+            game_log.debug("decision", f"🎲 EXPLORING: Dynamic rate {exploration_rate:.0f}% (distance-based)")
             chosen_action = self.choose_exploration_action(position_key, exploration_boost=total_boost)
             return chosen_action
     
@@ -927,32 +1140,37 @@ class LearningAI:
         exploration_rate = self.get_dynamic_exploration_rate()
         total_exploration_chance = min(0.9, (exploration_rate / 100) + exploration_boost)
         
-        if random.random() < total_exploration_chance:
+        if self.rng.random() < total_exploration_chance:
+            # PLANNER PRIOR: Explore along the planned route first
+            if self.planner_action is not None and self.rng.random() < self.planner_prior:
+                game_log.debug("decision", f"🗺️ EXPLORING: Planner route: {self.planner_action}")
+                return self.planner_action
+            
             # EXPLORATION: Prioritize UP movement first (survival), then UP+RIGHT
             jump_actions = [a for a in safe_actions if "jump" in a]
             upright_actions = [a for a in safe_actions if "right" in a or "jump" in a]
             
-            if jump_actions and random.random() < 0.85:  # 85% chance to prioritize ANY jumping
+            if jump_actions and self.rng.random() < 0.85:  # 85% chance to prioritize ANY jumping
                 # Further bias toward JUMP+RIGHT within jumping actions
                 jump_right_actions = [a for a in jump_actions if "right" in a]
-                if jump_right_actions and random.random() < 0.7:  # 70% chance for JUMP+RIGHT within jumps
-                    chosen_action = random.choice(jump_right_actions)
-                    print(f"🎲 EXPLORING: UP+RIGHT priority: {chosen_action}")
+                if jump_right_actions and self.rng.random() < 0.7:  # 70% chance for JUMP+RIGHT within jumps
+                    chosen_action = self.rng.choice(jump_right_actions)
+                    game_log.debug("decision", f"🎲 EXPLORING: UP+RIGHT priority: {chosen_action}")
                 else:
-                    chosen_action = random.choice(jump_actions)
-                    print(f"🎲 EXPLORING: UP priority (safety): {chosen_action}")
-            elif upright_actions and random.random() < 0.95:  # 95% chance for remaining UP+RIGHT actions
-                chosen_action = random.choice(upright_actions)
-                print(f"🎲 EXPLORING: UP/RIGHT action: {chosen_action}")
+                    chosen_action = self.rng.choice(jump_actions)
+                    game_log.debug("decision", f"🎲 EXPLORING: UP priority (safety): {chosen_action}")
+            elif upright_actions and self.rng.random() < 0.95:  # 95% chance for remaining UP+RIGHT actions
+                chosen_action = self.rng.choice(upright_actions)
+                game_log.debug("decision", f"🎲 EXPLORING: UP/RIGHT action: {chosen_action}")
             else:
                 # Only 5% chance for other actions (and avoid LEFT when possible)
                 non_left_actions = [a for a in safe_actions if "left" not in a]
                 if non_left_actions:
-                    chosen_action = random.choice(non_left_actions)
-                    print(f"🎲 EXPLORING: Non-left fallback: {chosen_action}")
+                    chosen_action = self.rng.choice(non_left_actions)
+                    game_log.debug("decision", f"🎲 EXPLORING: Non-left fallback: {chosen_action}")
                 else:
-                    chosen_action = random.choice(safe_actions)
-                    print(f"🎲 EXPLORING: Last resort: {chosen_action}")
+                    chosen_action = self.rng.choice(safe_actions)
+                    game_log.debug("decision", f"🎲 EXPLORING: Last resort: {chosen_action}")
             
             return chosen_action
         
@@ -995,11 +1213,11 @@ class LearningAI:
                 if len(action_scores) > 1 and confidence < 0.3:  # Low confidence
                     # Consider top 2-3 actions when not confident
                     top_actions = action_scores[:min(3, len(action_scores))]
-                    chosen_action = random.choice([a[0] for a in top_actions])
-                    print(f"🤔 LOW CONFIDENCE UCB1: Trying {chosen_action} (confidence: {confidence:.2f})")
+                    chosen_action = self.rng.choice([a[0] for a in top_actions])
+                    game_log.debug("decision", f"🤔 LOW CONFIDENCE UCB1: Trying {chosen_action} (confidence: {confidence:.2f})")
                 else:
                     chosen_action = best_action
-                    print(f"🧠 HIGH CONFIDENCE UCB1: Using {chosen_action} (confidence: {confidence:.2f}, UCB1: {raw_ucb1:.2f})")
+                    game_log.debug("decision", f"🧠 HIGH CONFIDENCE UCB1: Using {chosen_action} (confidence: {confidence:.2f}, UCB1: {raw_ucb1:.2f})")
                 
                 return chosen_action
         
@@ -1010,58 +1228,42 @@ class LearningAI:
         if jump_actions:
             # First priority: any jumping action for survival
             jump_right_actions = [a for a in jump_actions if "right" in a]
-            if jump_right_actions and random.random() < 0.7:  # 70% prefer jump+right within jumps
-                chosen_action = random.choice(jump_right_actions)
-                print(f"⬆️➡️ FALLBACK: UP+RIGHT priority: {chosen_action}")
+            if jump_right_actions and self.rng.random() < 0.7:  # 70% prefer jump+right within jumps
+                chosen_action = self.rng.choice(jump_right_actions)
+                game_log.debug("decision", f"⬆️➡️ FALLBACK: UP+RIGHT priority: {chosen_action}")
             else:
-                chosen_action = random.choice(jump_actions)
-                print(f"⬆️ FALLBACK: UP priority (safety): {chosen_action}")
+                chosen_action = self.rng.choice(jump_actions)
+                game_log.debug("decision", f"⬆️ FALLBACK: UP priority (safety): {chosen_action}")
         elif upright_actions:
-            chosen_action = random.choice(upright_actions)
-            print(f"⬆️➡️ FALLBACK: UP/RIGHT action: {chosen_action}")
+            chosen_action = self.rng.choice(upright_actions)
+            game_log.debug("decision", f"⬆️➡️ FALLBACK: UP/RIGHT action: {chosen_action}")
         else:
             # Avoid LEFT if possible, prefer jumping over waiting
             non_left_actions = [a for a in safe_actions if "left" not in a]
             if non_left_actions:
-                chosen_action = random.choice(non_left_actions)
-                print(f"🤷 FALLBACK: Non-left action: {chosen_action}")
+                chosen_action = self.rng.choice(non_left_actions)
+                game_log.debug("decision", f"🤷 FALLBACK: Non-left action: {chosen_action}")
             else:
-                chosen_action = random.choice(safe_actions)
-                print(f"🤷 FALLBACK: Last resort: {chosen_action}")
+                chosen_action = self.rng.choice(safe_actions)
+                game_log.debug("decision", f"🤷 FALLBACK: Last resort: {chosen_action}")
         
         return chosen_action
     
-    def apply_action(self, keys, action):
-        """Apply an action to the keys dictionary"""
-        if action == "move_right":
-            keys[pygame.K_RIGHT] = True
-            keys[pygame.K_d] = True
-        elif action == "move_left":
-            keys[pygame.K_LEFT] = True
-            keys[pygame.K_a] = True
-        elif action == "jump_right":
-            keys[pygame.K_RIGHT] = True
-            keys[pygame.K_d] = True
-            keys[pygame.K_SPACE] = True
-            keys[pygame.K_UP] = True
-            keys[pygame.K_w] = True
-        elif action == "jump_left":
-            keys[pygame.K_LEFT] = True
-            keys[pygame.K_a] = True
-            keys[pygame.K_SPACE] = True
-            keys[pygame.K_UP] = True
-            keys[pygame.K_w] = True
-        elif action == "jump_only":
-            keys[pygame.K_SPACE] = True
-            keys[pygame.K_UP] = True
-            keys[pygame.K_w] = True
-        # "wait" does nothing - no keys pressed
+    def apply_action(self, controls, action):
+        """Apply an action to a ControlState"""
+        # "wait" (or any unknown action) releases every control
+        controls.set_action(action)
     
     def on_death(self):
         """Called when AI dies - enhanced with temporal learning"""
         # Don't count attempts here - let DemoLevel handle that
         self.total_deaths += 1
         
+        if self.q_learner is not None:
+            self.finish_q_episode(Q_DEATH_REWARD)
+            self.last_distance = self.player.rect.centerx
+            return
+        
         # Feel REALLY bad about dying
         death_feeling_intensity = min(8, 3 + self.total_deaths)
         self.feel_emotion("failure", death_feeling_intensity)
@@ -1077,14 +1279,14 @@ class LearningAI:
             self.pb_step_failure_count[self.last_pb_step_attempted] += 1
             failure_count = self.pb_step_failure_count[self.last_pb_step_attempted]
             
-            print(f"📉 PB Route Step {self.last_pb_step_attempted} failed (total failures: {failure_count})")
+            game_log.info("death", f"📉 PB Route Step {self.last_pb_step_attempted} failed (total failures: {failure_count})")
             
             # More strongly penalize the specific action from the pb_route that was last attempted
             if self.last_pb_step_attempted < len(self.pb_route):
                 failed_pos, failed_action, failed_distance = self.pb_route[self.last_pb_step_attempted]
                 self.remember_failure(failed_pos, failed_action)
                 self.feel_emotion("failure", death_feeling_intensity * 1.5, failed_action)  # Extra penalty
-                print(f"💥 Extra penalty for PB route failure: {failed_action} at {failed_pos}")
+                game_log.info("death", f"💥 Extra penalty for PB route failure: {failed_action} at {failed_pos}")
             
             self.last_pb_step_attempted = None  # Reset for next attempt
         
@@ -1092,7 +1294,7 @@ class LearningAI:
         if self.last_distance > self.personal_best_distance:
             old_personal_best = self.personal_best_distance  # Save old value BEFORE updating
             self.personal_best_distance = self.last_distance  # Update to new best
-            print(f"🚀 NEW RECORD! Reached distance: {self.last_distance}")
+            game_log.info("personal_best", f"🚀 NEW RECORD! Reached distance: {self.last_distance}")
             
             # When we make progress, reinforce more of the successful sequence
             success_count = min(5, len(self.pb_route) // 2)
@@ -1102,26 +1304,20 @@ class LearningAI:
                     pos, action, distance = self.pb_route[-(i+1)]  # Get from the end (most recent)
                     self.remember_success(pos, action)
                     self.feel_emotion("success", 1, action)  # Feel good about this action
-        else:
-            # Learn from failure - last few actions probably caused death
-            failure_count = min(3, len(self.pb_route))
-            for i in range(failure_count):
-                if len(self.pb_route) > i:
-                    # pb_route contains (position, action, distance) tuples
-                    pos, action, distance = self.pb_route[-(i+1)]  # Get from the end (most recent)
-                    self.remember_failure(pos, action)
-                    # Feel BAD about actions that led to death
-                    bad_feeling_intensity = 3 - i  # Earlier actions feel less bad
-                    self.feel_emotion("failure", bad_feeling_intensity, action)
+        # (The actions that led to death were already punished through their traces)
         
-        # Clear recent actions on death
-        self.recent_actions = []
+        # Clear the traces on death
+        self.traces.clear()
+        self.last_visited_state = None
         
         # Update last distance for next attempt
         self.last_distance = self.player.rect.centerx
         
         # Decay emotions slightly over time
         self.recent_progress_feeling *= 0.95
+        
+        # Keep the learning tables within their memory budget
+        self.enforce_memory_budget()
     
     def on_victory(self):
         """Called when AI reaches victory - MASSIVE positive emotional boost!"""
@@ -1129,11 +1325,21 @@ class LearningAI:
         # Don't count attempts here - let DemoLevel handle that
         self.total_deaths = 0
         
-        print(f"🏆 VICTORY #{self.victories}! Attempt #{self.attempts}")
+        game_log.info("victory", f"🏆 VICTORY #{self.victories}! Attempt #{self.attempts}")
+        
+        if self.q_learner is not None:
+            self.finish_q_episode(Q_VICTORY_REWARD)
+            self.last_distance = 0
+            return
         
         # Feel AMAZING about winning! VICTORY IS THE ULTIMATE HIGH!
         self.feel_emotion("success", 15)  # SUPER-maximum positive feeling! (higher than normal 10 cap)
         
+        # The actions that finished the level get the most credit
+        self.propagate_temporal_reward("success", 5)
+        self.traces.clear()
+        self.last_visited_state = None
+        
         # Learn from ALL actions in this successful attempt
         for pos, action, distance in self.pb_route:
             self.remember_success(pos, action)
@@ -1143,32 +1349,46 @@ class LearningAI:
         self.last_distance = 0
         self.pb_route = []
         self.stuck_timer = 0.0
+        
+        # Keep the learning tables within their memory budget
+        self.enforce_memory_budget()
+    
+    def get_learning_data(self):
+        """Get the learning tables in their JSON save format"""
+        # Convert tuple keys to strings for JSON serialization
+        data = {
+            "success_memory": {f"{pos}|{action}": count for (pos, action), count in self.success_memory.items()},
+            "failure_memory": {f"{pos}|{action}": count for (pos, action), count in self.failure_memory.items()},
+            "action_attempts": {f"{pos}|{action}": count for (pos, action), count in self.action_attempts.items()},
+            "state_visit_count": self.state_visit_count,
+            "average_progress": {f"{pos}|{action}": progress for (pos, action), progress in self.average_progress.items()},
+            "positive_reinforcement": self.positive_reinforcement,
+            "negative_reinforcement": self.negative_reinforcement,
+            "personal_best_distance": self.personal_best_distance,
+            "pb_route": self.pb_route,
+            "total_deaths": self.total_deaths,
+            "victories": self.victories,
+            "recent_progress_feeling": self.recent_progress_feeling,
+            "inefficient_action_streak": getattr(self, 'inefficient_action_streak', 0)
+        }
+        q_learning_data = self.q_learner.get_data() if self.q_learner is not None else self.q_learning_data
+        if q_learning_data is not None:
+            data["q_learning"] = q_learning_data
+        return data
     
     def save_learning_data(self):
         """Save AI learning data to JSON file"""
+        if not self.persist_to_disk:
+            return
+        
         try:
-            # Convert tuple keys to strings for JSON serialization
-            save_data = {
-                "success_memory": {f"{pos}|{action}": count for (pos, action), count in self.success_memory.items()},
-                "failure_memory": {f"{pos}|{action}": count for (pos, action), count in self.failure_memory.items()},
-                "action_attempts": {f"{pos}|{action}": count for (pos, action), count in self.action_attempts.items()},
-                "state_visit_count": self.state_visit_count,
-                "average_progress": {f"{pos}|{action}": progress for (pos, action), progress in self.average_progress.items()},
-                "positive_reinforcement": self.positive_reinforcement,
-                "negative_reinforcement": self.negative_reinforcement,
-                "personal_best_distance": self.personal_best_distance,
-                "pb_route": self.pb_route,
-                "total_deaths": self.total_deaths,
-                "victories": self.victories,
-                "recent_progress_feeling": self.recent_progress_feeling,
-                "inefficient_action_streak": getattr(self, 'inefficient_action_streak', 0)
-            }
+            save_data = self.get_learning_data()
             
             with open("ai_learning_data.json", "w") as f:
                 json.dump(save_data, f, indent=2)
                 
         except Exception as e:
-            print(f"Failed to save learning data: {e}")
+            game_log.error("learning_data", f"Failed to save learning data: {e}")
     
     def load_learning_data(self):
         """Load AI learning data from JSON file"""
@@ -1176,63 +1396,78 @@ class LearningAI:
             with open("ai_learning_data.json", "r") as f:
                 data = json.load(f)
             
-            # Handle new format with tuple keys
-            if "success_memory" in data and isinstance(next(iter(data["success_memory"].keys()), ""), str):
-                # New format: convert string keys back to tuples
-                self.success_memory = {}
-                for pos_action_str, count in data["success_memory"].items():
-                    if "|" in pos_action_str:
-                        parts = pos_action_str.split("|", 1)  # Split only on first |
-                        pos_str, action = parts[0], parts[1]
-                        self.success_memory[(pos_str, action)] = count
+            self.apply_learning_data(data)
+            
+            game_log.info("learning_data", f"📖 Loaded AI learning data: {len(self.success_memory)} learned actions")
                 
-                self.failure_memory = {}
-                for pos_action_str, count in data["failure_memory"].items():
-                    if "|" in pos_action_str:
-                        parts = pos_action_str.split("|", 1)
-                        pos_str, action = parts[0], parts[1]
-                        self.failure_memory[(pos_str, action)] = count
+        except FileNotFoundError:
+            game_log.info("learning_data", "📖 No previous learning data found - starting fresh!")
+        except Exception as e:
+            game_log.warning("learning_data", f"⚠️ Error loading learning data: {e}")
+            game_log.info("learning_data", "📖 Starting with fresh learning data...")
+    
+    def apply_learning_data(self, data):
+        """Replace the learning tables with data in the JSON save format"""
+        # Handle new format with tuple keys
+        if "success_memory" in data and isinstance(next(iter(data["success_memory"].keys()), ""), str):
+            # New format: convert string keys back to tuples
+            self.success_memory = {}
+            for pos_action_str, count in data["success_memory"].items():
+                if "|" in pos_action_str:
+                    parts = pos_action_str.split("|", 1)  # Split only on first |
+                    pos_str, action = parts[0], parts[1]
+                    self.success_memory[(pos_str, action)] = count
                 
-                self.action_attempts = {}
-                for pos_action_str, count in data.get("action_attempts", {}).items():
-                    if "|" in pos_action_str:
-                        parts = pos_action_str.split("|", 1)
-                        pos_str, action = parts[0], parts[1]
-                        self.action_attempts[(pos_str, action)] = count
+            self.failure_memory = {}
+            for pos_action_str, count in data["failure_memory"].items():
+                if "|" in pos_action_str:
+                    parts = pos_action_str.split("|", 1)
+                    pos_str, action = parts[0], parts[1]
+                    self.failure_memory[(pos_str, action)] = count
                 
-                self.average_progress = {}
-                for pos_action_str, progress in data.get("average_progress", {}).items():
-                    if "|" in pos_action_str:
-                        parts = pos_action_str.split("|", 1)
-                        pos_str, action = parts[0], parts[1]
-                        self.average_progress[(pos_str, action)] = progress
+            self.action_attempts = {}
+            for pos_action_str, count in data.get("action_attempts", {}).items():
+                if "|" in pos_action_str:
+                    parts = pos_action_str.split("|", 1)
+                    pos_str, action = parts[0], parts[1]
+                    self.action_attempts[(pos_str, action)] = count
                 
-                self.state_visit_count = data.get("state_visit_count", {})
-            else:
-                # Legacy format or empty data
-                self.success_memory = {}
-                self.failure_memory = {}
-                self.action_attempts = {}
-                self.average_progress = {}
-                self.state_visit_count = {}
+            self.average_progress = {}
+            for pos_action_str, progress in data.get("average_progress", {}).items():
+                if "|" in pos_action_str:
+                    parts = pos_action_str.split("|", 1)
+                    pos_str, action = parts[0], parts[1]
+                    self.average_progress[(pos_str, action)] = progress
+                
+            self.state_visit_count = data.get("state_visit_count", {})
+        else:
+            # Legacy format or empty data
+            self.success_memory = {}
+            self.failure_memory = {}
+            self.action_attempts = {}
+            self.average_progress = {}
+            self.state_visit_count = {}
             
-            # Load other data with fallbacks
-            self.positive_reinforcement = data.get("positive_reinforcement", {})
-            self.negative_reinforcement = data.get("negative_reinforcement", {})
-            self.personal_best_distance = data.get("personal_best_distance", 0)
-            self.pb_route = data.get("pb_route", [])
-            self.total_deaths = data.get("total_deaths", 0)
-            self.victories = data.get("victories", 0)
-            self.recent_progress_feeling = data.get("recent_progress_feeling", 0.0)
-            self.inefficient_action_streak = data.get("inefficient_action_streak", 0)
+        # Load other data with fallbacks
+        self.positive_reinforcement = data.get("positive_reinforcement", {})
+        self.negative_reinforcement = data.get("negative_reinforcement", {})
+        self.personal_best_distance = data.get("personal_best_distance", 0)
+        self.pb_route = data.get("pb_route", [])
+        self.total_deaths = data.get("total_deaths", 0)
+        self.victories = data.get("victories", 0)
+        self.recent_progress_feeling = data.get("recent_progress_feeling", 0.0)
+        self.inefficient_action_streak = data.get("inefficient_action_streak", 0)
+        
+        # Q-learning backend table
+        self.q_learning_data = data.get("q_learning")
+        if self.q_learner is not None and self.q_learning_data is not None:
+            self.q_learner.load_data(self.q_learning_data)
             
-            print(f"📖 Loaded AI learning data: {len(self.success_memory)} learned actions")
-                
-        except FileNotFoundError:
-            print("📖 No previous learning data found - starting fresh!")
-        except Exception as e:
-            print(f"⚠️ Error loading learning data: {e}")
-            print("📖 Starting with fresh learning data...")
+        # Rebuild running aggregates for the loaded tables
+        self.rebuild_learning_stats()
+        
+        # Saved tables may predate the budget (or a smaller one)
+        self.enforce_memory_budget(decay=False)
     
     def erase_learning_data(self):
         """Erase all enhanced learning data"""
@@ -1248,21 +1483,30 @@ class LearningAI:
         self.attempts = 0
         self.victories = 0
         self.total_deaths = 0
-        self.recent_actions = []  # NEW
+        self.traces.clear()
+        self.last_visited_state = None
+        self.rebuild_learning_stats()
+        self.q_learning_data = None
+        if self.q_learner is not None:
+            self.q_learner = QLearner()
+            self.q_step = None
+            self.q_hold = 0
         
         # Delete the save file
+        if not self.persist_to_disk:
+            return
         try:
             if os.path.exists('ai_learning_data.json'):
                 os.remove('ai_learning_data.json')
-            print("🗑️ All enhanced learning data erased!")
+            game_log.info("learning_data", "🗑️ All enhanced learning data erased!")
         except Exception as e:
-            print(f"❌ Failed to delete save file: {e}")
+            game_log.error("learning_data", f"❌ Failed to delete save file: {e}")
     
     def toggle_learning(self):
         """Start/stop the learning process"""
         self.learning_active = not self.learning_active
         status = "STARTED" if self.learning_active else "STOPPED"
-        print(f"⏯️ Learning {status}")
+        game_log.info("controls", f"⏯️ Learning {status}")
         return self.learning_active
     
     def get_learning_stats(self):
@@ -1270,20 +1514,12 @@ class LearningAI:
         success_rate = (self.victories / max(1, self.attempts)) * 100
         exploration_rate = self.get_dynamic_exploration_rate()
         
-        # Calculate average confidence across all known states
-        total_confidence = 0
-        confidence_count = 0
-        for (position_key, action) in self.action_attempts:
-            confidence = self.get_action_confidence(position_key, action)
-            if confidence > 0:
-                total_confidence += confidence
-                confidence_count += 1
-        
-        avg_confidence = total_confidence / max(1, confidence_count)
+        # Average confidence across all known states (maintained incrementally)
+        avg_confidence = self.total_confidence / max(1, self.confidence_count)
         
         # Calculate state space coverage
         total_states_visited = len(self.state_visit_count)
-        well_explored_states = sum(1 for visits in self.state_visit_count.values() if visits >= 3)
+        well_explored_states = self.well_explored_count
         
         return {
             'attempts': self.attempts,
@@ -1291,7 +1527,7 @@ class LearningAI:
             'success_rate': success_rate,
             'total_deaths': self.total_deaths,
             'personal_best': self.personal_best_distance,
-            'known_positions': len(self.success_memory),
+            'known_positions': len(self.q_learner.table) if self.q_learner is not None else len(self.success_memory),
             'exploration_rate': exploration_rate,
             'emotional_score': self.recent_progress_feeling,
             'positive_associations': len(self.positive_reinforcement),
@@ -1301,30 +1537,173 @@ class LearningAI:
             'total_states_visited': total_states_visited,
             'well_explored_states': well_explored_states,
             'state_coverage_ratio': well_explored_states / max(1, total_states_visited),
-            'recent_actions_count': len(self.recent_actions),
+            'recent_actions_count': len(self.traces),
+            'evicted_states': self.evicted_states,
             'ucb1_exploration_param': self.ucb1_c
         }
 
+def shared_memory(name):
+    """Property that reads and writes an attribute of the AI a ghost explores for"""
+    return property(lambda self: getattr(self.memory, name),
+                    lambda self, value: setattr(self.memory, name, value))
+
+class GhostAI(LearningAI):
+    """A LearningAI exploring for another one, learning straight into its memory
+
+    The learning tables (SHARED_MEMORY) are the other AI's own, so whatever a ghost
+    learns the AI uses on its next decision, and erasing or loading the AI's data
+    takes the ghosts along. Each ghost has its own player, random stream, feelings
+    and personal best route, and never saves anything itself.
+    """
+    def __init__(self, memory, player, rng):
+        # Start from the AI's settings and feelings, then give the ghost its own episode
+        vars(self).update((name, value) for name, value in vars(memory).items() if name not in SHARED_MEMORY)
+        self.memory = memory
+        self.player = player
+        self.rng = rng
+        self.persist_to_disk = False
+        self.planner = None  # The planner follows the AI's own player
+        self.planner_action = None
+        self.traces = EligibilityTraces(TRACE_DECAY, TRACE_CUTOFF)
+        self.pb_route = []
+        self.pb_recovery_mode = False
+        self.pb_route_index = 0
+        self.pb_step_failure_count = {}
+        self.last_pb_step_attempted = None
+        self.attempts = 0
+        self.total_deaths = 0
+        self.victories = 0
+        self.last_distance = 0
+        self.last_action = None
+        self.last_position = None
+        self.last_visited_state = None
+        self.stuck_timer = 0.0
+        self.inefficient_action_streak = 0
+
+    def update_world(self, dt):
+        pass  # The demo updates the level once a frame for every agent
+
+for _name in SHARED_MEMORY:
+    setattr(GhostAI, _name, shared_memory(_name))
+
+class GhostAgents:
+    """Ghost agents exploring the demo level alongside the learning AI
+
+    Each ghost is a GhostAI driving a Ghost player: it plays its own attempts from
+    the demo's start with its own random stream, and learns into the AI's memory.
+    Ghosts see the same level but don't change it (no platform effects, no power-ups).
+    """
+    def __init__(self, ai, count, start, character_config, world_width):
+        self.ai = ai
+        self.start = start
+        self.attempts = 0
+        self.victories = 0
+        self.agents = []
+        for _ in range(count):
+            player = Ghost(start[0], start[1], character_config)
+            player.world_width = world_width
+            # Seeds come from the demo's random stream, so a recorded demo replays with the same ghosts
+            self.agents.append(GhostAI(ai, player, random.Random(random.randrange(2 ** 32))))
+        game_log.info("ghosts", f"👻 {count} ghost agents exploring for the learning AI")
+
+    def __len__(self):
+        return len(self.agents)
+
+    def update(self, dt, victory_zone, ground_y):
+        """Run every ghost for a frame, restarting the ones that won or fell"""
+        if not self.ai.learning_active:
+            return
+        platforms = self.ai.platforms
+        for agent in self.agents:
+            agent.update(dt)
+            # The demo moves its own player again after the AI has (see DemoLevel.update)
+            player = agent.player
+            player.update(platforms)
+            if victory_zone.colliderect(player.rect):
+                agent.attempts += 1
+                self.attempts += 1
+                self.victories += 1
+                agent.on_victory()
+                self.restart(agent)
+            elif player.rect.bottom >= ground_y:
+                agent.attempts += 1
+                self.attempts += 1
+                agent.on_death()
+                self.restart(agent)
+
+    def restart(self, agent):
+        agent.player.respawn(*self.start)
+        agent.on_restart()
+
+    def queue_draw(self, render_queue, camera=None):
+        """Queue every ghost's current frame at its position"""
+        cx, cy = (camera.x, camera.y) if camera is not None else (0, 0)
+        render_queue.extend([(agent.player.image, (agent.player.rect.x - cx, agent.player.rect.y - cy))
+                             for agent in self.agents], GHOST_LAYER)
+
 class DemoLevel:
     """Learning AI Demo that shows AI getting smarter over time"""
     
-    def __init__(self, screen, character_config, main_game):
+    def __init__(self, screen, character_config, main_game, learning_data=None, controller="learning", ghosts=0,
+                 frontier=False):
         self.screen = screen
         self.character_config = character_config
-        self.theme = THEMES[character_config['theme']]
-        
-        # Copy game world from main game
-        self.all_sprites = main_game.all_sprites.copy()
-        self.platforms = main_game.platforms.copy()
-        self.powerups = main_game.powerups.copy()
-        self.victory_zone = main_game.victory_zone
+        self.theme_key = character_config['theme']
+        self.theme = THEMES[self.theme_key]
+        
+        # Build the AI's own copy of the main game's level
+        self.level = main_game.level
+        prewarmer = getattr(main_game, "prewarmer", None)
+        prebuilt = prewarmer.take_level(self.level.name, character_config['theme'], "demo") if prewarmer else None
+        if prebuilt is not None:
+            # Built while the character select menu was open
+            _, self.all_sprites, self.platforms, self.powerups, _ = prebuilt
+        else:
+            self.all_sprites = pygame.sprite.Group()
+            self.platforms = PlatformGroup()
+            self.powerups = pygame.sprite.Group()
+            build_level(self.level, self.theme, self.platforms, self.all_sprites, self.powerups)
+        # Every timer in the demo (power-ups, platforms) runs on one clock
+        self.timers = Scheduler()
+        self.platforms.timers = self.timers
+        self.all_powerups = self.powerups.sprites()  # Including collected ones, for restore()
+        self.victory_zone = pygame.Rect(self.level.victory_zone)
+        self.world_height = self.level.world_height
+        self.ground_y = self.level.ground_y
+        
+        # The learning AI keeps its original start; the planner starts from the level's spawn
+        self.controller = controller
+        self.start = tuple(self.level.spawn) if controller in ("planner", "guided") else (200, WORLD_HEIGHT - 200)
         
         # Create AI player
-        self.player = Player(200, WORLD_HEIGHT - 200, character_config)
+        self.player = Player(self.start[0], self.start[1], character_config, self.timers)
+        self.player.world_width = self.level.world_width
         self.all_sprites.add(self.player)
+        self.render_queue = RenderQueue(self.screen)
         
         # Create Learning AI controller
-        self.ai = LearningAI(self.player, self.platforms, self.powerups, self.victory_zone)
+        self.ai = LearningAI(self.player, self.platforms, self.powerups, self.victory_zone, learning_data,
+                             backend="qlearning" if controller == "qlearning" else "emotion")
+        
+        # Graph planner: drives the player itself, or guides the learning AI's exploration
+        self.planner = None
+        if controller in ("planner", "guided"):
+            self.planner = GraphPlanner(self.player, self.platforms, self.level)
+            route = self.planner.route_from(self.planner.graph.spawn_platform)
+            game_log.info("planner", f"🗺️ Planner route: {len(route) - 1} jumps from platform {self.planner.graph.spawn_platform}")
+            if controller == "guided":
+                self.ai.planner = self.planner
+        
+        # Ghost agents learning into the AI's memory (the emotion backend's tables only)
+        self.ghosts = None
+        if ghosts and controller in ("learning", "guided"):
+            self.ghosts = GhostAgents(self.ai, ghosts, self.start, character_config, self.level.world_width)
+        elif ghosts:
+            game_log.warning("ghosts", f"👻 Ghost agents need the learning AI's own tables, not the {controller} controller")
+        
+        # Archive of world snapshots at the cells reached, for attempts that start at the frontier
+        self.frontier = FrontierArchive() if frontier else None
+        self.frontier_start = None  # Cell x the current attempt started from (None: the level's start)
         
         # Demo state
         self.demo_complete = False
@@ -1344,24 +1723,27 @@ class DemoLevel:
     
     def update(self, dt):
         """Update learning demo logic"""
+        # Fire the timers that came due this frame
+        self.timers.advance(dt)
         self.demo_timer += dt
         self.attempt_timer += dt
         self.button_cooldown = max(0, self.button_cooldown - dt)
         
-        # Update AI
-        self.ai.update(dt)
+        # Update AI (the planner only picks controls; the player moves once, below)
+        if self.controller == "planner":
+            if self.ai.learning_active:
+                self.player.controls.set_action(self.planner.next_action())
+            else:
+                self.player.controls.clear()
+            self.player.apply_controls()
+        else:
+            self.ai.update(dt)
         
         # Update player
         self.player.update(self.platforms)
         
-        # Update platforms
-        for platform in self.platforms:
-            platform.update(dt)
-            
-            # Special handling for teleporter elevator
-            if hasattr(platform, 'rider') and platform.rider:
-                if not self.player.rect.colliderect(platform.rect):
-                    platform.remove_rider()
+        # Update the platforms that are moving or mid-effect
+        self.platforms.update(dt)
         
         # Update power-ups
         for powerup in self.powerups:
@@ -1377,65 +1759,126 @@ class DemoLevel:
                 self.powerups.remove(powerup)
                 self.all_sprites.remove(powerup)
         
+        # Ghost agents play their own attempts in the same level
+        if self.ghosts is not None:
+            self.ghosts.update(dt, self.victory_zone, self.ground_y)
+        
         # Check for victory
         if self.victory_zone.colliderect(self.player.rect):
             if not self.attempt_counted:  # Safety check
                 self.ai.attempts += 1  # Count the completed attempt
-                self.ai.on_victory()
+                if self.controller == "planner":
+                    self.ai.victories += 1
+                    game_log.info("victory", f"🏆 PLANNER VICTORY #{self.ai.victories}! Attempt #{self.ai.attempts}")
+                else:
+                    self.ai.on_victory()
                 self.attempt_counted = True  # Mark attempt as counted
                 self.restart_attempt()
         
         # Check for death (restart learning attempt)
-        elif self.player.rect.bottom >= WORLD_HEIGHT - GROUND_HEIGHT:
+        elif self.player.rect.bottom >= self.ground_y:
             if not self.attempt_counted:  # Safety check
                 self.ai.attempts += 1  # Count the completed attempt
-                self.ai.on_death()
+                if self.controller == "planner":
+                    self.ai.total_deaths += 1
+                    self.planner.on_death()
+                else:
+                    self.ai.on_death()
                 self.attempt_counted = True  # Mark attempt as counted
                 self.restart_attempt()
+        
+        # Archive the world the first time the player stands in a cell
+        elif self.frontier is not None and self.player.on_ground:
+            self.frontier.offer(self.player.rect, self.snapshot)
+    
+    def snapshot(self):
+        """Everything the simulation's next frame depends on: timers, platforms, power-ups, player and AI attempt
+
+        Shallow where it can be: surfaces and event lists are shared with the live
+        objects, which replace rather than change them. restore() puts it all back.
+        """
+        return (self.timers.snapshot(), self.platforms.snapshot(), self.powerups.sprites(),
+                [(powerup, powerup.snapshot()) for powerup in self.all_powerups],
+                self.player.snapshot(), self.ai.snapshot())
+    
+    def restore(self, state):
+        timers, platforms, powerups, powerup_states, player, ai = state
+        self.timers.restore(timers)
+        self.platforms.restore(platforms)
+        for powerup, powerup_state in powerup_states:
+            powerup.restore(powerup_state)
+        # Collected power-ups come back (the AI's own collection only takes them out of self.powerups)
+        self.powerups.empty()
+        self.powerups.add(powerups)
+        for powerup in self.all_powerups:
+            if powerup in self.powerups:
+                self.all_sprites.add(powerup)
+            else:
+                self.all_sprites.remove(powerup)
+        self.player.restore(player)
+        self.ai.restore(ai)
     
     def restart_attempt(self):
         """Restart the learning attempt"""
         # Reset attempt counting flag for new attempt
         self.attempt_counted = False
         
-        # Reset player position to start
-        self.player.rect.x = 200  # Starting x position  
-        self.player.rect.y = WORLD_HEIGHT - 200  # Starting y position
-        
-        # Reset player physics
-        self.player.vel_x = 0
-        self.player.vel_y = 0
-        self.player.on_ground = False
-        self.player.jump_count = 0
+        # Most attempts start from a frontier cell once there are some
+        snapshot = None
+        if self.frontier is not None and len(self.frontier) and random.random() < FRONTIER_START_CHANCE:
+            snapshot = self.frontier.choose()
+        if snapshot is not None:
+            # The whole world goes back to when the player first stood there
+            self.restore(snapshot)
+            self.frontier_start = self.player.rect.centerx
+        else:
+            self.frontier_start = None
+            
+            # Reset player position to start
+            self.player.rect.x = self.start[0]  # Starting x position
+            self.player.rect.y = self.start[1]  # Starting y position
+            
+            # Reset player physics
+            self.player.vel_x = 0
+            self.player.vel_y = 0
+            self.player.on_ground = False
+            self.player.jump_count = 0
+            
+            # Clear power-ups
+            self.player.effects.clear()
         
-        # Clear power-ups
-        self.player.active_powerups.clear()
+        # The planner picks up again wherever the player lands
+        if self.planner is not None:
+            self.planner.reset()
+        self.ai.on_restart()
         
         # Reset attempt timer for this run
         self.attempt_timer = 0.0
     
     def handle_controls(self, keys_just_pressed):
         """Handle manual learning controls"""
-        if keys_just_pressed.get(pygame.K_s, False):
+        if pygame.K_s in keys_just_pressed:
             self.ai.save_learning_data()
-            print("💾 Learning data saved manually!")
+            game_log.info("controls", "💾 Learning data saved manually!")
             
-        elif keys_just_pressed.get(pygame.K_p, False):
+        elif pygame.K_p in keys_just_pressed:
             self.ai.toggle_learning()
             status = "ACTIVE" if self.ai.learning_active else "PAUSED"
-            print(f"🧠 Learning {status}")
+            game_log.info("controls", f"🧠 Learning {status}")
             
-        elif keys_just_pressed.get(pygame.K_e, False):
+        elif pygame.K_e in keys_just_pressed:
             self.ai.erase_learning_data()
-            print("🗑️ All learning data erased!")
+            if self.frontier is not None:
+                self.frontier.clear()
+            game_log.info("controls", "🗑️ All learning data erased!")
             
-        elif keys_just_pressed.get(pygame.K_r, False):
+        elif pygame.K_r in keys_just_pressed:
             # Restart current attempt
             self.restart_attempt()
-            print("🔄 Attempt restarted!")
+            game_log.info("controls", "🔄 Attempt restarted!")
             
         # EXPERIMENT: COMMENTING OUT B KEY - MANUAL PB OVERRIDE FOR TESTING
-        # elif keys_just_pressed.get(pygame.K_b, False):
+        # elif pygame.K_b in keys_just_pressed:
         #     # Manual override - force AI to go to Personal Best
         #     if self.ai.personal_best_distance > 0:
         #         self.ai.manual_pb_override = True
@@ -1493,7 +1936,11 @@ class DemoLevel:
         current_x = self.ai.player.rect.centerx
         at_pb_location = current_x >= (self.ai.personal_best_distance - 100)
         
-        if at_pb_location:
+        if self.controller == "planner":
+            route = self.planner.route_from(self.planner.platform)
+            mode_status = f"🗺️ PLANNER MODE: {max(0, len(route) - 1)} jumps to the goal"
+            mode_color = self.theme['glow_color']
+        elif at_pb_location:
             mode_status = "🎯 AT PERSONAL BEST: Exploring for new paths"
             mode_color = GREEN
         else:
@@ -1503,6 +1950,19 @@ class DemoLevel:
         mode_surface = self.font_medium.render(mode_status, True, mode_color)
         self.screen.blit(mode_surface, (20, 50))
         
+        # Ghost agents' share of the experience
+        if self.ghosts is not None:
+            ghost_text = f"👻 {len(self.ghosts)} ghosts: {self.ghosts.attempts} attempts, {self.ghosts.victories} victories"
+            ghost_surface = self.font_small.render(ghost_text, True, self.theme['glow_color'])
+            self.screen.blit(ghost_surface, (SCREEN_WIDTH - ghost_surface.get_width() - 20, 20))
+        
+        # Frontier archive and where this attempt started
+        if self.frontier is not None:
+            start = f"{self.frontier_start}" if self.frontier_start is not None else "level start"
+            frontier_text = f"🧭 Frontier: {len(self.frontier)} cells, furthest {self.frontier.furthest}, started at {start}"
+            frontier_surface = self.font_small.render(frontier_text, True, self.theme['glow_color'])
+            self.screen.blit(frontier_surface, (SCREEN_WIDTH - frontier_surface.get_width() - 20, 45))
+        
         # PB Recovery Mode indicator - UPDATED
         if stats['recovery_mode']:
             recovery_text = f"🔄 PB RECOVERY ACTIVE - Target: {stats['personal_best']:.0f}"
@@ -1615,19 +2075,20 @@ class DemoLevel:
             y_pos = SCREEN_HEIGHT - 180 + (i * 20)
             self.screen.blit(text, (20, y_pos))
     
-    def draw_background(self):
+    def draw_background(self, camera):
         """Draw themed background"""
-        self.screen.fill(self.theme['bg_color'])
+        backgrounds.renderer(self.theme_key).draw(self.screen, camera)
     
     def draw(self, camera):
         """Draw the learning demo level"""
         # Draw background
-        self.draw_background()
+        self.draw_background(camera)
         
         # Draw all sprites with camera offset
-        for sprite in self.all_sprites:
-            sprite_rect = camera.apply(sprite.rect)
-            self.screen.blit(sprite.image, sprite_rect)
+        self.render_queue.add_sprites(self.all_sprites, camera)
+        if self.ghosts is not None:
+            self.ghosts.queue_draw(self.render_queue, camera)
+        self.render_queue.draw()
         
         # Draw learning UI on top
         self.draw_learning_ui()
@@ -1644,7 +2105,7 @@ class DemoLevel:
     
     def should_exit(self, keys_just_pressed):
         """Check if should exit demo"""
-        return keys_just_pressed.get(pygame.K_ESCAPE, False) 
+        return pygame.K_ESCAPE in keys_just_pressed
 
     def is_near_platform_edge(self):
         """Check if player is near the edge of a platform"""
@@ -0,0 +1,55 @@
+import math
+from array import array
+
+class EligibilityTraces:
+    """Replacing eligibility traces over (state key, action) pairs
+
+    A pair's trace is 1 when it is taken and decays by `decay` every step after
+    (a step is a visit(): one decision, for the demo's learning AI, not a frame).
+    Instead of decaying every trace each step, each pair stores the step it was
+    last taken and its trace is decay ** (steps since). The steps taken within the
+    horizon (where a trace is still above `cutoff`) sit in a ring buffer, so a step
+    costs O(1) and crediting a reward costs O(horizon) however long the traces are.
+    """
+    def __init__(self, decay=0.9, cutoff=0.05):
+        self.decay = decay
+        self.cutoff = cutoff
+        self.horizon = max(1, int(math.log(cutoff) / math.log(decay)) + 1)
+        self.clear()
+
+    def clear(self):
+        """Forget every trace (at the end of an attempt)"""
+        self.pairs = {}  # (state key, action) -> number
+        self.keys = []  # number -> (state key, action)
+        self.last_step = array("l")  # number -> step it was last taken
+        self.recent = array("l", [-1]) * self.horizon  # ring buffer: step % horizon -> number
+        self.step = 0
+
+    def visit(self, state_key, action):
+        """Take an action: its trace goes back to 1 and every other trace decays one step"""
+        key = (state_key, action)
+        number = self.pairs.get(key)
+        if number is None:
+            number = self.pairs[key] = len(self.keys)
+            self.keys.append(key)
+            self.last_step.append(0)
+        self.step += 1
+        self.last_step[number] = self.step
+        self.recent[self.step % self.horizon] = number
+
+    def traced(self):
+        """(state key, action, trace) for every pair with a trace above the cutoff, most recent first"""
+        traced = []
+        step = self.step
+        trace = 1.0
+        for age in range(min(self.horizon, step)):
+            number = self.recent[(step - age) % self.horizon]
+            # Older entries for a pair taken again since are superseded (replacing traces)
+            if self.last_step[number] == step - age and trace >= self.cutoff:
+                state_key, action = self.keys[number]
+                traced.append((state_key, action, trace))
+            trace *= self.decay
+        return traced
+
+    def __len__(self):
+        return len(self.traced())
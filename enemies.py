@@ -1,9 +1,15 @@
 import pygame
-import math
 from settings import *
 
 class Enemy(pygame.sprite.Sprite):
-    """Base enemy class - to be expanded in future phases"""
+    """Base enemy class - to be expanded in future phases
+
+    The attributes set here are each enemy's starting state. Enemies don't update
+    themselves: EnemyManager (enemy_manager.py) copies that state into arrays and
+    moves every enemy of a type in one pass.
+    """
+    _layer = 2  # Drawn above platforms and power-ups (see render_queue.py)
+    
     def __init__(self, x, y, theme=None):
         super().__init__()
         
@@ -25,10 +31,15 @@ class Enemy(pygame.sprite.Sprite):
         self.vel_y = 0
         self.on_ground = False
     
-    def update(self, dt, platforms):
-        """Update enemy behavior - to be expanded"""
-        pass
-    
+    def respawn(self, x, y):
+        """Reset a pooled enemy to its starting state at (x, y), keeping its surface"""
+        self.rect.topleft = (x, y)
+        self.health = 1
+        self.direction = 1
+        self.vel_x = 0
+        self.vel_y = 0
+        self.on_ground = False
+
     def take_damage(self):
         """Handle taking damage"""
         self.health -= 1
@@ -42,17 +53,12 @@ class Walker(Enemy):
         self.patrol_start = patrol_start
         self.patrol_end = patrol_end
         self.speed = 40
-    
-    def update(self, dt, platforms):
-        """Simple patrol behavior"""
-        # Move horizontally
-        self.rect.x += self.direction * self.speed * dt
-        
-        # Turn around at patrol boundaries
-        if self.direction > 0 and self.rect.x >= self.patrol_end:
-            self.direction = -1
-        elif self.direction < 0 and self.rect.x <= self.patrol_start:
-            self.direction = 1
+        self.spawner = None  # The Spawner that made it, for walkers from a spawner's pool
+
+    def respawn(self, x, y, patrol_start=None, patrol_end=None):
+        super().respawn(x, y)
+        self.patrol_start = x if patrol_start is None else patrol_start
+        self.patrol_end = x if patrol_end is None else patrol_end
 
 class Jumper(Enemy):
     """Enemy that hops around"""
@@ -60,24 +66,6 @@ class Jumper(Enemy):
         super().__init__(x, y, theme)
         self.jump_timer = 0
         self.jump_interval = 2.0  # Jump every 2 seconds
-    
-    def update(self, dt, platforms):
-        """Hopping behavior"""
-        self.jump_timer += dt
-        
-        # Apply gravity
-        self.vel_y += PLAYER_GRAVITY
-        if self.vel_y > PLAYER_MAX_FALL_SPEED:
-            self.vel_y = PLAYER_MAX_FALL_SPEED
-        
-        # Jump periodically
-        if self.jump_timer >= self.jump_interval and self.on_ground:
-            self.vel_y = PLAYER_JUMP_SPEED * 0.7  # Smaller jumps than player
-            self.jump_timer = 0
-            self.on_ground = False
-        
-        # Update position
-        self.rect.y += self.vel_y
 
 class Flyer(Enemy):
     """Enemy that flies in patterns"""
@@ -88,20 +76,7 @@ class Flyer(Enemy):
         self.pattern_width = pattern_width
         self.pattern_height = pattern_height
         self.angle = 0
-        self.speed = 60
-    
-    def update(self, dt, platforms):
-        """Figure-8 or circular flying pattern"""
-        self.angle += self.speed * dt
-        if self.angle >= 360:
-            self.angle -= 360
-        
-        # Circular pattern
-        offset_x = math.cos(math.radians(self.angle)) * self.pattern_width
-        offset_y = math.sin(math.radians(self.angle * 2)) * self.pattern_height
-        
-        self.rect.centerx = self.start_x + offset_x
-        self.rect.centery = self.start_y + offset_y
+        self.speed = 60  # degrees per second around the loop
 
 class Guard(Enemy):
     """Stationary enemy that activates when player is near"""
@@ -112,22 +87,32 @@ class Guard(Enemy):
         
         # Make guards look different (darker red)
         self.image.fill((150, 0, 0))
-    
-    def update(self, dt, platforms, player_pos=None):
-        """Alert when player is nearby"""
-        if player_pos:
-            distance = math.sqrt((self.rect.centerx - player_pos[0])**2 + 
-                               (self.rect.centery - player_pos[1])**2)
-            
-            if distance <= self.detection_range:
-                self.alert = True
-                # Could add alert behavior here (sound, color change, etc.)
-            else:
-                self.alert = False
+
+class Shooter(Enemy):
+    """Stationary enemy that fires projectiles at the player when in range"""
+    def __init__(self, x, y, fire_interval=1.5, fire_range=400, theme=None):
+        super().__init__(x, y, theme)
+        self.fire_interval = fire_interval  # Seconds between shots
+        self.fire_range = fire_range
+        self.fire_timer = 0
+
+        # Orange, so it stands out from the other enemies
+        self.image.fill((230, 120, 0))
+
+class Spawner(Enemy):
+    """Stationary enemy that sends out a walker every spawn_interval seconds, up to max_spawned at a time"""
+    def __init__(self, x, y, spawn_interval=4.0, max_spawned=3, theme=None):
+        super().__init__(x, y, theme)
+        self.spawn_interval = spawn_interval
+        self.max_spawned = max_spawned
+        self.spawn_timer = 0
+
+        # Bigger than the walkers it makes
+        self.image = pygame.Surface((32, 32))
+        self.image.fill((110, 0, 150))
+        self.rect = self.image.get_rect(topleft=(x, y))
 
 # TODO: Future enemy types to implement:
-# - Shooter: Fires projectiles at player
 # - Chaser: Follows player when detected
 # - Bouncer: Bounces off walls and platforms
-# - Boss: Large enemy with multiple attacks
-# - Spawner: Creates other enemies periodically 
\ No newline at end of file
+# - Boss: Large enemy with multiple attacks
\ No newline at end of file
@@ -0,0 +1,500 @@
+import math
+from array import array
+import pygame
+from settings import *
+from enemies import Walker, Jumper, Flyer, Guard, Shooter, Spawner
+from entity_pool import ProjectilePool, SpritePool, PROJECTILE_SPEED
+from surfaces import normalize
+from timers import Scheduler
+
+# Side of the square cells enemies and platforms are bucketed into for queries (pixels)
+CELL_SIZE = 128
+
+# How far either side of where it appears a spawner's walker patrols (pixels)
+SPAWN_PATROL = 100
+
+class EnemyBatch:
+    """Every enemy of one type: their state in one array per field, updated together
+
+    Every batch keeps x, y (top-left), width and height; `fields` names the rest of
+    the type's state, copied from each sprite's attributes when it joins, and
+    `objects` names per-enemy lists of references (None when it joins). An enemy's
+    index in the arrays is its `slot`; removing one moves the last enemy into its
+    slot, so the arrays stay packed.
+
+    reach() bounds everywhere an enemy can ever be, which is what the manager's
+    grid indexes, so enemies never have to be re-bucketed as they move.
+
+    Types that act every so often name the field with each enemy's `interval`
+    and the sprite attribute with how long it had `waited` when it joined. Each
+    enemy then has an event on the manager's timers (its `timer` object); when
+    it fires the enemy is `ready`, and the type's update acts on just the ready
+    ones and calls restart(). Enemies between actions cost nothing.
+    """
+    fields = ()
+    objects = ()
+    moves = True  # Whether the enemies ever move (their rects are refreshed every update)
+    interval = None
+    waited = None
+
+    def __init__(self):
+        self.sprites = []
+        self.cells = []  # Grid cells each enemy is listed in
+        for name in self.columns():
+            setattr(self, name, array("d"))
+        for name in self.objects:
+            setattr(self, name, [])
+        self.ready = {}     # Enemies whose interval is up (a dict used as an ordered set)
+        self.starting = {}  # Enemies that joined since the last update, their timers not started yet
+
+    def columns(self):
+        return ("x", "y", "width", "height") + self.fields
+
+    def __len__(self):
+        return len(self.sprites)
+
+    def add(self, sprite):
+        sprite.slot = len(self.sprites)
+        self.sprites.append(sprite)
+        self.x.append(sprite.rect.x)
+        self.y.append(sprite.rect.y)
+        self.width.append(sprite.rect.width)
+        self.height.append(sprite.rect.height)
+        for name in self.fields:
+            getattr(self, name).append(getattr(sprite, name))
+        for name in self.objects:
+            getattr(self, name).append(None)
+        if self.interval is not None:
+            self.starting[sprite] = None
+
+    def remove(self, sprite):
+        self.ready.pop(sprite, None)
+        self.starting.pop(sprite, None)
+        slot = sprite.slot
+        last = len(self.sprites) - 1
+        for values in [self.sprites, self.cells] + [getattr(self, name) for name in self.columns() + self.objects]:
+            values[slot] = values[last]
+            del values[last]
+        if slot < last:
+            self.sprites[slot].slot = slot
+        sprite.slot = None
+
+    def reach(self, slot):
+        """(left, top, right, bottom) around every position the enemy can move to; None for top/bottom if unbounded"""
+        x, y = self.x[slot], self.y[slot]
+        return x, y, x + self.width[slot], y + self.height[slot]
+
+    def start_timers(self, timers):
+        """Start the timers of the enemies that have joined"""
+        intervals = getattr(self, self.interval)
+        for sprite in self.starting:
+            delay = max(0, intervals[sprite.slot] - getattr(sprite, self.waited))
+            self.timer[sprite.slot] = timers.after(delay, self.ring, sprite)
+        self.starting = {}
+
+    def ring(self, sprite):
+        self.timer[sprite.slot] = None
+        self.ready[sprite] = None
+
+    def restart(self, sprite, timers):
+        """The enemy has acted: wait its interval again"""
+        del self.ready[sprite]
+        slot = sprite.slot
+        self.timer[slot] = timers.after(getattr(self, self.interval)[slot], self.ring, sprite)
+
+    def update(self, dt, manager, player_rect):
+        pass
+
+    def sync(self):
+        """Move the sprites' rects to the updated positions"""
+        for sprite, x, y in zip(self.sprites, self.x, self.y):
+            sprite.rect.topleft = (x, y)
+
+class WalkerBatch(EnemyBatch):
+    """Walkers patrol back and forth between patrol_start and patrol_end"""
+    fields = ("direction", "speed", "patrol_start", "patrol_end")
+
+    def reach(self, slot):
+        left, top, right, bottom = super().reach(slot)
+        width = right - left
+        return min(left, self.patrol_start[slot]), top, max(left, self.patrol_end[slot]) + width, bottom
+
+    def update(self, dt, manager, player_rect):
+        old_x, direction, start, end = self.x, self.direction, self.patrol_start, self.patrol_end
+        x = array("d", [x + d * speed * dt for x, d, speed in zip(old_x, direction, self.speed)])
+        # The few that reached a patrol boundary stop on it (like moving platforms, and
+        # never past where they already were) and turn around
+        for i in [i for i, (x, d, s, e) in enumerate(zip(x, direction, start, end)) if (x >= e if d > 0 else x <= s)]:
+            if direction[i] > 0:
+                x[i] = min(x[i], max(end[i], old_x[i]))
+                direction[i] = -1
+            else:
+                x[i] = max(x[i], min(start[i], old_x[i]))
+                direction[i] = 1
+        self.x = x
+
+    def sync(self):
+        # Walkers only move sideways
+        for sprite, x in zip(self.sprites, self.x):
+            sprite.rect.x = x
+
+class JumperBatch(EnemyBatch):
+    """Jumpers fall under gravity, land on platforms and hop every jump_interval seconds"""
+    fields = ("vel_y", "jump_interval", "on_ground")
+    objects = ("supports", "timer")  # Platform each jumper is standing on, its hop timer
+    interval = "jump_interval"
+    waited = "jump_timer"
+
+    def reach(self, slot):
+        # Jumpers only move up and down, but may fall any distance
+        left, _, right, _ = super().reach(slot)
+        return left, None, right, None
+
+    def update(self, dt, manager, player_rect):
+        vel_y, y, on_ground, supports = self.vel_y, self.y, self.on_ground, self.supports
+
+        # Jumpers whose jump_interval is up hop as soon as they're standing
+        for jumper in [jumper for jumper in self.ready if on_ground[jumper.slot]]:
+            i = jumper.slot
+            vel_y[i] = PLAYER_JUMP_SPEED * 0.7  # Smaller jumps than the player
+            supports[i] = None
+            self.restart(jumper, manager.timers)
+
+        # Jumpers standing on a platform that doesn't move stay put; the rest fall or
+        # rise, then settle against whatever platforms the grid has nearby
+        grid = manager.platform_grid
+        held = grid.static
+        self.moved = moved = [i for i, support in enumerate(supports) if support not in held]
+        for i in moved:
+            supports[i] = None
+            on_ground[i] = 0
+            vel_y[i] = min(vel_y[i] + PLAYER_GRAVITY, PLAYER_MAX_FALL_SPEED)  # Per frame, like the player's gravity
+            y[i] += vel_y[i]
+            left, width, height = self.x[i], self.width[i], self.height[i]
+            right = left + width
+            for p_left, p_top, p_right, p_bottom, one_way, platform in grid.near(left, y[i], right, y[i] + height):
+                if left >= p_right or right <= p_left or y[i] >= p_bottom or y[i] + height <= p_top:
+                    continue
+                if not getattr(platform, 'is_solid', True):
+                    continue
+                if vel_y[i] > 0:
+                    # One-way platforms only hold enemies coming down from above
+                    if one_way and y[i] + height > p_top + 10:
+                        continue
+                    y[i] = p_top - height
+                    vel_y[i] = 0
+                    on_ground[i] = 1
+                    supports[i] = platform
+                elif vel_y[i] < 0 and not one_way:
+                    y[i] = p_bottom
+                    vel_y[i] = 0
+
+    def sync(self):
+        sprites, y = self.sprites, self.y
+        for i in self.moved:
+            sprites[i].rect.y = y[i]
+
+class FlyerBatch(EnemyBatch):
+    """Flyers loop a figure-8 around their start point"""
+    fields = ("start_x", "start_y", "angle", "speed", "pattern_width", "pattern_height")
+
+    def reach(self, slot):
+        half_width, half_height = self.width[slot] / 2, self.height[slot] / 2
+        reach_x = self.pattern_width[slot] + half_width
+        reach_y = self.pattern_height[slot] + half_height
+        return (self.start_x[slot] - reach_x, self.start_y[slot] - reach_y,
+                self.start_x[slot] + reach_x, self.start_y[slot] + reach_y)
+
+    def update(self, dt, manager, player_rect):
+        angles = [(angle + speed * dt) % 360 for angle, speed in zip(self.angle, self.speed)]
+        self.angle = array("d", angles)
+        # The start point is the centre of the loop
+        cos, sin, to_radians = math.cos, math.sin, math.pi / 180
+        self.x = array("d", [start + cos(angle * to_radians) * pattern - width / 2
+                             for start, angle, pattern, width in zip(self.start_x, angles, self.pattern_width, self.width)])
+        self.y = array("d", [start + sin(angle * 2 * to_radians) * pattern - height / 2
+                             for start, angle, pattern, height in zip(self.start_y, angles, self.pattern_height, self.height)])
+
+class GuardBatch(EnemyBatch):
+    """Guards stand still and are alert while the player is within their detection_range"""
+    fields = ("detection_range",)
+    moves = False
+
+    def __init__(self):
+        super().__init__()
+        self.alerted = set()
+
+    def remove(self, sprite):
+        self.alerted.discard(sprite)
+        super().remove(sprite)
+
+    def update(self, dt, manager, player_rect):
+        alerted = set()
+        if player_rect is not None and self.sprites:
+            px, py = player_rect.center
+            reach = max(self.detection_range)
+            # Only guards in cells within the longest range can see the player
+            for guard in manager.candidates(px - reach, py - reach, px + reach, py + reach):
+                if type(guard) is Guard:
+                    slot = guard.slot
+                    dx = guard.rect.centerx - px
+                    dy = guard.rect.centery - py
+                    if dx * dx + dy * dy <= self.detection_range[slot] ** 2:
+                        alerted.add(guard)
+        for guard in self.alerted - alerted:
+            guard.alert = False
+        for guard in alerted - self.alerted:
+            guard.alert = True
+        self.alerted = alerted
+
+class ShooterBatch(EnemyBatch):
+    """Shooters stand still and fire at the player every fire_interval while it is within fire_range"""
+    fields = ("fire_interval", "fire_range")
+    objects = ("timer",)
+    moves = False
+    interval = "fire_interval"
+    waited = "fire_timer"
+
+    def update(self, dt, manager, player_rect):
+        if player_rect is None or not self.ready:
+            return
+        px, py = player_rect.center
+        # A shooter whose shot is ready fires as soon as the player comes in range
+        for shooter in list(self.ready):
+            i = shooter.slot
+            x = self.x[i] + self.width[i] / 2
+            y = self.y[i] + self.height[i] / 2
+            distance = math.hypot(px - x, py - y)
+            if 0 < distance <= self.fire_range[i]:
+                manager.projectiles.fire(x, y, (px - x) / distance * PROJECTILE_SPEED,
+                                         (py - y) / distance * PROJECTILE_SPEED)
+                self.restart(shooter, manager.timers)
+
+class SpawnerBatch(EnemyBatch):
+    """Spawners stand still and send out a pooled walker every spawn_interval, up to max_spawned alive"""
+    fields = ("spawn_interval", "max_spawned")
+    objects = ("children", "timer")  # Each spawner's walkers still in the game, its spawn timer
+    moves = False
+    interval = "spawn_interval"
+    waited = "spawn_timer"
+
+    def add(self, sprite):
+        super().add(sprite)
+        self.children[sprite.slot] = []
+
+    def update(self, dt, manager, player_rect):
+        for spawner in list(self.ready):
+            self.restart(spawner, manager.timers)
+            i = spawner.slot
+            children = self.children[i]
+            if len(children) >= self.max_spawned[i]:
+                continue
+            walker = manager.spawn_pool.acquire()
+            x = spawner.rect.centerx - walker.rect.width // 2
+            walker.respawn(x, spawner.rect.bottom - walker.rect.height, x - SPAWN_PATROL, x + SPAWN_PATROL)
+            walker.spawner = spawner
+            children.append(walker)
+            # Joining the manager now would change the batches mid-update
+            manager.arrivals.append((walker, spawner.groups()))
+
+BATCH_TYPES = {Walker: WalkerBatch, Jumper: JumperBatch, Flyer: FlyerBatch, Guard: GuardBatch,
+               Shooter: ShooterBatch, Spawner: SpawnerBatch}
+
+def pooled_walker():
+    """A blank walker for the spawners' pool (placed by Walker.respawn)"""
+    walker = Walker(0, 0, 0, 0)
+    walker.image, _ = normalize(walker.image)
+    return walker
+
+class PlatformGrid:
+    """Platforms bucketed by grid cell, rebuilt when the group's members change
+
+    Each entry is (left, top, right, bottom, one_way, platform). Moving platforms
+    aren't bucketed; every query checks them where they are now.
+    """
+    def __init__(self):
+        self.members = None
+        self.cells = {}
+        self.movers = []
+        self.static = set()  # Platforms that never move and can't disappear
+
+    def refresh(self, platforms):
+        members = platforms.sprites()
+        if members == self.members:
+            return
+        self.members = members
+        self.cells = {}
+        self.movers = []
+        self.static = set()
+        for platform in members:
+            if hasattr(platform, 'get_movement_delta') or hasattr(platform, 'get_movement_delta_y'):
+                self.movers.append(platform)
+                continue
+            if not hasattr(platform, 'is_solid'):
+                self.static.add(platform)
+            rect = platform.rect
+            entry = (rect.left, rect.top, rect.right, rect.bottom, getattr(platform, 'one_way', False), platform)
+            for cx in range(rect.left // CELL_SIZE, rect.right // CELL_SIZE + 1):
+                for cy in range(rect.top // CELL_SIZE, rect.bottom // CELL_SIZE + 1):
+                    self.cells.setdefault((cx, cy), []).append(entry)
+
+    def holds(self, platform):
+        """Whether something standing on the platform will still be standing on it"""
+        return platform in self.static
+
+    def solid_at(self, x, y):
+        """Whether a point is inside a solid platform (one-way platforms let it through)"""
+        for left, top, right, bottom, one_way, platform in self.cells.get((int(x // CELL_SIZE), int(y // CELL_SIZE)), ()):
+            if left <= x < right and top <= y < bottom and not one_way and getattr(platform, 'is_solid', True):
+                return True
+        for platform in self.movers:
+            rect = platform.rect
+            if rect.left <= x < rect.right and rect.top <= y < rect.bottom and not getattr(platform, 'one_way', False):
+                return True
+        return False
+
+    def near(self, left, top, right, bottom):
+        """Entries for the platforms that may overlap the area (callers check the bounds)"""
+        found = [(rect.left, rect.top, rect.right, rect.bottom, getattr(platform, 'one_way', False), platform)
+                 for platform in self.movers for rect in (platform.rect,)]
+        first_cx, last_cx = int(left // CELL_SIZE), int(right // CELL_SIZE)
+        first_cy, last_cy = int(top // CELL_SIZE), int(bottom // CELL_SIZE)
+        if first_cx == last_cx and first_cy == last_cy:
+            return found + self.cells.get((first_cx, first_cy), [])
+        # A platform spanning several of these cells is listed once
+        seen = set()
+        for cx in range(first_cx, last_cx + 1):
+            for cy in range(first_cy, last_cy + 1):
+                for entry in self.cells.get((cx, cy), ()):
+                    if entry[5] not in seen:
+                        seen.add(entry[5])
+                        found.append(entry)
+        return found
+
+class EnemyManager(pygame.sprite.Group):
+    """Sprite group of enemies that updates each enemy type in one batched pass
+
+    Enemies join and leave like any group (build_level, ChunkStreamer, kill()), and
+    each joins its type's EnemyBatch. update() runs the batches and moves the
+    sprites' rects. near() and touching() use a grid as a broad phase: each enemy
+    is listed in every cell it can ever reach (jumpers, which can fall any distance,
+    in whole columns), so a query only looks at enemies around its area and the
+    grid doesn't change as they move. Jumpers and projectiles collide with
+    platforms through a grid of the platforms.
+
+    Shooters' projectiles live in a ProjectilePool and spawners' walkers come from
+    a SpritePool: a spawned walker goes back to the pool when it leaves the
+    manager, and one whose spawner leaves is removed at the next update.
+    """
+    def __init__(self, *sprites):
+        self.batches = {}        # Enemy class -> EnemyBatch
+        self.grid = {}           # cell -> enemies that can reach it (a dict used as an ordered set)
+        self.columns = {}        # cell column -> enemies that can reach any height in it
+        self.platform_grid = PlatformGrid()
+        self.timers = Scheduler()  # Replaced by the world's own
+        self.projectiles = ProjectilePool()
+        self.spawn_pool = SpritePool(pooled_walker)
+        self.arrivals = []       # (walker, groups) spawned this update, added once the batches are done
+        self.orphans = []        # Spawned walkers whose spawner has left
+        super().__init__(*sprites)
+
+    def add_internal(self, sprite, layer=None):
+        super().add_internal(sprite, layer)
+        batch_type = BATCH_TYPES.get(type(sprite))
+        if batch_type is None:
+            sprite.slot = None  # Plain Enemy: it never moves
+            return
+        batch = self.batches.get(type(sprite))
+        if batch is None:
+            batch = self.batches[type(sprite)] = batch_type()
+        batch.add(sprite)
+
+        # Rects round positions, so allow an extra pixel
+        left, top, right, bottom = batch.reach(sprite.slot)
+        columns = range(int((left - 1) // CELL_SIZE), int((right + 1) // CELL_SIZE) + 1)
+        if top is None:
+            cells = [(self.columns, cx) for cx in columns]
+        else:
+            rows = range(int((top - 1) // CELL_SIZE), int((bottom + 1) // CELL_SIZE) + 1)
+            cells = [(self.grid, (cx, cy)) for cx in columns for cy in rows]
+        for index, cell in cells:
+            index.setdefault(cell, {})[sprite] = None
+        batch.cells.append(cells)
+
+        if batch_type is SpawnerBatch:
+            # Every walker the spawners can have out at once is made up front
+            self.spawn_pool.reserve(int(sum(batch.max_spawned)))
+
+    def remove_internal(self, sprite):
+        super().remove_internal(sprite)
+        batch = self.batches.get(type(sprite))
+        if batch is not None and sprite.slot is not None:
+            for index, cell in batch.cells[sprite.slot]:
+                del index[cell][sprite]
+            if type(sprite) is Spawner:
+                self.orphans.extend(batch.children[sprite.slot])
+            if batch.interval is not None:
+                self.timers.cancel(batch.timer[sprite.slot])
+            batch.remove(sprite)
+
+        spawner = getattr(sprite, 'spawner', None)
+        if spawner is not None:
+            sprite.spawner = None
+            if spawner.slot is not None:
+                self.batches[Spawner].children[spawner.slot].remove(sprite)
+            self.spawn_pool.release(sprite)
+
+    def update(self, dt, platforms, player_rect=None):
+        """Update every enemy and projectile: jumpers and projectiles collide with `platforms`,
+        guards and shooters watch `player_rect`
+
+        Returns how many projectiles hit the player.
+        """
+        if self.orphans:
+            for walker in self.orphans:
+                walker.kill()
+            self.orphans = []
+        if Jumper in self.batches or Shooter in self.batches or self.projectiles.count:
+            self.platform_grid.refresh(platforms)
+        for batch in self.batches.values():
+            if batch.starting:
+                batch.start_timers(self.timers)
+            batch.update(dt, self, player_rect)
+            if batch.moves:
+                batch.sync()
+        if self.arrivals:
+            for walker, groups in self.arrivals:
+                walker.add(*groups)
+            self.arrivals = []
+        return self.projectiles.update(dt, self.platform_grid, player_rect)
+
+    def candidates(self, left, top, right, bottom):
+        """Enemies that can be in the cells around an area (the broad phase; callers check the rects)"""
+        found = {}
+        grid, columns = self.grid, self.columns
+        for cx in range(int(left // CELL_SIZE), int(right // CELL_SIZE) + 1):
+            column = columns.get(cx)
+            if column:
+                found.update(column)
+            for cy in range(int(top // CELL_SIZE), int(bottom // CELL_SIZE) + 1):
+                cell = grid.get((cx, cy))
+                if cell:
+                    found.update(cell)
+        return found
+
+    def touching(self, rect):
+        """Enemies whose rects overlap rect (e.g. the player's)"""
+        return [enemy for enemy in self.candidates(rect.left, rect.top, rect.right, rect.bottom)
+                if rect.colliderect(enemy.rect)]
+
+    def near(self, rect, distance):
+        """Enemies whose centres are within distance of rect's centre"""
+        cx, cy = rect.center
+        limit = distance * distance
+        found = []
+        for enemy in self.candidates(cx - distance, cy - distance, cx + distance, cy + distance):
+            dx = enemy.rect.centerx - cx
+            dy = enemy.rect.centery - cy
+            if dx * dx + dy * dy <= limit:
+                found.append(enemy)
+        return found
@@ -0,0 +1,138 @@
+from array import array
+import pygame
+from surfaces import normalize
+
+# Most projectiles in flight at once; fire() drops shots past this
+MAX_PROJECTILES = 4096
+PROJECTILE_SPEED = 240      # pixels per second
+PROJECTILE_LIFETIME = 3.0   # seconds before a projectile that hit nothing vanishes
+PROJECTILE_LAYER = 4        # Drawn above the player (see render_queue.py)
+
+# Look of each projectile kind: (radius, color)
+PROJECTILE_KINDS = {
+    "bolt": (5, (255, 200, 40)),
+    "spark": (3, (120, 220, 255)),
+}
+PROJECTILE_KIND_IDS = {kind: index for index, kind in enumerate(PROJECTILE_KINDS)}
+
+# Cache of the shared projectile surfaces, one per kind (built the first time they're drawn)
+_projectile_surfaces = []
+
+def projectile_surfaces():
+    """One pre-rendered surface per projectile kind, in PROJECTILE_KINDS order"""
+    if not _projectile_surfaces:
+        for radius, color in PROJECTILE_KINDS.values():
+            surface = pygame.Surface((radius * 2, radius * 2), pygame.SRCALPHA)
+            pygame.draw.circle(surface, color, (radius, radius), radius)
+            _projectile_surfaces.append(normalize(surface)[0])
+    return _projectile_surfaces
+
+class ProjectilePool:
+    """Every projectile in flight, stored in preallocated arrays
+
+    The arrays hold `capacity` projectiles from the start and the live ones are
+    packed at the front (the first `count`). Removing one moves the last live
+    projectile into its place, so firing and expiring never create or free
+    anything, however many are in flight. Positions are projectile centres.
+    """
+    def __init__(self, capacity=MAX_PROJECTILES):
+        self.capacity = capacity
+        self.count = 0
+        self.dropped = 0  # Shots fired while the pool was full
+        self.x = array("d", [0]) * capacity
+        self.y = array("d", [0]) * capacity
+        self.vel_x = array("d", [0]) * capacity
+        self.vel_y = array("d", [0]) * capacity
+        self.life = array("d", [0]) * capacity  # Seconds left
+        self.kind = array("B", [0]) * capacity
+
+    def __len__(self):
+        return self.count
+
+    def fire(self, x, y, vel_x, vel_y, kind="bolt", lifetime=PROJECTILE_LIFETIME):
+        """Launch a projectile from (x, y); False if the pool is full"""
+        i = self.count
+        if i == self.capacity:
+            self.dropped += 1
+            return False
+        self.x[i], self.y[i] = x, y
+        self.vel_x[i], self.vel_y[i] = vel_x, vel_y
+        self.life[i] = lifetime
+        self.kind[i] = PROJECTILE_KIND_IDS[kind]
+        self.count = i + 1
+        return True
+
+    def remove(self, i):
+        """Drop projectile i, moving the last one into its place"""
+        last = self.count - 1
+        if i != last:
+            self.x[i], self.y[i] = self.x[last], self.y[last]
+            self.vel_x[i], self.vel_y[i] = self.vel_x[last], self.vel_y[last]
+            self.life[i] = self.life[last]
+            self.kind[i] = self.kind[last]
+        self.count = last
+
+    def clear(self):
+        self.count = 0
+
+    def update(self, dt, platform_grid, player_rect=None):
+        """Move every projectile; ones that run out, hit a solid platform or hit the player are removed
+
+        Returns how many hit the player.
+        """
+        x, y, vel_x, vel_y, life = self.x, self.y, self.vel_x, self.vel_y, self.life
+        solid_at = platform_grid.solid_at
+        if player_rect is not None:
+            left, top, right, bottom = player_rect.left, player_rect.top, player_rect.right, player_rect.bottom
+        else:
+            left = top = right = bottom = 0
+        hits = 0
+        # Backwards, so the projectile swapped into a removed one's slot has already moved
+        for i in range(self.count - 1, -1, -1):
+            life[i] -= dt
+            px = x[i] = x[i] + vel_x[i] * dt
+            py = y[i] = y[i] + vel_y[i] * dt
+            if left <= px < right and top <= py < bottom:
+                hits += 1
+                self.remove(i)
+            elif life[i] <= 0 or solid_at(px, py):
+                self.remove(i)
+        return hits
+
+    def queue_draw(self, render_queue, camera=None):
+        """Queue every projectile's shared surface, centred on its position"""
+        if not self.count:
+            return
+        surfaces = projectile_surfaces()
+        offsets = [surface.get_width() // 2 for surface in surfaces]
+        cx, cy = (camera.x, camera.y) if camera is not None else (0, 0)
+        render_queue.extend([(surfaces[kind], (int(x) - offsets[kind] - cx, int(y) - offsets[kind] - cy))
+                             for x, y, kind in zip(self.x[:self.count], self.y[:self.count], self.kind)],
+                            PROJECTILE_LAYER)
+
+class SpritePool:
+    """Sprites kept for reuse, so spawning one doesn't build a new sprite and surface
+
+    `factory` makes a fresh sprite when the pool is empty; acquire() hands one out
+    and release() takes it back once it has left its groups. The caller resets a
+    reused sprite's state (e.g. Enemy.respawn).
+    """
+    def __init__(self, factory):
+        self.factory = factory
+        self.free = []
+        self.size = 0  # Sprites made so far, in use or not
+
+    def reserve(self, count):
+        """Make sprites ahead of time until the pool has made count of them"""
+        while self.size < count:
+            self.free.append(self.factory())
+            self.size += 1
+
+    def acquire(self):
+        if self.free:
+            return self.free.pop()
+        self.size += 1
+        return self.factory()
+
+    def release(self, sprite):
+        self.free.append(sprite)
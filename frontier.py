@@ -0,0 +1,59 @@
+import math
+import random
+
+# Archive cells are the learning AI's own 100px grid (see LearningAI.get_position_key)
+FRONTIER_CELL = 100
+# Cells whose x is within this many pixels of the furthest cell reached are the frontier
+FRONTIER_WIDTH = 300
+# Share of attempts that start from a frontier cell instead of the level's start
+FRONTIER_START_CHANCE = 0.8
+
+class FrontierArchive:
+    """Go-Explore style archive: one world snapshot for each cell an attempt has stood in
+
+    The first time the player stands in a cell, the world is snapshotted there.
+    choose() returns a snapshot from a frontier cell (one near the furthest point
+    reached), favouring the cells picked least often, so attempts can start where
+    there is still something to learn instead of replaying the part already mastered.
+    """
+    def __init__(self, cell_size=FRONTIER_CELL, width=FRONTIER_WIDTH):
+        self.cell_size = cell_size
+        self.width = width
+        self.cells = {}  # (cell x, cell y) -> [snapshot, x where it was taken, times chosen]
+        self.furthest = 0
+
+    def __len__(self):
+        return len(self.cells)
+
+    def cell(self, rect):
+        return (rect.centerx // self.cell_size, rect.centery // self.cell_size)
+
+    def offer(self, rect, take_snapshot):
+        """Archive take_snapshot() for rect's cell if the cell is new; True if it was"""
+        cell = self.cell(rect)
+        if cell in self.cells:
+            return False
+        self.cells[cell] = [take_snapshot(), rect.centerx, 0]
+        self.furthest = max(self.furthest, rect.centerx)
+        return True
+
+    def frontier(self):
+        """Entries of the cells near the furthest point reached"""
+        edge = self.furthest - self.width
+        return [entry for entry in self.cells.values() if entry[1] >= edge]
+
+    def choose(self):
+        """Snapshot to start an attempt from (None while the archive is empty)
+
+        Each frontier cell is picked with weight 1/sqrt(times chosen + 1).
+        """
+        entries = self.frontier()
+        if not entries:
+            return None
+        entry = random.choices(entries, [1 / math.sqrt(entry[2] + 1) for entry in entries])[0]
+        entry[2] += 1
+        return entry[0]
+
+    def clear(self):
+        self.cells = {}
+        self.furthest = 0
@@ -0,0 +1,163 @@
+import atexit
+import contextlib
+import json
+import logging
+import logging.handlers
+import queue
+import sys
+import time
+
+# Messages per second each event type may log (short bursts of RATE_BURST are allowed);
+# warnings and errors are never rate limited
+DEFAULT_RATE = 5
+RATE_LIMITS = {
+    "progress": 2,
+    "emotion": 1,
+    "decision": 2,
+    "pb_recovery": 2,
+}
+RATE_BURST = 10
+
+# Records waiting for the writer thread; when it falls this far behind, new records are dropped
+QUEUE_SIZE = 10000
+
+LEVELS = ("debug", "info", "warning", "error")
+
+_logger = logging.getLogger("platformer")
+_logger.propagate = False
+_listener = None
+_handler = None
+
+class RateLimiter(logging.Filter):
+    """Token bucket per event type: drops records over the limit and counts them
+
+    The next record of that event that gets through carries the count as `suppressed`.
+    """
+    def __init__(self):
+        super().__init__()
+        self.buckets = {}  # event -> [tokens, last refill time, suppressed count]
+
+    def filter(self, record):
+        if record.levelno >= logging.WARNING:
+            return True
+        event = getattr(record, "event", "")
+        rate = RATE_LIMITS.get(event, DEFAULT_RATE)
+        now = time.monotonic()
+        bucket = self.buckets.get(event)
+        if bucket is None:
+            bucket = self.buckets[event] = [RATE_BURST, now, 0]
+        bucket[0] = min(RATE_BURST, bucket[0] + (now - bucket[1]) * rate)
+        bucket[1] = now
+        if bucket[0] < 1:
+            bucket[2] += 1
+            return False
+        bucket[0] -= 1
+        if bucket[2]:
+            record.suppressed = bucket[2]
+            bucket[2] = 0
+        return True
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """Queues records for the writer thread, dropping them instead of blocking when the queue is full"""
+    def __init__(self, record_queue):
+        super().__init__(record_queue)
+        self.dropped = 0
+
+    def prepare(self, record):
+        # The message is formatted by the writer thread; only fill in the arguments here
+        record.msg = record.getMessage()
+        record.args = None
+        record.exc_info = None
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+class JsonLinesFormatter(logging.Formatter):
+    """One JSON object per record: time, level, event, message and any extra fields"""
+    def format(self, record):
+        entry = {
+            "time": round(record.created, 3),
+            "level": record.levelname.lower(),
+            "event": getattr(record, "event", ""),
+            "message": record.msg,
+        }
+        entry.update(getattr(record, "fields", {}))
+        if getattr(record, "suppressed", 0):
+            entry["suppressed"] = record.suppressed
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+def configure(level="info", path=None):
+    """Start (or restart) the background writer: JSON lines to path, or stderr when path is None"""
+    global _listener, _handler
+    shutdown()
+
+    if path:
+        output = logging.FileHandler(path, encoding="utf-8")
+    else:
+        output = logging.StreamHandler(sys.stderr)
+    output.setFormatter(JsonLinesFormatter())
+
+    record_queue = queue.Queue(QUEUE_SIZE)
+    _handler = DroppingQueueHandler(record_queue)
+    _handler.addFilter(RateLimiter())
+    _logger.handlers = [_handler]
+    _logger.setLevel(level.upper())
+
+    _listener = logging.handlers.QueueListener(record_queue, output)
+    _listener.start()
+
+def shutdown():
+    """Write out everything still queued and stop the writer thread"""
+    global _listener, _handler
+    if _listener is not None:
+        _listener.stop()
+        for output in _listener.handlers:
+            output.close()
+        if _handler.dropped:
+            print(f"⚠️ Log queue was full: dropped {_handler.dropped} records", file=sys.stderr)
+    _listener = None
+    _handler = None
+
+atexit.register(shutdown)
+
+def enabled(level):
+    """Whether messages at this level are written (to skip building expensive ones)"""
+    if _listener is None:
+        configure()
+    return _logger.isEnabledFor(getattr(logging, level.upper()))
+
+@contextlib.contextmanager
+def quiet():
+    """Only let errors through inside this block"""
+    if _listener is None:
+        configure()
+    old_level = _logger.level
+    _logger.setLevel(logging.ERROR)
+    try:
+        yield
+    finally:
+        _logger.setLevel(old_level)
+
+def log(level, event, message, **fields):
+    """Log a message of an event type; extra keyword fields go into the JSON line"""
+    if _listener is None:
+        configure()
+    levelno = getattr(logging, level.upper())
+    if _logger.isEnabledFor(levelno):
+        _logger.log(levelno, message, extra={"event": event, "fields": fields})
+
+def debug(event, message, **fields):
+    log("debug", event, message, **fields)
+
+def info(event, message, **fields):
+    log("info", event, message, **fields)
+
+def warning(event, message, **fields):
+    log("warning", event, message, **fields)
+
+def error(event, message, **fields):
+    log("error", event, message, **fields)
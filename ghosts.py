@@ -0,0 +1,64 @@
+import math
+import pygame
+from settings import *
+from player import Player, character_look
+from surfaces import normalize
+
+GHOST_ALPHA = 90  # Opacity of a ghost (0-255)
+GHOST_LAYER = 2   # Drawn under the AI's own player (see render_queue.py)
+GHOST_BOBS = (-2, -1, 0, 1, 2)  # Walk-bob offsets, as Player.update_animation draws them
+
+# Translucent frames by look: {(facing right, bob offset): surface}, shared by every Ghost that wears it
+_ghost_frames = {}
+
+def ghost_frames(base_image, look):
+    """Every frame a ghost of this look can show, built the first time the look is used"""
+    frames = _ghost_frames.get(look)
+    if frames is None:
+        frames = _ghost_frames[look] = {}
+        for bob in GHOST_BOBS:
+            shifted = pygame.Surface((PLAYER_WIDTH, PLAYER_HEIGHT), pygame.SRCALPHA)
+            shifted.blit(base_image, (0, bob))
+            for facing_right in (True, False):
+                frame = shifted if facing_right else pygame.transform.flip(shifted, True, False)
+                frame = normalize(frame)[0]
+                frame.set_alpha(GHOST_ALPHA)
+                frames[(facing_right, bob)] = frame
+    return frames
+
+class Ghost(Player):
+    """A see-through Player for the AI demo's ghost agents
+
+    Moves and collides like any player, but lands on platforms without setting them
+    off (so hundreds of ghosts don't change the level under the AI's own player),
+    makes no particles, and shows one of the frames every ghost of its look shares
+    instead of building a new image each frame.
+    """
+    touches_platforms = False
+
+    def __init__(self, x, y, character_config, timers=None):
+        super().__init__(x, y, character_config, timers)
+        self.frames = ghost_frames(self.base_image, character_look(character_config))
+        self.image = self.frames[(True, 0)]
+
+    def respawn(self, x, y):
+        """Put the ghost back at (x, y), standing still"""
+        self.rect.topleft = (x, y)
+        self.vel_x = 0
+        self.vel_y = 0
+        self.on_ground = False
+        self.jump_count = 0
+
+    def add_jump_particles(self):
+        pass
+
+    def add_landing_particles(self):
+        pass
+
+    def add_bounce_particles(self):
+        pass
+
+    def update_animation(self, dt):
+        self.animation_timer += dt * 5
+        bob = int(math.sin(self.animation_timer) * 2) if self.is_moving and self.on_ground else 0
+        self.image = self.frames[(self.facing_right, bob)]
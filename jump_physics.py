@@ -0,0 +1,97 @@
+import pygame
+from settings import *
+
+# Lowest a target may sit below the take-off platform (in pixels)
+DEFAULT_MAX_DROP = 600
+
+def simulate_jump(double_jump_frame=None, max_drop=DEFAULT_MAX_DROP, take_off_speed=PLAYER_JUMP_SPEED):
+    """Step a full-speed running jump with the same integer-rect physics as PlayerBody.update
+
+    Returns a list of (horizontal travel, height above take-off, vel_y) per frame.
+    double_jump_frame is the airborne frame on which the second jump is pressed
+    (None for a single jump); a take_off_speed of 0 runs off the edge without jumping.
+    """
+    rect = pygame.Rect(0, 0, PLAYER_WIDTH, PLAYER_HEIGHT)
+    vel_y = take_off_speed  # PlayerBody.jump runs before PlayerBody.update
+    points = []
+    frame = 0
+    while -rect.y >= -max_drop:
+        if frame == double_jump_frame:
+            vel_y = PLAYER_JUMP_SPEED
+
+        # Same order as PlayerBody.update: gravity, clamp, move x, move y
+        vel_y += PLAYER_GRAVITY
+        if vel_y > PLAYER_MAX_FALL_SPEED:
+            vel_y = PLAYER_MAX_FALL_SPEED
+        rect.x += PLAYER_SPEED
+        rect.y += vel_y
+
+        points.append((rect.x, -rect.y, vel_y))
+        frame += 1
+    return points
+
+class JumpEnvelope:
+    """How far the player can travel horizontally while still at or above each height
+
+    Heights are measured from the take-off surface (positive is up). A target whose
+    near edge is `gap` pixels away and whose top is `rise` pixels higher can be
+    landed on if gap <= reach(rise): the player is above the target's top when it
+    arrives over it, and can stop steering to drop onto it. For short gaps the
+    player may have to start running later so it doesn't bump under the target.
+    """
+    def __init__(self, double_jump=True, max_drop=DEFAULT_MAX_DROP, take_off_speed=PLAYER_JUMP_SPEED):
+        self.double_jump = double_jump
+        self.max_drop = max_drop
+        self.take_off_speed = take_off_speed
+
+        trajectories = [simulate_jump(None, max_drop, take_off_speed)]
+        if double_jump:
+            # The best moment for the second jump depends on the target, so try them all
+            for frame in range(1, len(trajectories[0])):
+                trajectories.append(simulate_jump(frame, max_drop, take_off_speed))
+
+        self.max_rise = max(0, max(height for points in trajectories for _, height, _ in points))
+
+        # best[i] = furthest travel seen exactly at height i - max_drop
+        size = self.max_rise + max_drop + 1
+        best = [-1] * size
+        for points in trajectories:
+            for travel, height, _ in points:
+                index = height + max_drop
+                if 0 <= index < size and travel > best[index]:
+                    best[index] = travel
+
+        # Suffix max: being higher than a target is as good as being level with it
+        self.reach_table = best
+        furthest = -1
+        for index in range(size - 1, -1, -1):
+            if best[index] > furthest:
+                furthest = best[index]
+            self.reach_table[index] = furthest
+
+    def reach(self, rise):
+        """Furthest horizontal gap that can be crossed onto a target `rise` pixels up (-1 if none)"""
+        rise = int(rise)
+        if rise > self.max_rise:
+            return -1
+        if rise < -self.max_drop:
+            rise = -self.max_drop
+        return self.reach_table[rise + self.max_drop]
+
+    def can_reach(self, gap, rise, margin=1.0):
+        """Check a gap/rise pair, with horizontal reach and height scaled down by margin"""
+        if rise > self.max_rise * margin:
+            return False
+        return gap <= self.reach(rise) * margin
+
+_envelopes = {}
+
+def get_jump_envelope(double_jump=True, walk_off=False):
+    """Shared envelope for the current physics constants (built on first use)
+
+    walk_off gives the envelope for running off an edge without a jump.
+    """
+    key = (double_jump, walk_off)
+    if key not in _envelopes:
+        _envelopes[key] = JumpEnvelope(double_jump, take_off_speed=0 if walk_off else PLAYER_JUMP_SPEED)
+    return _envelopes[key]
@@ -0,0 +1,409 @@
+import os
+import sys
+import json
+import time
+import zlib
+import struct
+import game_log
+from settings import *
+from platforms import (Platform, Ground, MovingPlatform, DisappearingPlatform,
+                      VerticalMovingPlatform, RotatingPlatform, OneWayPlatform,
+                      BouncyPlatform, IcePlatform, TeleporterElevator)
+from simulation import (PlatformBody, MovingPlatformBody, DisappearingPlatformBody, VerticalMovingPlatformBody,
+                        RotatingPlatformBody, OneWayPlatformBody, BouncyPlatformBody, IcePlatformBody,
+                        TeleporterElevatorBody, PlatformBodies)
+from powerups import PowerUp
+from enemies import Walker, Jumper, Flyer, Guard, Shooter, Spawner
+from surfaces import normalize_sprites
+
+# Authored levels live in LEVEL_DIR as NAME.json; NAME.lvl next to it is the compiled cache
+LEVEL_DIR = "levels"
+
+# Compiled level layout:
+#   MAGIC | version (u8) | header length (u32) | JSON header
+#   | platform records (PLATFORM_RECORD each, in authored order)
+#   | chunk count (u32) | CHUNK_ENTRY per chunk | record indices (u32 each)
+MAGIC = b"PFLV"
+VERSION = 1
+
+# Objects are bucketed into CHUNK_SIZE x CHUNK_SIZE chunks by their top-left corner
+CHUNK_SIZE = 1024
+
+# Platform types in the order their ids are stored (only ever append to this)
+PLATFORM_TYPES = ("normal", "ice", "oneway", "moving", "bouncy", "disappearing",
+                  "elevator", "teleporter", "rotating")
+
+# Extra parameters per platform type: (name, record slot, default); a default of None means required
+PLATFORM_PARAMS = {
+    "moving": (("start_x", "a", None), ("end_x", "b", None), ("speed", "speed", 30),
+               ("start_at_end", "flags", False)),
+    "bouncy": (("bounce_strength", "extra", 1.5),),
+    "disappearing": (("disappear_time", "extra", 3.0),),
+    "elevator": (("end_y", "a", None), ("speed", "speed", 40), ("wait_time", "extra", 2.0)),
+    "teleporter": (("end_y", "a", None), ("speed", "speed", 40), ("wait_time", "extra", 2.0)),
+    "rotating": (("radius", "a", None), ("rotation_speed", "speed", 45)),
+}
+
+# Platform record: type id, flags, x, y, width, height, two int slots (a, b), two float slots (speed, extra)
+PLATFORM_RECORD = "<BBiiHHiidd"
+RECORD_SIZE = struct.calcsize(PLATFORM_RECORD)
+CHUNK_ENTRY = "<iiII"  # chunk x, chunk y, first index, index count
+CHUNK_ENTRY_SIZE = struct.calcsize(CHUNK_ENTRY)
+
+POWERUP_TYPES = ("jump_boost",)
+
+# Extra parameters per enemy type: (name, default), passed to the class in this order
+ENEMY_PARAMS = {
+    "walker": (("patrol_start", None), ("patrol_end", None)),
+    "jumper": (),
+    "flyer": (("pattern_width", 200), ("pattern_height", 100)),
+    "guard": (("detection_range", 150),),
+    "shooter": (("fire_interval", 1.5), ("fire_range", 400)),
+    "spawner": (("spawn_interval", 4.0), ("max_spawned", 3)),
+}
+ENEMY_CLASSES = {"walker": Walker, "jumper": Jumper, "flyer": Flyer, "guard": Guard,
+                 "shooter": Shooter, "spawner": Spawner}
+
+class Level:
+    """A loaded level: metadata up front, platform records decoded a chunk at a time
+
+    Everything except the platforms (spawn, victory zone, power-ups, enemies) is
+    small and kept as plain values. The platforms stay packed in the compiled
+    bytes; platforms_in_chunk() decodes just the records of one chunk, so a
+    streamed level only ever turns the area around the player into dicts.
+    """
+    def __init__(self, data):
+        if data[:4] != MAGIC:
+            raise ValueError("Not a compiled level")
+        version, header_length = struct.unpack_from("<BI", data, 4)
+        if version != VERSION:
+            raise ValueError(f"Unsupported level version {version}")
+        offset = 4 + struct.calcsize("<BI")
+        header = json.loads(bytes(data[offset:offset + header_length]).decode("utf-8"))
+
+        self.data = data
+        self.header = header
+        self.name = header["name"]
+        self.world_width = header["world"]["width"]
+        self.world_height = header["world"]["height"]
+        self.ground_y = header["ground_y"]
+        self.spawn = tuple(header["spawn"])
+        self.victory_zone = tuple(header["victory_zone"])
+        self.powerups = header["powerups"]
+        self.enemies = header["enemies"]
+        self.chunk_size = header["chunk_size"]
+        self.platform_count = header["platform_count"]
+
+        # Chunk table: key -> (offset of its record indices, count)
+        self.records_offset = offset + header_length
+        table_offset = self.records_offset + self.platform_count * RECORD_SIZE
+        chunk_count, = struct.unpack_from("<I", data, table_offset)
+        table_offset += 4
+        indices_offset = table_offset + chunk_count * CHUNK_ENTRY_SIZE
+        self.chunk_index = {}
+        for cx, cy, first, count in struct.iter_unpack(CHUNK_ENTRY, data[table_offset:indices_offset]):
+            self.chunk_index[(cx, cy)] = (indices_offset + first * 4, count)
+
+        # Power-ups and enemies are few, so bucket them now
+        self.chunk_powerups = self.bucket(self.powerups)
+        self.chunk_enemies = self.bucket(self.enemies)
+        self.chunk_keys = set(self.chunk_index) | set(self.chunk_powerups) | set(self.chunk_enemies)
+
+    def bucket(self, specs):
+        """Group specs by the chunk holding their position"""
+        chunks = {}
+        for spec in specs:
+            chunks.setdefault((spec["x"] // self.chunk_size, spec["y"] // self.chunk_size), []).append(spec)
+        return chunks
+
+    def platform(self, index):
+        """Decode one platform record into its spec dict"""
+        return decode_platform(struct.unpack_from(PLATFORM_RECORD, self.data, self.records_offset + index * RECORD_SIZE))
+
+    def platforms(self):
+        """Decode every platform, in authored order"""
+        end = self.records_offset + self.platform_count * RECORD_SIZE
+        for record in struct.iter_unpack(PLATFORM_RECORD, self.data[self.records_offset:end]):
+            yield decode_platform(record)
+
+    def platforms_in_chunk(self, key):
+        """Decode the platforms whose top-left corner is in one chunk"""
+        if key not in self.chunk_index:
+            return []
+        offset, count = self.chunk_index[key]
+        return [self.platform(index) for index in struct.unpack_from(f"<{count}I", self.data, offset)]
+
+    def powerups_in_chunk(self, key):
+        return self.chunk_powerups.get(key, [])
+
+    def enemies_in_chunk(self, key):
+        return self.chunk_enemies.get(key, [])
+
+def check_level(level):
+    """Raise ValueError describing the first problem in a level dict"""
+    for key in ("name", "world", "spawn", "victory_zone", "platforms"):
+        if key not in level:
+            raise ValueError(f"Level is missing '{key}'")
+    if len(level["spawn"]) != 2:
+        raise ValueError("'spawn' must be [x, y]")
+    if len(level["victory_zone"]) != 4:
+        raise ValueError("'victory_zone' must be [x, y, width, height]")
+
+    for index, spec in enumerate(level["platforms"]):
+        kind = spec.get("type", "normal")
+        if kind not in PLATFORM_TYPES:
+            raise ValueError(f"Platform {index}: unknown type '{kind}'")
+        for key in ("x", "y", "width", "height"):
+            if key not in spec:
+                raise ValueError(f"Platform {index}: missing '{key}'")
+        for name, _, default in PLATFORM_PARAMS.get(kind, ()):
+            if default is None and name not in spec:
+                raise ValueError(f"Platform {index}: {kind} platforms need '{name}'")
+        if kind == "rotating" and spec["width"] != spec["radius"] * 2 + 10:
+            raise ValueError(f"Platform {index}: a rotating platform's box is radius * 2 + 10 wide")
+
+    for index, spec in enumerate(level.get("powerups", [])):
+        if spec.get("type") not in POWERUP_TYPES:
+            raise ValueError(f"Power-up {index}: unknown type '{spec.get('type')}'")
+
+    for index, spec in enumerate(level.get("enemies", [])):
+        kind = spec.get("type")
+        if kind not in ENEMY_PARAMS:
+            raise ValueError(f"Enemy {index}: unknown type '{kind}'")
+        for name, default in ENEMY_PARAMS[kind]:
+            if default is None and name not in spec:
+                raise ValueError(f"Enemy {index}: {kind} enemies need '{name}'")
+
+def encode_platform(spec):
+    """Pack one platform dict into a record"""
+    kind = spec.get("type", "normal")
+    slots = {"flags": 0, "a": 0, "b": 0, "speed": 0.0, "extra": 0.0}
+    for name, slot, default in PLATFORM_PARAMS.get(kind, ()):
+        value = spec.get(name, default)
+        slots[slot] = int(bool(value)) if slot == "flags" else value
+    return struct.pack(PLATFORM_RECORD, PLATFORM_TYPES.index(kind), slots["flags"],
+                       spec["x"], spec["y"], spec["width"], spec["height"],
+                       slots["a"], slots["b"], slots["speed"], slots["extra"])
+
+def decode_platform(record):
+    """Turn an unpacked record back into a platform dict"""
+    type_id, flags, x, y, width, height, a, b, speed, extra = record
+    kind = PLATFORM_TYPES[type_id]
+    spec = {"type": kind, "x": x, "y": y, "width": width, "height": height}
+    slots = {"flags": bool(flags), "a": a, "b": b, "speed": speed, "extra": extra}
+    for name, slot, _ in PLATFORM_PARAMS.get(kind, ()):
+        spec[name] = slots[slot]
+    return spec
+
+def compile_level(level, source_crc=0):
+    """Compile a level dict (authored JSON or generate_level output) to bytes"""
+    check_level(level)
+    world = level["world"]
+
+    # Everything but the platforms goes in the header, with defaults filled in
+    header = {key: value for key, value in level.items() if key != "platforms"}
+    header["ground_y"] = level.get("ground_y", world["height"] - GROUND_HEIGHT)
+    header["powerups"] = level.get("powerups", [])
+    header["enemies"] = level.get("enemies", [])
+    header["chunk_size"] = CHUNK_SIZE
+    header["platform_count"] = len(level["platforms"])
+    header["source_crc"] = source_crc
+    header_bytes = json.dumps(header, separators=(",", ":")).encode("utf-8")
+
+    records = bytearray()
+    chunks = {}
+    for index, spec in enumerate(level["platforms"]):
+        records += encode_platform(spec)
+        chunks.setdefault((spec["x"] // CHUNK_SIZE, spec["y"] // CHUNK_SIZE), []).append(index)
+
+    table = bytearray(struct.pack("<I", len(chunks)))
+    indices = []
+    for (cx, cy), members in chunks.items():
+        table += struct.pack(CHUNK_ENTRY, cx, cy, len(indices), len(members))
+        indices.extend(members)
+
+    return b"".join((MAGIC, struct.pack("<BI", VERSION, len(header_bytes)), header_bytes,
+                     bytes(records), bytes(table), struct.pack(f"<{len(indices)}I", *indices)))
+
+def level_from_dict(level):
+    """Build a Level straight from a level dict"""
+    return Level(compile_level(level))
+
+def level_paths(name):
+    """JSON and compiled paths for a level name (or a path to either file)"""
+    base, extension = os.path.splitext(name)
+    if extension not in (".json", ".lvl"):
+        base = os.path.join(LEVEL_DIR, name)
+    return base + ".json", base + ".lvl"
+
+def compile_file(json_path):
+    """Compile a level's JSON file to its .lvl file and return the Level"""
+    with open(json_path, "rb") as f:
+        source = f.read()
+    data = compile_level(json.loads(source.decode("utf-8")), zlib.crc32(source))
+    compiled_path = os.path.splitext(json_path)[0] + ".lvl"
+    try:
+        with open(compiled_path, "wb") as f:
+            f.write(data)
+    except OSError as e:
+        game_log.warning("level", f"Warning: Could not write compiled level {compiled_path}: {e}")
+    return Level(data)
+
+_levels = {}
+
+def load_level(name):
+    """Load a level by name (from LEVEL_DIR) or path, preferring the compiled file
+
+    The compiled file is used when it was built from the current JSON (same
+    checksum), otherwise the JSON is compiled again and the cache rewritten.
+    Levels are kept after the first load, so restarts don't touch the disk.
+    """
+    if name in _levels:
+        return _levels[name]
+
+    json_path, compiled_path = level_paths(name)
+    source_crc = None
+    if os.path.exists(json_path):
+        with open(json_path, "rb") as f:
+            source_crc = zlib.crc32(f.read())
+
+    level = None
+    if os.path.exists(compiled_path):
+        with open(compiled_path, "rb") as f:
+            data = f.read()
+        try:
+            level = Level(data)
+        except ValueError as e:
+            game_log.warning("level", f"Warning: Ignoring compiled level {compiled_path}: {e}")
+        if level is not None and source_crc is not None and level.header["source_crc"] != source_crc:
+            level = None  # Stale: the JSON changed since it was compiled
+    if level is None:
+        if source_crc is None:
+            raise FileNotFoundError(f"No level file for '{name}' ({json_path})")
+        level = compile_file(json_path)
+
+    _levels[name] = level
+    return level
+
+def create_platform_sprite(spec, theme):
+    """Create the sprite for one platform dict"""
+    kind = spec["type"]
+    x, y, width, height = spec["x"], spec["y"], spec["width"], spec["height"]
+    if kind == "moving":
+        platform = MovingPlatform(spec["start_x"], y, width, height, spec["end_x"], spec["speed"], theme)
+        if spec.get("start_at_end"):
+            start_at_end(platform)
+        return platform
+    if kind == "disappearing":
+        return DisappearingPlatform(x, y, width, height, theme, spec.get("disappear_time", 3.0))
+    if kind == "bouncy":
+        return BouncyPlatform(x, y, width, height, spec.get("bounce_strength", 1.5), theme)
+    if kind == "oneway":
+        return OneWayPlatform(x, y, width, height, theme)
+    if kind == "ice":
+        return IcePlatform(x, y, width, height, theme)
+    if kind == "elevator":
+        return VerticalMovingPlatform(x, y, width, height, spec["end_y"], spec["speed"], spec["wait_time"], theme)
+    if kind == "teleporter":
+        return TeleporterElevator(x, y, width, height, spec["end_y"], spec["speed"], spec["wait_time"], theme)
+    if kind == "rotating":
+        # Stored as its bounding box; the sprite is placed by its centre
+        return RotatingPlatform(x + width // 2, y + height // 2, spec["radius"], spec["rotation_speed"], theme)
+    return Platform(x, y, width, height, theme)
+
+def create_platform_body(spec):
+    """Create the headless body for one platform dict (the same platform as create_platform_sprite, without an image)"""
+    kind = spec["type"]
+    x, y, width, height = spec["x"], spec["y"], spec["width"], spec["height"]
+    if kind == "moving":
+        platform = MovingPlatformBody(spec["start_x"], y, width, height, spec["end_x"], spec["speed"])
+        if spec.get("start_at_end"):
+            start_at_end(platform)
+        return platform
+    if kind == "disappearing":
+        return DisappearingPlatformBody(x, y, width, height, spec.get("disappear_time", 3.0))
+    if kind == "bouncy":
+        return BouncyPlatformBody(x, y, width, height, spec.get("bounce_strength", 1.5))
+    if kind == "oneway":
+        return OneWayPlatformBody(x, y, width, height)
+    if kind == "ice":
+        return IcePlatformBody(x, y, width, height)
+    if kind == "elevator":
+        return VerticalMovingPlatformBody(x, y, width, height, spec["end_y"], spec["speed"], spec["wait_time"])
+    if kind == "teleporter":
+        return TeleporterElevatorBody(x, y, width, height, spec["end_y"], spec["speed"], spec["wait_time"])
+    if kind == "rotating":
+        return RotatingPlatformBody(x + width // 2, y + height // 2, spec["radius"], spec["rotation_speed"])
+    return PlatformBody(x, y, width, height)
+
+def start_at_end(platform):
+    """Rest a moving platform at the end nearest the parent platform and head back from there"""
+    platform.rect.x = platform.end_x
+    platform.last_x = platform.rect.x
+    platform.direction = -1
+
+def create_powerup_sprite(spec, theme):
+    """Create the sprite for one power-up dict (x, y is its centre)"""
+    return PowerUp(spec["x"], spec["y"], spec["type"], theme)
+
+def create_enemy_sprite(spec, theme):
+    """Create the sprite for one enemy dict"""
+    params = [spec.get(name, default) for name, default in ENEMY_PARAMS[spec["type"]]]
+    return ENEMY_CLASSES[spec["type"]](spec["x"], spec["y"], *params, theme=theme)
+
+def build_level(level, theme, platforms, all_sprites, powerups=None, enemies=None):
+    """Add the ground and everything in a level to the sprite groups at once
+
+    Each platform sprite is a separate object with its own surface, so big levels
+    should stream through world_streaming.ChunkStreamer instead.
+    """
+    built = [Ground(0, level.ground_y, level.world_width, theme)]
+    platforms.add(built[0])
+
+    for spec in level.platforms():
+        platform = create_platform_sprite(spec, theme)
+        platforms.add(platform)
+        built.append(platform)
+
+    if powerups is not None:
+        for spec in level.powerups:
+            powerup = create_powerup_sprite(spec, theme)
+            powerups.add(powerup)
+            built.append(powerup)
+
+    if enemies is not None:
+        for spec in level.enemies:
+            enemy = create_enemy_sprite(spec, theme)
+            enemies.add(enemy)
+            built.append(enemy)
+
+    # Put every surface in the format that blits fastest before it's first drawn
+    normalize_sprites(built, level.name)
+    all_sprites.add(built)
+
+def build_level_bodies(level):
+    """The ground and every platform of a level as bodies, for simulating it with no display
+
+    The ground is a plain PlatformBody: its animation is all it has that a body doesn't.
+    """
+    bodies = PlatformBodies([PlatformBody(0, level.ground_y, level.world_width, GROUND_HEIGHT)])
+    bodies.add(*[create_platform_body(spec) for spec in level.platforms()])
+    return bodies
+
+if __name__ == "__main__":
+    # Compile level files: python level_format.py [levels/NAME.json ...]
+    paths = sys.argv[1:] or sorted(os.path.join(LEVEL_DIR, f) for f in os.listdir(LEVEL_DIR) if f.endswith(".json"))
+    for path in paths:
+        try:
+            level = compile_file(path)
+        except (ValueError, KeyError) as e:
+            print(f"❌ {path}: {e}")
+            sys.exit(1)
+
+        compiled_path = os.path.splitext(path)[0] + ".lvl"
+        start = time.perf_counter()
+        with open(compiled_path, "rb") as f:
+            Level(f.read())
+        elapsed = time.perf_counter() - start
+        print(f"✅ {path} -> {compiled_path}: {level.platform_count} platforms, {len(level.powerups)} power-ups, "
+              f"{len(level.enemies)} enemies, {os.path.getsize(compiled_path)} bytes, loads in {elapsed * 1000:.1f}ms")
@@ -0,0 +1,418 @@
+import sys
+import time
+import random
+from bisect import bisect
+from itertools import accumulate
+from settings import *
+from jump_physics import get_jump_envelope
+
+# Relative weights of each platform type
+DEFAULT_TYPE_MIX = {
+    "normal": 60,
+    "ice": 10,
+    "oneway": 10,
+    "bouncy": 8,
+    "moving": 7,
+    "disappearing": 5
+}
+
+# Types the guaranteed spawn-to-victory path may use. Moving platforms can be away
+# and disappearing ones gone when the player arrives, so they only appear on branches.
+PATH_TYPES = ("normal", "ice", "oneway")
+
+# Types that are never used as a stepping stone to further platforms
+LEAF_TYPES = ("disappearing",)
+
+# (min, max) widths per type; ice is wide so a sliding landing stays on it
+PLATFORM_WIDTHS = {
+    "normal": (120, 260),
+    "ice": (180, 300),
+    "oneway": (120, 240),
+    "bouncy": (100, 180),
+    "moving": (100, 160),
+    "disappearing": (100, 180)
+}
+PLATFORM_HEIGHT = 25
+
+# Spacing rules (pixels)
+MIN_GAP = 24                              # Narrowest horizontal gap between linked platforms
+SIDE_CLEARANCE = 16                       # Free space kept either side of a platform
+HEADROOM = PLAYER_HEIGHT + 16             # Free space kept above a platform to stand on it
+EDGE_MARGIN = 64                          # Distance kept from the world's sides and top
+MAX_PATH_DROP = 60                        # The main path never descends more than this per step
+MAX_BRANCH_DROP = 400                     # Branches may drop further
+
+# Failed placements before a platform stops being used as a branch parent
+MAX_PARENT_FAILURES = 6
+
+# World area budgeted per platform when the caller doesn't give a size
+AREA_PER_PLATFORM = 300000
+
+# Fraction of the physical jump reach/height the generator allows itself
+DEFAULT_MARGIN = 0.8
+
+class SpatialGrid:
+    """Uniform grid of rectangles for fast overlap tests"""
+    def __init__(self, cell_size=512):
+        self.cell_size = cell_size
+        self.cells = {}
+
+    def insert(self, x, y, width, height, owner):
+        """Add a rectangle tagged with the index of the platform it belongs to"""
+        item = (x, y, x + width, y + height, owner)
+        size = self.cell_size
+        for cx in range(x // size, (x + width) // size + 1):
+            for cy in range(y // size, (y + height) // size + 1):
+                cell = self.cells.get((cx, cy))
+                if cell is None:
+                    self.cells[(cx, cy)] = [item]
+                else:
+                    cell.append(item)
+
+    def hits(self, x, y, width, height, ignore=-1):
+        """Check if a rectangle overlaps anything not owned by `ignore`"""
+        right = x + width
+        bottom = y + height
+        size = self.cell_size
+        cells = self.cells
+        for cx in range(x // size, right // size + 1):
+            for cy in range(y // size, bottom // size + 1):
+                for left, top, item_right, item_bottom, owner in cells.get((cx, cy), ()):
+                    if owner != ignore and left < right and x < item_right and top < bottom and y < item_bottom:
+                        return True
+        return False
+
+    def owners(self, x, y, width, height):
+        """Owners of every rectangle overlapping this one"""
+        right = x + width
+        bottom = y + height
+        size = self.cell_size
+        found = set()
+        for cx in range(x // size, right // size + 1):
+            for cy in range(y // size, bottom // size + 1):
+                for left, top, item_right, item_bottom, owner in self.cells.get((cx, cy), ()):
+                    if left < right and x < item_right and top < bottom and y < item_bottom:
+                        found.add(owner)
+        return found
+
+class LevelGenerator:
+    """Seeded procedural level generator whose every platform is reachable from the spawn
+
+    Levels are built as a tree: a spawn platform, a main path climbing towards the
+    far side of the world (ending at the victory zone), and branches grown from
+    random existing platforms. Every new platform is placed within the jump
+    envelope of its parent, and the air the player passes through on that jump is
+    reserved so no later platform can block it.
+
+    The result is a plain dict (see generate) rather than sprites, so huge worlds
+    are cheap to produce; level_format.level_from_dict turns one into a loadable Level.
+    """
+    def __init__(self, seed=None, platform_count=200, world_width=None, world_height=None,
+                 type_mix=None, double_jump=True, margin=DEFAULT_MARGIN):
+        self.seed = seed if seed is not None else random.randrange(2**32)
+        self.rng = random.Random(self.seed)
+        self.random = self.rng.random  # Bound once: the generator draws several numbers per attempt
+        self.platform_count = platform_count
+
+        # Size the world to the platform count unless told otherwise (4:3 like the screen)
+        if world_width is None or world_height is None:
+            area = max(platform_count * AREA_PER_PLATFORM, WORLD_WIDTH * WORLD_HEIGHT)
+            world_height = int((area * 3 / 4) ** 0.5)
+            world_width = area // world_height
+        self.world_width = int(world_width)
+        self.world_height = int(world_height)
+
+        self.type_mix = dict(type_mix or DEFAULT_TYPE_MIX)
+        unknown = set(self.type_mix) - set(PLATFORM_WIDTHS)
+        if unknown:
+            raise ValueError(f"Unknown platform types: {', '.join(sorted(unknown))}")
+        self.type_names = list(self.type_mix)
+        self.type_cumulative = list(accumulate(self.type_mix[name] for name in self.type_names))
+        self.path_types = [name for name in PATH_TYPES if name in self.type_mix] or ["normal"]
+
+        self.margin = margin
+        self.fall = get_jump_envelope(False, walk_off=True)
+        self.single = get_jump_envelope(False)
+        self.envelope = get_jump_envelope(True) if double_jump else self.single
+
+        # Playable band: below the top margin, above the deadly ground
+        self.min_y = EDGE_MARGIN + HEADROOM
+        self.max_y = self.world_height - GROUND_HEIGHT - 80
+
+    def generate(self):
+        """Generate a level dict: world size, seed, spawn, victory zone and platform list"""
+        self.platforms = []    # Platform dicts, index = owner id in the grids
+        self.parents = []      # Indices that branches may grow from
+        self.solid = SpatialGrid()     # Platform footprints (swept range for movers)
+        self.air = SpatialGrid()       # Reserved jump arcs
+
+        # Spawn platform in the bottom-left corner, like the hand-made levels
+        spawn = self.add_platform("normal", 100, self.max_y, 300, PLATFORM_HEIGHT, None)
+
+        last = self.build_main_path(spawn)
+        victory_zone = [self.platforms[last]["x"], self.platforms[last]["y"] - 100,
+                        self.platforms[last]["width"], 100]
+
+        self.grow_branches()
+
+        return {
+            "name": f"generated-{self.seed}",
+            "seed": self.seed,
+            "world": {"width": self.world_width, "height": self.world_height},
+            "spawn": [self.platforms[spawn]["x"] + 100, self.platforms[spawn]["y"] - PLAYER_HEIGHT - 5],
+            "victory_zone": victory_zone,
+            "platforms": self.platforms
+        }
+
+    def build_main_path(self, current):
+        """Climb rightwards from the spawn towards the top-right corner; returns the last platform"""
+        rng = self.rng
+        envelope = self.single  # The main path never needs a double jump
+        max_rise = int(envelope.max_rise * self.margin)
+        target_right = self.world_width - EDGE_MARGIN
+
+        while True:
+            parent = self.platforms[current]
+            remaining_x = target_right - (parent["x"] + parent["width"])
+            if remaining_x < 200:
+                break
+
+            # Spread the climb evenly over the steps left, within what one jump allows
+            steps_left = max(1, remaining_x / 300)
+            desired_rise = min(max_rise, max(0, (parent["y"] - self.min_y) / steps_left))
+
+            placed = None
+            for _ in range(20):
+                rise = int(rng.uniform(max(-MAX_PATH_DROP, desired_rise * 0.5 - 20),
+                                       min(max_rise, desired_rise * 1.5 + 20)))
+                kind = rng.choice(self.path_types)
+                placed = self.try_place(current, kind, 1, rise, envelope)
+                if placed is not None:
+                    break
+            if placed is None:
+                break
+            current = placed
+        return current
+
+    def grow_branches(self):
+        """Attach platforms to random reachable ones until the count is met or space runs out"""
+        random = self.random
+        max_rise = int(self.envelope.max_rise * self.margin)
+        parents = self.parents
+        failures = {}
+        type_names = self.type_names
+        cumulative = self.type_cumulative
+        total_weight = cumulative[-1]
+
+        # Active-list growth: a parent that keeps failing is crowded and is retired
+        while len(self.platforms) < self.platform_count and parents:
+            slot = int(random() * len(parents))
+            parent = parents[slot]
+            kind = type_names[bisect(cumulative, random() * total_weight)]
+            direction = 1 if random() < 0.5 else -1
+            rise = self.randint(-MAX_BRANCH_DROP, max_rise)
+            if self.try_place(parent, kind, direction, rise, self.envelope) is not None:
+                continue
+
+            failures[parent] = failures.get(parent, 0) + 1
+            if failures[parent] >= MAX_PARENT_FAILURES:
+                # Swap-remove keeps retirement O(1)
+                parents[slot] = parents[-1]
+                parents.pop()
+
+    def try_place(self, parent_index, kind, direction, rise, envelope):
+        """Try to place a platform of `kind` one jump from the parent; returns its index or None"""
+        parent = self.platforms[parent_index]
+
+        reach = int(envelope.reach(rise) * self.margin)
+        if reach < MIN_GAP:
+            return None
+        gap = self.randint(MIN_GAP, reach)
+
+        min_width, max_width = PLATFORM_WIDTHS[kind]
+        width = self.randint(min_width, max_width)
+        y = parent["y"] - rise
+        if direction > 0:
+            x = parent["x"] + parent["width"] + gap
+        else:
+            x = parent["x"] - gap - width
+
+        # Movers rest at this spot (the end nearest the parent) and travel away from the parent
+        travel = self.randint(80, 240) if kind == "moving" else 0
+        swept_x = x - travel if direction < 0 else x
+        swept_width = width + travel
+
+        if swept_x < EDGE_MARGIN or swept_x + swept_width > self.world_width - EDGE_MARGIN:
+            return None
+        if y < self.min_y or y > self.max_y:
+            return None
+
+        # The new platform (with room to stand on it) must be clear of other platforms and jump arcs
+        footprint = (swept_x - SIDE_CLEARANCE, y - HEADROOM,
+                     swept_width + SIDE_CLEARANCE * 2, PLATFORM_HEIGHT + HEADROOM)
+        if self.solid.hits(*footprint) or self.air.hits(*footprint):
+            return None
+
+        # The arc from the parent's edge must not pass through any other platform
+        arc = self.jump_arc(parent, x, y, width, gap, rise, direction)
+        if self.solid.hits(*arc, ignore=parent_index):
+            return None
+
+        params = {}
+        if kind == "moving":
+            params = {"start_x": swept_x, "end_x": swept_x + travel,
+                      "start_at_end": direction < 0, "speed": self.randint(30, 60)}
+        elif kind == "bouncy":
+            params = {"bounce_strength": 1.5}
+        elif kind == "disappearing":
+            params = {"disappear_time": 3.0}
+
+        index = self.add_platform(kind, x, y, width, PLATFORM_HEIGHT, parent_index, params, footprint)
+        self.air.insert(*arc, index)
+        return index
+
+    def randint(self, low, high):
+        """rng.randint without its argument checking overhead"""
+        return low + int(self.random() * (high - low + 1))
+
+    def jump_arc(self, parent, x, y, width, gap, rise, direction):
+        """Rectangle of air a jump from the parent to a platform at (x, y) passes through"""
+        # Use the lowest way across: run off the edge, single jump, then double jump
+        if rise < 0 and self.fall.can_reach(gap, rise, self.margin):
+            apex = 0
+        elif self.single.can_reach(gap, rise, self.margin):
+            apex = self.single.max_rise
+        else:
+            apex = self.envelope.max_rise
+
+        top = parent["y"] - apex - PLAYER_HEIGHT
+        bottom = max(parent["y"], y)
+        if direction > 0:
+            left = parent["x"] + parent["width"] - PLAYER_WIDTH
+            right = x + PLAYER_WIDTH
+        else:
+            left = x + width - PLAYER_WIDTH
+            right = parent["x"] + PLAYER_WIDTH
+        return (left, top, right - left, bottom - top)
+
+    def add_platform(self, kind, x, y, width, height, parent, params=None, footprint=None):
+        """Record a platform and its footprint; returns its index"""
+        index = len(self.platforms)
+        platform = {"type": kind, "x": x, "y": y, "width": width, "height": height, "parent": parent}
+        if params:
+            platform.update(params)
+        self.platforms.append(platform)
+
+        if footprint is None:
+            footprint = (x - SIDE_CLEARANCE, y - HEADROOM, width + SIDE_CLEARANCE * 2, height + HEADROOM)
+        self.solid.insert(*footprint, index)
+        if kind not in LEAF_TYPES:
+            self.parents.append(index)
+        return index
+
+def generate_level(seed=None, platform_count=200, world_width=None, world_height=None,
+                   type_mix=None, double_jump=True):
+    """Generate a level dict (see LevelGenerator)"""
+    return LevelGenerator(seed, platform_count, world_width, world_height, type_mix, double_jump).generate()
+
+def validate_level(level, double_jump=True):
+    """Independently check every platform is reachable from the spawn platform
+
+    Rebuilds the link graph from the platform geometry alone (any pair within the
+    physical jump envelope, without the generator's safety margin) and returns the
+    indices of platforms a breadth-first search from the spawn platform can't reach.
+    Moving platforms are checked at their resting position.
+    """
+    envelope = get_jump_envelope(double_jump)
+    platforms = level["platforms"]
+    max_rise = envelope.max_rise
+
+    grid = SpatialGrid()
+    for index, platform in enumerate(platforms):
+        grid.insert(platform["x"], platform["y"], platform["width"], platform["height"], index)
+
+    def neighbours(index):
+        source = platforms[index]
+        reach = envelope.reach(-envelope.max_drop)
+        left = source["x"] - reach
+        top = source["y"] - max_rise
+        width = source["width"] + reach * 2
+        height = max_rise + envelope.max_drop
+        size = grid.cell_size
+        seen = set()
+        for cx in range(left // size, (left + width) // size + 1):
+            for cy in range(top // size, (top + height) // size + 1):
+                for item in grid.cells.get((cx, cy), ()):
+                    target = item[4]
+                    if target in seen or target == index:
+                        continue
+                    seen.add(target)
+                    other = platforms[target]
+                    if other["x"] >= source["x"] + source["width"]:
+                        gap = other["x"] - (source["x"] + source["width"])
+                    elif other["x"] + other["width"] <= source["x"]:
+                        gap = source["x"] - (other["x"] + other["width"])
+                    else:
+                        continue  # Stacked directly above/below: not a jump the generator makes
+                    if envelope.can_reach(gap, source["y"] - other["y"]):
+                        yield target
+
+    reached = {0}
+    frontier = [0]
+    while frontier:
+        index = frontier.pop()
+        if platforms[index]["type"] in LEAF_TYPES:
+            continue
+        for target in neighbours(index):
+            if target not in reached:
+                reached.add(target)
+                frontier.append(target)
+    return [index for index in range(len(platforms)) if index not in reached]
+
+if __name__ == "__main__":
+    import argparse
+    from collections import Counter
+
+    parser = argparse.ArgumentParser(description="Generate a procedural level and check its reachability")
+    parser.add_argument("--seed", type=int, default=None, help="random seed (random if omitted)")
+    parser.add_argument("--platforms", type=int, default=10000, help="number of platforms to aim for")
+    parser.add_argument("--width", type=int, default=None, help="world width (sized to the platform count if omitted)")
+    parser.add_argument("--height", type=int, default=None, help="world height (sized to the platform count if omitted)")
+    parser.add_argument("--no-double-jump", action="store_true", help="only use gaps a single jump can cross")
+    parser.add_argument("--output", default=None, help="write the level to this file (.lvl for the compiled format, JSON otherwise)")
+    args = parser.parse_args()
+
+    # Build the jump envelopes before timing (done once per process)
+    get_jump_envelope(False)
+    get_jump_envelope(True)
+
+    start = time.perf_counter()
+    level = generate_level(args.seed, args.platforms, args.width, args.height,
+                           double_jump=not args.no_double_jump)
+    elapsed = time.perf_counter() - start
+
+    world = level["world"]
+    print(f"🧱 Generated {len(level['platforms'])} platforms in a {world['width']}x{world['height']} world "
+          f"(seed {level['seed']}) in {elapsed * 1000:.0f}ms")
+    if len(level["platforms"]) < args.platforms:
+        print(f"⚠️ Only room for {len(level['platforms'])} of {args.platforms} platforms - try a bigger world")
+    print("   " + ", ".join(f"{kind}: {count}" for kind, count in Counter(p["type"] for p in level["platforms"]).most_common()))
+
+    unreachable = validate_level(level, not args.no_double_jump)
+    if unreachable:
+        print(f"❌ {len(unreachable)} platforms are unreachable from the spawn")
+    else:
+        print("✅ Every platform is reachable from the spawn")
+
+    if args.output:
+        if args.output.endswith(".lvl"):
+            from level_format import compile_level
+            with open(args.output, "wb") as f:
+                f.write(compile_level(level))
+        else:
+            import json
+            with open(args.output, "w") as f:
+                json.dump(level, f)
+        print(f"💾 Level written to {args.output}")
+
+    sys.exit(1 if unreachable else 0)
@@ -1,21 +1,39 @@
+import time
+STARTUP_TIME = time.perf_counter()  # Before the imports, for --startup-profile
 import pygame
 import sys
+import random
+import argparse
+import game_log
 from settings import *
 from player import Player
-from platforms import (Platform, Ground, MovingPlatform, DisappearingPlatform, 
-                      VerticalMovingPlatform, RotatingPlatform, OneWayPlatform, 
-                      BouncyPlatform, IcePlatform, TeleporterElevator)
-from powerups import PowerUp
+from controls import InputManager
+from replay import SessionRecorder, pack_controls, BIT_RESTART, BIT_PAUSE, BIT_ERASE
+from assets import backgrounds
 from character_select import CharacterSelectScreen
-from tutorial import TutorialLevel
-from demo import DemoLevel
+from prewarm import Prewarmer
+from render_queue import RenderQueue
+from enemy_manager import EnemyManager
+from timers import Scheduler
+
+# The level modules and the tutorial and demo modes are imported when first used,
+# so the character select screen comes up without them
 
 class Camera:
-    def __init__(self):
+    def __init__(self, world_width=WORLD_WIDTH, world_height=WORLD_HEIGHT):
         self.x = 0
         self.y = 0
         self.target_x = 0
         self.target_y = 0
+        
+        # Bounds of the level being shown
+        self.world_width = world_width
+        self.world_height = world_height
+    
+    def set_world_size(self, world_width, world_height):
+        """Clamp to a new level's bounds"""
+        self.world_width = world_width
+        self.world_height = world_height
     
     def update(self, target_rect):
         """Update camera position to follow target with smoothing"""
@@ -24,8 +42,8 @@ class Camera:
         self.target_y = target_rect.centery - SCREEN_HEIGHT // 2
         
         # Apply camera bounds (don't go outside world)
-        self.target_x = max(0, min(self.target_x, WORLD_WIDTH - SCREEN_WIDTH))
-        self.target_y = max(0, min(self.target_y, WORLD_HEIGHT - SCREEN_HEIGHT))
+        self.target_x = max(0, min(self.target_x, self.world_width - SCREEN_WIDTH))
+        self.target_y = max(0, min(self.target_y, self.world_height - SCREEN_HEIGHT))
         
         # Smooth camera movement
         self.x += (self.target_x - self.x) * CAMERA_SMOOTHING
@@ -40,156 +58,186 @@ class Camera:
         return (x - self.x, y - self.y)
 
 class Game:
-    def __init__(self):
+    def __init__(self, record_path=None, generate=None, demo_controller="learning", demo_ghosts=0,
+                 demo_frontier=False, startup_profile=False):
+        # Optional startup timings (python main.py --startup-profile): (phase, seconds since start)
+        self.startup_marks = [("imports", time.perf_counter() - STARTUP_TIME)] if startup_profile else None
+        
         # Initialize Pygame
         pygame.init()
         
         # Set up the display
         self.screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
         pygame.display.set_caption("Pygame Platformer - Character Selection")
+        self.mark_startup("display")
         
         # Set up the clock for consistent framerate
         self.clock = pygame.time.Clock()
         
-        # Load background image
-        self.load_background()
-        
         # Game state management
         self.state = GAME_STATE_CHARACTER_SELECT
         self.character_config = None
         
         # Initialize character selection screen
         self.character_select = CharacterSelectScreen(self.screen)
+        self.mark_startup("character select")
+        
+        # Background builds for the highlighted selection (started once the menu is on screen)
+        self.prewarm = False
+        self.prewarmer = None
         
         # Tutorial system
         self.tutorial_level = None
         
         # Demo system
         self.demo_level = None
+        self.demo_controller = demo_controller  # One of settings.DEMO_CONTROLLERS
+        self.demo_ghosts = demo_ghosts  # Ghost agents exploring alongside the learning AI
+        self.demo_frontier = demo_frontier  # Start most demo attempts from archived frontier snapshots
         
-        # Track key states for proper input handling
-        self.keys_pressed = pygame.key.get_pressed()
-        self.previous_keys = pygame.key.get_pressed()
+        # Edge-triggered input built from KEYDOWN/KEYUP events
+        self.input = InputManager()
         
         # Game objects (initialized after character selection)
         self.all_sprites = None
         self.platforms = None
         self.player = None
+        self.level = None  # level_format.Level being played
+        
+        # Optional procedural level ({"seed", "platforms"}), streamed in chunks around the camera
+        self.generate = generate
+        self.generated_level = None
+        self.streamer = None
+        
+        # Bounds of the current level
+        self.world_width = WORLD_WIDTH
+        self.world_height = WORLD_HEIGHT
+        self.ground_y = WORLD_HEIGHT - GROUND_HEIGHT
         
         # Game state
         self.running = True
         
+        # Optional session recording (python main.py --record FILE)
+        self.recorder = SessionRecorder(record_path) if record_path else None
+        
         # Initialize camera
         self.camera = Camera()
+        self.render_queue = RenderQueue(self.screen)
     
-    def load_background(self):
-        """Load and prepare the background image"""
-        # We'll load theme-specific backgrounds later when theme is selected
-        self.background_images = {}
-        
-        # Background file mapping for each theme
-        background_files = {
-            'crystal': 'Back round Crystal.png',
-            'forest': 'Background forest gardioun.png', 
-            'metal': 'Background Cyber runner.png',
-            'stone': 'Background anchiant explorer.png'
-        }
-        
-        # Load all theme backgrounds
-        for theme_name, filename in background_files.items():
-            try:
-                bg_image = pygame.image.load(f"Assets/{filename}").convert()
-                # Scale background to fit screen
-                bg_image = pygame.transform.scale(bg_image, (SCREEN_WIDTH, SCREEN_HEIGHT))
-                self.background_images[theme_name] = bg_image
-                print(f"Loaded background for {theme_name}: {filename}")
-            except Exception as e:
-                print(f"Warning: Could not load background for {theme_name}: {e}")
-                self.background_images[theme_name] = None
+    def mark_startup(self, phase):
+        """Record when a startup phase finished (with --startup-profile)"""
+        if self.startup_marks is not None:
+            self.startup_marks.append((phase, time.perf_counter() - STARTUP_TIME))
     
-    def init_game_world(self):
+    def print_startup_profile(self):
+        """Print how long each startup phase took, up to the first frame on screen"""
+        print("⏱️ Startup profile:")
+        previous = 0.0
+        for phase, elapsed in self.startup_marks:
+            print(f"   {phase:<18} {(elapsed - previous) * 1000:7.1f} ms")
+            previous = elapsed
+        print(f"   {'first frame at':<18} {previous * 1000:7.1f} ms")
+        self.startup_marks = None
+    
+    def init_game_world(self, use_generated=True):
         """Initialize the game world after character selection"""
+        from platforms import PlatformGroup
+        
+        # Stop streaming the previous world
+        if self.streamer is not None:
+            self.streamer.close()
+            self.streamer = None
+        
         # Create sprite groups
         self.all_sprites = pygame.sprite.Group()
-        self.platforms = pygame.sprite.Group()
+        self.platforms = PlatformGroup()
         self.powerups = pygame.sprite.Group()
+        self.enemies = EnemyManager()
         
         # Create larger level with platforms leading to top-right
-        self.create_large_level()
+        if self.generate and use_generated:
+            self.create_generated_level()
+        else:
+            self.create_large_level()
+        
+        # Every timer in the world (power-ups, platforms, enemies) runs on one clock
+        self.timers = Scheduler()
+        self.platforms.timers = self.timers
+        self.enemies.timers = self.timers
         
         # Create player on the first safe platform (not near deadly ground!)
-        start_x = 200  # On the first platform at (150, WORLD_HEIGHT - 180, 250, 25)
-        start_y = WORLD_HEIGHT - 180 - PLAYER_HEIGHT - 5  # Just above first platform
-        self.player = Player(start_x, start_y, self.character_config)
-        self.all_sprites.add(self.player)
+        start_x, start_y = self.spawn
+        self.player = Player(start_x, start_y, self.character_config, self.timers)
+        self.player.world_width = self.world_width
         
         # Initialize camera to follow player
+        self.camera.set_world_size(self.world_width, self.world_height)
         self.camera.update(self.player.rect)
+        
+        # Stream in the chunks around the start before the player joins the draw list
+        if self.streamer is not None:
+            self.streamer.update(self.camera, self.player.rect)
+        self.all_sprites.add(self.player)
     
     def create_large_level(self):
         """Create a simplified level with only basic platforms for easier AI learning"""
-        theme = THEMES[self.character_config['theme']]
+        from level_format import load_level
         
-        # Ground platform spans the entire bottom (this is deadly!)
-        ground = Ground(0, WORLD_HEIGHT - GROUND_HEIGHT, WORLD_WIDTH, theme)
-        self.platforms.add(ground)
-        self.all_sprites.add(ground)
+        # ULTRA-SIMPLIFIED: Very close platforms forming an obvious staircase pattern (levels/staircase.json)
+        self.build_level_world(load_level("staircase"))
         
-        # Create an EVEN SIMPLER level for AI learning - much closer platforms!
-        # ULTRA-SIMPLIFIED: Very close platforms forming an obvious staircase pattern
-        platforms_data = [
-            # Starting area - safe landing
-            (100, WORLD_HEIGHT - 180, 300, 25),   # Large starting platform
-            
-            # Simple staircase with VERY small gaps - obvious path up and right
-            (250, WORLD_HEIGHT - 240, 200, 25),   # Step 1: Small jump up
-            (400, WORLD_HEIGHT - 300, 200, 25),   # Step 2: Continue up-right  
-            (550, WORLD_HEIGHT - 360, 200, 25),   # Step 3: Keep going
-            (700, WORLD_HEIGHT - 420, 200, 25),   # Step 4: Almost there
-            (850, WORLD_HEIGHT - 480, 200, 25),   # Step 5: Near the top
-            (1000, WORLD_HEIGHT - 540, 200, 25),  # Step 6: Getting close
-            (1150, WORLD_HEIGHT - 600, 200, 25),  # Step 7: Almost victory
-            (1300, WORLD_HEIGHT - 660, 300, 30),  # VICTORY PLATFORM - extra big!
-            
-            # Alternative slightly easier path (for learning)
-            (200, WORLD_HEIGHT - 220, 150, 25),   # Alternative step 1
-            (350, WORLD_HEIGHT - 280, 150, 25),   # Alternative step 2
-            (500, WORLD_HEIGHT - 340, 150, 25),   # Alternative step 3
-            (650, WORLD_HEIGHT - 400, 150, 25),   # Alternative step 4
-            (800, WORLD_HEIGHT - 460, 150, 25),   # Alternative step 5
-            (950, WORLD_HEIGHT - 520, 150, 25),   # Alternative step 6
-            (1100, WORLD_HEIGHT - 580, 150, 25),  # Alternative step 7
-        ]
-        
-        # Create all platforms as basic Platform objects
-        for x, y, width, height in platforms_data:
-            platform = Platform(x, y, width, height, theme)
-            self.platforms.add(platform)
-            self.all_sprites.add(platform)
-        
-        # Create victory zone at a much more achievable location
-        self.victory_zone = pygame.Rect(1200, WORLD_HEIGHT - 720, 400, 100)
-        
-        print("🎯 Created ULTRA-simplified staircase level for AI learning!")
-        print(f"🏆 Victory zone at: {self.victory_zone.x}, {self.victory_zone.y}")
-        print("💡 Clear staircase pattern - just jump up and right repeatedly!")
+        game_log.info("level", "🎯 Created ULTRA-simplified staircase level for AI learning!")
+        game_log.info("level", f"🏆 Victory zone at: {self.victory_zone.x}, {self.victory_zone.y}")
+        game_log.info("level", "💡 Clear staircase pattern - just jump up and right repeatedly!")
     
-    def handle_input(self):
-        """Handle input based on current game state"""
-        # Update key states
-        self.previous_keys = self.keys_pressed
-        self.keys_pressed = pygame.key.get_pressed()
+    def create_generated_level(self):
+        """Create a procedural level (see level_generator.py) that streams in around the camera"""
+        from level_generator import generate_level
+        from level_format import level_from_dict
+        
+        # Generated once per run; restarts reuse the same layout
+        if self.generated_level is None:
+            self.generated_level = level_from_dict(generate_level(self.generate['seed'], self.generate['platforms']))
+        self.build_level_world(self.generated_level)
+        
+        game_log.info("level", f"🗺️ Generated level '{self.level_id}': {self.level.platform_count} platforms "
+                      f"in a {self.world_width}x{self.world_height} world")
+        game_log.info("level", f"🏆 Victory zone at: {self.victory_zone.x}, {self.victory_zone.y}")
     
-    def get_keys_just_pressed(self):
-        """Get keys that were just pressed this frame"""
-        keys_just_pressed = {}
-        for i in range(len(self.keys_pressed)):
-            keys_just_pressed[i] = self.keys_pressed[i] and not self.previous_keys[i]
-        return keys_just_pressed
+    def build_level_world(self, level):
+        """Fill the sprite groups from a level, streaming big levels in around the camera"""
+        from level_format import build_level
+        from world_streaming import ChunkStreamer, EAGER_PLATFORM_LIMIT
+        
+        theme = THEMES[self.character_config['theme']]
+        self.level = level
+        self.level_id = level.name  # Level identity for session recordings
+        self.world_width = level.world_width
+        self.world_height = level.world_height
+        self.ground_y = level.ground_y
+        self.spawn = level.spawn
+        self.victory_zone = pygame.Rect(level.victory_zone)
+        
+        prebuilt = None
+        if self.prewarmer is not None and level.platform_count <= EAGER_PLATFORM_LIMIT:
+            prebuilt = self.prewarmer.take_level(level.name, self.character_config['theme'])
+        
+        if level.platform_count > EAGER_PLATFORM_LIMIT:
+            self.streamer = ChunkStreamer(level, theme, self.platforms, self.all_sprites, self.powerups, self.enemies)
+        elif prebuilt is not None:
+            # Built while the character select menu was open (the groups are still empty here)
+            _, self.all_sprites, self.platforms, self.powerups, self.enemies = prebuilt
+        else:
+            build_level(level, theme, self.platforms, self.all_sprites, self.powerups, self.enemies)
     
     def handle_events(self):
         """Handle all game events"""
+        # Forget last frame's key edges before reading new events
+        self.input.begin_frame()
+        
         for event in pygame.event.get():
+            self.input.process_event(event)
+            
             if event.type == pygame.QUIT:
                 self.running = False
             elif event.type == pygame.KEYDOWN:
@@ -206,51 +254,107 @@ class Game:
                         self.init_game_world()
                         self.state = GAME_STATE_PLAYING
     
-    def update(self):
+    def start_recording(self, mode, level_id, level_params=None, controller=None, ghosts=0, frontier=False):
+        """Seed the RNG and start recording the session, if recording was requested"""
+        if self.recorder is None or self.recorder.active or self.recorder.finished:
+            return  # Only the first session of a run is recorded
+        
+        seed = random.randrange(2 ** 32)
+        random.seed(seed)
+        self.recorder.start(mode, level_id, self.character_config, seed, level_params, controller, ghosts, frontier)
+    
+    def record_tick(self, dt_ms):
+        """Record the inputs and player position for the tick just simulated"""
+        mode = self.recorder.header['mode']
+        if mode == GAME_STATE_DEMO:
+            player = self.demo_level.player
+            bits = pack_controls(player.controls)
+            # Hotkeys that change the simulation
+            for bit, key in ((BIT_RESTART, pygame.K_r), (BIT_PAUSE, pygame.K_p), (BIT_ERASE, pygame.K_e)):
+                if key in self.input.just_pressed:
+                    bits |= bit
+        elif mode == GAME_STATE_TUTORIAL:
+            player = self.tutorial_level.player
+            bits = pack_controls(self.input.controls)
+        else:
+            player = self.player
+            bits = pack_controls(self.input.controls)
+        
+        self.recorder.record_tick(dt_ms, bits, player.rect)
+    
+    def update(self, dt_ms=None):
         """Update game based on current state"""
-        dt = self.clock.get_time() / 1000.0  # Delta time in seconds
+        if dt_ms is None:
+            dt_ms = self.clock.get_time()  # Whole milliseconds, so recordings replay exactly
+        dt = dt_ms / 1000.0  # Delta time in seconds
+        
+        # Only ticks simulated in the recorded session's own state are recorded
+        recording = (self.recorder is not None and self.recorder.active and
+                     self.state == self.recorder.header['mode'])
         
         if self.state == GAME_STATE_CHARACTER_SELECT:
             self.character_select.update(dt)
             
+            # While the menu is open, build what the highlighted selection will need
+            if self.prewarm:
+                if self.prewarmer is None:
+                    self.prewarmer = Prewarmer()
+                self.prewarmer.request(self.character_select.get_character_config())
+            
             # Check if character selection is complete
-            keys_just_pressed = self.get_keys_just_pressed()
-            if self.character_select.handle_input(self.keys_pressed, keys_just_pressed):
-                print("Character selection complete!")
+            if self.character_select.handle_input(self.input.held, self.input.just_pressed):
+                game_log.info("mode", "Character selection complete!")
                 self.character_config = self.character_select.get_character_config()
-                print(f"Character config: {self.character_config}")
+                game_log.info("mode", f"Character config: {self.character_config}")
                 
                 # Check if demo was requested
                 if self.character_config.get('start_demo', False):
-                    print("Demo mode requested - initializing...")
-                    # Initialize game world first for demo to copy
-                    self.init_game_world()
-                    print("Game world initialized, creating DemoLevel...")
-                    self.demo_level = DemoLevel(self.screen, self.character_config, self)
-                    print("DemoLevel created successfully!")
+                    game_log.info("mode", "Demo mode requested - initializing...")
+                    # Initialize game world first for demo to copy (the AI learns the staircase)
+                    self.init_game_world(use_generated=False)
+                    self.start_recording(GAME_STATE_DEMO, self.level_id, controller=self.demo_controller,
+                                         ghosts=self.demo_ghosts, frontier=self.demo_frontier)
+                    game_log.info("mode", "Game world initialized, creating DemoLevel...")
+                    from demo import DemoLevel
+                    learning_data = self.prewarmer.take_learning_data() if self.prewarmer else None
+                    self.demo_level = DemoLevel(self.screen, self.character_config, self, learning_data,
+                                                controller=self.demo_controller, ghosts=self.demo_ghosts,
+                                                frontier=self.demo_frontier)
+                    if self.recorder and self.recorder.active:
+                        self.recorder.set_learning_data(self.demo_level.ai.get_learning_data())
+                    game_log.info("mode", "DemoLevel created successfully!")
                     self.state = GAME_STATE_DEMO
                 # Check if tutorial was requested
                 elif self.character_config.get('start_tutorial', False):
-                    print("Tutorial mode requested - initializing...")
+                    game_log.info("mode", "Tutorial mode requested - initializing...")
+                    from tutorial import TutorialLevel
+                    self.start_recording(GAME_STATE_TUTORIAL, TutorialLevel.level_id)
                     self.tutorial_level = TutorialLevel(self.screen, self.character_config)
-                    print("Tutorial created successfully!")
+                    self.camera.set_world_size(self.tutorial_level.world_width, self.tutorial_level.world_height)
+                    game_log.info("mode", "Tutorial created successfully!")
                     self.state = GAME_STATE_TUTORIAL
                 else:
-                    print("Normal gameplay mode - initializing...")
+                    game_log.info("mode", "Normal gameplay mode - initializing...")
                     self.init_game_world()
-                    print("Game world initialized successfully!")
+                    self.start_recording(GAME_STATE_PLAYING, self.level_id,
+                                         self.generate if self.level is self.generated_level else None)
+                    game_log.info("mode", "Game world initialized successfully!")
                     self.state = GAME_STATE_PLAYING
                 
+                # Whatever the menu prewarmed has been picked up by now (a job still running finishes on its own)
+                if self.prewarmer is not None:
+                    self.prewarmer.close(timeout=0)
+                    self.prewarmer = None
+                
         elif self.state == GAME_STATE_TUTORIAL:
             if self.tutorial_level:
-                self.tutorial_level.update(dt)
+                self.tutorial_level.update(dt, self.input.controls)
                 
                 # Update camera for tutorial
                 self.camera.update(self.tutorial_level.player.rect)
                 
                 # Check if tutorial is complete or skipped
-                keys_just_pressed = self.get_keys_just_pressed()
-                if self.tutorial_level.is_complete() or self.tutorial_level.should_skip(keys_just_pressed):
+                if self.tutorial_level.is_complete() or self.tutorial_level.should_skip(self.input.just_pressed):
                     self.init_game_world()
                     self.state = GAME_STATE_PLAYING
                 
@@ -262,7 +366,7 @@ class Game:
                 self.camera.update(self.demo_level.player.rect)
                 
                 # Check if demo should exit or restart
-                keys_just_pressed = self.get_keys_just_pressed()
+                keys_just_pressed = self.input.just_pressed
                 if self.demo_level.should_exit(keys_just_pressed):
                     self.state = GAME_STATE_CHARACTER_SELECT
                 elif self.demo_level.should_restart(keys_just_pressed):
@@ -273,67 +377,62 @@ class Game:
                     pass
                 
         elif self.state == GAME_STATE_PLAYING:
+            # Bring in the chunks around the camera and player before anything collides
+            if self.streamer is not None and self.streamer.update(self.camera, self.player.rect):
+                # Keep the player drawn on top of newly streamed platforms
+                self.all_sprites.remove(self.player)
+                self.all_sprites.add(self.player)
+            
+            # Fire the timers that came due this frame
+            self.timers.advance(dt)
+            
             # Handle player input
-            self.player.handle_input(self.keys_pressed)
+            self.player.apply_controls(self.input.controls)
             
             # Update player with platform collision
             self.player.update(self.platforms)
             
-            # Update all platforms (for moving/disappearing behavior) - use the same dt!
-            for platform in self.platforms:
-                platform.update(dt)
-                
-                # Special handling for teleporter elevator - same as tutorial
-                if hasattr(platform, 'rider') and platform.rider:
-                    # Check if rider is still on the platform
-                    if not self.player.rect.colliderect(platform.rect):
-                        platform.remove_rider()  # Remove rider if no longer touching
+            # Update the platforms that are moving or mid-effect - use the same dt!
+            self.platforms.update(dt)
             
-            # TEMPORARILY COMMENTED OUT: Power-up collection logic (uncomment when adding power-ups back)
-            # # Update power-ups
-            # for powerup in self.powerups:
-            #     powerup.update(dt)
-            # 
-            # # Check power-up collection
-            # collected_powerups = pygame.sprite.spritecollide(self.player, self.powerups, False)
-            # for powerup in collected_powerups:
-            #     if not powerup.collected:
-            #         powerup.collect()
-            #         if powerup.powerup_type == "jump_boost":
-            #             self.player.add_powerup("jump_boost", 10.0)  # 10-second jump boost
-            #         self.powerups.remove(powerup)
-            #         self.all_sprites.remove(powerup)
+            # Update power-ups (placed by the level file)
+            for powerup in self.powerups:
+                powerup.update(dt)
+            
+            # Check power-up collection
+            collected_powerups = pygame.sprite.spritecollide(self.player, self.powerups, False)
+            for powerup in collected_powerups:
+                if not powerup.collected:
+                    powerup.collect()
+                    if powerup.powerup_type == "jump_boost":
+                        self.player.add_powerup("jump_boost", 10.0)  # 10-second jump boost
+                    self.powerups.remove(powerup)
+                    self.all_sprites.remove(powerup)
+            
+            # Update enemies and their projectiles (which don't hurt the player yet)
+            self.enemies.update(dt, self.platforms, self.player.rect)
             
             # Update camera
             self.camera.update(self.player.rect)
             
             # Check for death and victory
             self.check_death_and_victory()
+        
+        if recording:
+            self.record_tick(dt_ms)
+        
+        # The recorded session ends as soon as we leave its state
+        if self.recorder is not None and self.recorder.active and self.state != self.recorder.header['mode']:
+            self.recorder.finish()
     
     def draw_background(self, theme):
-        """Draw the background with theme coloring"""
-        # Get the theme key from the character config
-        theme_key = self.character_config['theme']
-        
-        if theme_key in self.background_images and self.background_images[theme_key]:
-            # Use the theme-specific background
-            bg_image = self.background_images[theme_key]
-            
-            # Calculate how many background tiles we need based on camera position
-            bg_x = int(-(self.camera.x % SCREEN_WIDTH))
-            bg_y = int(-(self.camera.y % SCREEN_HEIGHT))
-            
-            # Draw background tiles to cover the screen
-            for x in range(bg_x - SCREEN_WIDTH, SCREEN_WIDTH + SCREEN_WIDTH, SCREEN_WIDTH):
-                for y in range(bg_y - SCREEN_HEIGHT, SCREEN_HEIGHT + SCREEN_HEIGHT, SCREEN_HEIGHT):
-                    self.screen.blit(bg_image, (x, y))
-        else:
-            # Fallback to solid color background
-            self.screen.fill(theme['bg_color'])
+        """Draw the theme's background, scrolled with the camera"""
+        backgrounds.renderer(self.character_config['theme']).draw(self.screen, self.camera)
     
     def draw_powerup_ui(self):
         """Draw active power-up indicators on screen"""
-        if not self.player.active_powerups:
+        effects = self.player.effects
+        if not effects.active_effects:
             return
         
         # Set up fonts
@@ -341,7 +440,8 @@ class Game:
         small_font = pygame.font.Font(None, 20)
         
         y_offset = 20
-        for powerup_type, time_left in self.player.active_powerups.items():
+        for powerup_type in effects.active_effects:
+            time_left = effects.get_time_left(powerup_type)
             if powerup_type == "jump_boost":
                 # Draw jump boost indicator
                 icon_color = (100, 255, 100)
@@ -393,9 +493,9 @@ class Game:
             self.draw_background(theme)
             
             # Draw all sprites with camera offset
-            for sprite in self.all_sprites:
-                sprite_rect = self.camera.apply(sprite.rect)
-                self.screen.blit(sprite.image, sprite_rect)
+            self.render_queue.add_sprites(self.all_sprites, self.camera)
+            self.enemies.projectiles.queue_draw(self.render_queue, self.camera)
+            self.render_queue.draw()
             
             # Draw power-up UI
             self.draw_powerup_ui()
@@ -465,7 +565,7 @@ class Game:
     def check_death_and_victory(self):
         """Check if player has died or won"""
         # Death condition: touched the ground platform (bottom of world)
-        if self.player.rect.bottom >= WORLD_HEIGHT - GROUND_HEIGHT:
+        if self.player.rect.bottom >= self.ground_y:
             self.state = GAME_STATE_GAME_OVER
             return
         
@@ -476,26 +576,69 @@ class Game:
     
     def run(self):
         """Main game loop"""
+        first_frame = True
         while self.running:
-            # Handle events
+            # Handle events (including keyboard input)
             self.handle_events()
             
-            # Handle input
-            self.handle_input()
-            
             # Update game state
             self.update()
             
             # Draw everything
             self.draw()
+            if first_frame:
+                first_frame = False
+                if self.startup_marks is not None:
+                    self.mark_startup("first frame")
+                    self.print_startup_profile()
+                # Only the selected theme's background was needed so far; decode the rest while the menu is idle
+                backgrounds.prefetch()
+                self.prewarm = True
             
             # Control framerate
             self.clock.tick(FPS)
         
+        # Save any session still being recorded
+        if self.recorder is not None:
+            self.recorder.finish()
+        
+        if self.streamer is not None:
+            self.streamer.close()
+        if self.prewarmer is not None:
+            self.prewarmer.close()
+        
         # Clean up
         pygame.quit()
         sys.exit()
 
 if __name__ == "__main__":
-    game = Game()
+    parser = argparse.ArgumentParser(description="Pygame Platformer")
+    parser.add_argument("--record", metavar="FILE",
+                        help="record the first play/tutorial/demo session for replay.py")
+    parser.add_argument("--generate", type=int, metavar="SEED",
+                        help="play a procedural level generated from SEED instead of the staircase")
+    parser.add_argument("--platforms", type=int, default=2000,
+                        help="platform count for --generate (default 2000)")
+    parser.add_argument("--demo-ai", choices=DEMO_CONTROLLERS, default="learning",
+                        help="who plays the AI demo: the learning AI, the platform graph planner, "
+                             "the learning AI guided by the planner, or the learning AI's "
+                             "Q-learning backend (default learning)")
+    parser.add_argument("--demo-ghosts", type=int, default=0, metavar="N",
+                        help="run N ghost agents alongside the demo's learning AI, all learning into its memory "
+                             "(default 0)")
+    parser.add_argument("--demo-frontier", action="store_true",
+                        help="start most demo attempts from snapshots of the world at the furthest cells reached "
+                             "instead of the level's start")
+    parser.add_argument("--log-level", choices=game_log.LEVELS, default="info",
+                        help="least severe messages to log (default info; debug shows every AI decision)")
+    parser.add_argument("--log-file", metavar="FILE",
+                        help="write the JSON-lines log to FILE instead of stderr")
+    parser.add_argument("--startup-profile", action="store_true",
+                        help="print how long each startup phase took once the first frame is on screen")
+    args = parser.parse_args()
+    game_log.configure(args.log_level, args.log_file)
+    
+    generate = {"seed": args.generate, "platforms": args.platforms} if args.generate is not None else None
+    game = Game(record_path=args.record, generate=generate, demo_controller=args.demo_ai,
+                demo_ghosts=args.demo_ghosts, demo_frontier=args.demo_frontier, startup_profile=args.startup_profile)
     game.run() 
\ No newline at end of file
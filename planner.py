@@ -0,0 +1,220 @@
+import heapq
+import game_log
+from settings import *
+from platforms import Ground
+from platform_graph import get_platform_graph
+
+# Route cost is airborne frames, plus a flat cost per jump for walking to its take-off window
+JUMP_COST = 30
+# Extra cost for take-off windows narrower than one walking step (the player has to slide into them)
+NARROW_COST = 60
+# Extra cost for every time a jump has missed, so the route moves off jumps that keep failing
+FAILURE_COST = 120
+# Frames allowed to reach a take-off window before the jump counts as missed
+APPROACH_FRAMES = 240
+
+def slide_distance(vel_x):
+    """How far the player slides on normal ground after letting go at vel_x"""
+    distance = 0
+    speed = abs(vel_x)
+    while speed:
+        # Friction in apply_controls, the move, then friction again in update
+        speed *= (1 - FRICTION)
+        if speed < 0.1:
+            break
+        distance += int(speed + 0.5)
+        speed *= (1 - FRICTION)
+        if speed < 0.1:
+            break
+    return distance
+
+class GraphPlanner:
+    """Drives the player to the victory zone along the cheapest route through the platform graph
+
+    Each frame next_action() returns an AI action name. On a platform it walks to the
+    take-off window of the next jump on the route, then plays that jump's inputs frame
+    by frame. Wherever the player lands it picks up the route from there, so a missed
+    jump never needs a new search.
+    """
+    def __init__(self, player, platforms, level):
+        self.player = player
+        self.level = level
+        self.graph = get_platform_graph(level)
+
+        # Graph node i is the level's platform i (the ground is not a node)
+        self.sprites = [platform for platform in platforms if not isinstance(platform, Ground)]
+
+        # Times each jump (source, target) has missed
+        self.failures = {}
+
+        self.plan()
+        self.reset()
+
+    def reset(self):
+        """Forget the jump in progress (call when the player is moved)"""
+        self.source = None   # Platform the current jump left from
+        self.edge = None     # Jump being played, None while walking
+        self.frame = 0       # Frame of the jump being played
+        self.approach = 0    # Frames spent walking to the current take-off window
+        self.platform = None # Platform the player last stood on
+
+    def edge_cost(self, source, edge):
+        low, high = edge["takeoff"]
+        cost = edge["frames"] + JUMP_COST
+        if high - low + 1 < PLAYER_SPEED:
+            cost += NARROW_COST
+        return cost + FAILURE_COST * self.failures.get((source, edge["target"]), 0)
+
+    def plan(self):
+        """Dijkstra backwards from the goal platforms: cost to the goal and next jump from every platform"""
+        incoming = {}
+        for source, edges in self.graph.edges.items():
+            for edge in edges:
+                incoming.setdefault(edge["target"], []).append((source, edge))
+
+        self.cost = {goal: 0 for goal in self.graph.goal_platforms}
+        self.next_edge = {}
+        frontier = [(0, goal) for goal in sorted(self.graph.goal_platforms)]
+        heapq.heapify(frontier)
+        while frontier:
+            cost, index = heapq.heappop(frontier)
+            if cost > self.cost[index]:
+                continue  # Already reached more cheaply
+            for source, edge in incoming.get(index, ()):
+                total = cost + self.edge_cost(source, edge)
+                if total < self.cost.get(source, float("inf")):
+                    self.cost[source] = total
+                    self.next_edge[source] = edge
+                    heapq.heappush(frontier, (total, source))
+
+    def route_from(self, index):
+        """Platforms on the planned route from a platform to the goal (empty if there is none)"""
+        route = []
+        while index is not None and index in self.cost and index not in route:
+            route.append(index)
+            edge = self.next_edge.get(index)
+            index = edge["target"] if edge else None
+        return route
+
+    def record_failure(self, source, target):
+        """Make a missed jump more expensive and re-plan around it"""
+        key = (source, target)
+        self.failures[key] = self.failures.get(key, 0) + 1
+        game_log.info("planner", f"🗺️ Jump {source} → {target} missed ({self.failures[key]}x) - re-planning")
+        self.plan()
+
+    def on_death(self):
+        """Called when the player dies: the jump being played (if any) missed"""
+        if self.edge is not None:
+            self.record_failure(self.source, self.edge["target"])
+        self.reset()
+
+    def landed_on(self):
+        """Index of the platform the player is standing on or was just bounced off (None if airborne)"""
+        player = self.player
+        if not player.on_ground and player.vel_y >= 0:
+            return None
+        for index, sprite in enumerate(self.sprites):
+            if (sprite.rect.top == player.rect.bottom and sprite.rect.left < player.rect.right and
+                    player.rect.left < sprite.rect.right):
+                if player.on_ground or self.graph.platforms[index]["type"] == "bouncy":
+                    return index
+        return None
+
+    def start_jump(self, source, edge):
+        self.source = source
+        self.edge = edge
+        self.frame = 0
+        self.approach = 0
+
+    def play_jump(self):
+        """Action for the current frame of the jump being played"""
+        edge = self.edge
+        frame = self.frame
+        self.frame += 1
+
+        steering = edge["direction"] != 0 and (edge["release"] is None or frame < edge["release"])
+        bouncy = self.graph.platforms[self.source]["type"] == "bouncy"
+        jumping = (frame == 0 and not bouncy) or frame == edge["double_jump"]
+
+        if jumping:
+            if steering:
+                return "jump_right" if edge["direction"] > 0 else "jump_left"
+            return "jump_only"
+        if steering:
+            return "move_right" if edge["direction"] > 0 else "move_left"
+        return "wait"
+
+    def bounce_edge(self, index):
+        """Cheapest jump off a bouncy platform whose take-off window holds the player right now"""
+        x = self.player.rect.x
+        best = None
+        best_cost = float("inf")
+        for edge in self.graph.neighbours(index):
+            low, high = edge["takeoff"]
+            if low <= x <= high and edge["target"] in self.cost:
+                cost = self.edge_cost(index, edge) + self.cost[edge["target"]]
+                if cost < best_cost:
+                    best, best_cost = edge, cost
+        # Out of every window: steer the planned jump anyway
+        return best or self.next_edge.get(index)
+
+    def walk_to(self, low, high):
+        """Action that brings rect.x into [low, high], letting go early enough to slide to a stop"""
+        x = self.player.rect.x
+        vel_x = self.player.vel_x
+        if x < low:
+            if vel_x > 0 and x + slide_distance(vel_x) >= low:
+                return "wait"
+            return "move_right"
+        if x > high:
+            if vel_x < 0 and x - slide_distance(vel_x) <= high:
+                return "wait"
+            return "move_left"
+        return "wait"
+
+    def next_action(self):
+        """Pick this frame's action (call once per frame, before the player moves)"""
+        landed = self.landed_on()
+
+        # Still in the air: keep playing the jump (or fall without input)
+        if landed is None:
+            return self.play_jump() if self.edge is not None else "wait"
+
+        # Just landed: check the jump went where it should have
+        if self.edge is not None:
+            if landed != self.edge["target"]:
+                self.record_failure(self.source, self.edge["target"])
+            self.edge = None
+        if landed != self.platform:
+            self.platform = landed
+            self.approach = 0
+
+        # Bouncy platforms launch the player on landing, so the jump starts right away
+        if self.graph.platforms[landed]["type"] == "bouncy" and not self.player.on_ground:
+            edge = self.bounce_edge(landed)
+            if edge is None:
+                return "wait"
+            self.start_jump(landed, edge)
+            return self.play_jump()
+
+        # On a goal platform: walk into the victory zone
+        if landed in self.graph.goal_platforms:
+            low, high = self.graph.goal_spans[landed]
+            return self.walk_to(low, high)
+
+        edge = self.next_edge.get(landed)
+        if edge is None:
+            return "jump_right"  # No route from here; the staircase always goes up and right
+
+        low, high = edge["takeoff"]
+        if low <= self.player.rect.x <= high:
+            self.start_jump(landed, edge)
+            return self.play_jump()
+
+        self.approach += 1
+        if self.approach > APPROACH_FRAMES:
+            # Can't line up with this jump: try the next best route
+            self.approach = 0
+            self.record_failure(landed, edge["target"])
+        return self.walk_to(low, high)
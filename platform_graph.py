@@ -0,0 +1,517 @@
+import os
+import sys
+import json
+import time
+import zlib
+import hashlib
+from collections import deque
+import pygame
+import game_log
+from settings import *
+from jump_physics import JumpEnvelope, DEFAULT_MAX_DROP
+from level_generator import SpatialGrid
+from level_format import LEVEL_DIR, load_level, level_from_dict
+
+# Bump when the analysis changes, so cached graphs are rebuilt
+GRAPH_VERSION = 1
+
+# Cached graphs, one file per level fingerprint
+GRAPH_DIR = os.path.join(LEVEL_DIR, "graphs")
+
+MAX_JUMPS = 2  # Player.max_jumps: one jump from the ground plus one in the air
+
+# Input programs tried for each pair of platforms (None = never)
+DOUBLE_JUMP_FRAMES = (None,) + tuple(range(1, 48, 2))  # Airborne frame of the second jump
+RELEASE_FRAMES = (None,) + tuple(range(0, 48, 3))      # Frame the direction is let go
+
+GOOD_WINDOW = PLAYER_SPEED * 3  # Stop searching a pair once a take-off window is this wide
+MAX_SWEEPS = 64                 # Programs stepped per pair before giving up (most pairs need one)
+MAX_FRAMES = 240                # Longest jump stepped
+
+# Horizontal travel is stepped far from 0: Rect rounds half away from zero, so offsets
+# measured there match any position in the world (rounding near 0 would differ)
+BASE = 1 << 20
+
+def step_heights(start_y, take_off_speed, double_jump_frame=None, max_drop=DEFAULT_MAX_DROP):
+    """(dy, vel_y) after each frame of a jump from rect.y = start_y, until max_drop below it
+
+    Heights are stepped from the real start: vel_y picks up float error (-2.5000000000000178)
+    that decides some rounding ties one way or the other depending on the magnitude of y.
+    """
+    rect = pygame.Rect(0, start_y, PLAYER_WIDTH, PLAYER_HEIGHT)
+    vel_y = 0
+    points = []
+    for frame in range(MAX_FRAMES):
+        if frame == 0:
+            vel_y = take_off_speed
+        elif frame == double_jump_frame:
+            vel_y = PLAYER_JUMP_SPEED
+
+        # Same order as Player.update: gravity, clamp, move
+        vel_y += PLAYER_GRAVITY
+        if vel_y > PLAYER_MAX_FALL_SPEED:
+            vel_y = PLAYER_MAX_FALL_SPEED
+        rect.y += vel_y
+        points.append((rect.y - start_y, vel_y))
+        if rect.y - start_y > max_drop:
+            break
+    return points
+
+def step_travel(direction, release_frame=None, frames=MAX_FRAMES):
+    """Horizontal offset after each frame, holding direction until release_frame"""
+    rect = pygame.Rect(BASE, 0, PLAYER_WIDTH, PLAYER_HEIGHT)
+    vel_x = 0
+    points = []
+    for frame in range(frames):
+        steering = release_frame is None or frame < release_frame
+
+        # Player.apply_controls: full speed while held, friction otherwise
+        if steering:
+            vel_x = direction * PLAYER_SPEED
+        else:
+            vel_x *= (1 - FRICTION)
+            if abs(vel_x) < 0.1:
+                vel_x = 0
+        rect.x += vel_x
+        points.append(rect.x - BASE)
+
+        # Player.update applies air friction again when no direction is held
+        if not steering:
+            vel_x *= (1 - FRICTION)
+            if abs(vel_x) < 0.1:
+                vel_x = 0
+    return points
+
+def subtract(intervals, low, high):
+    """Remove [low, high] from a sorted list of disjoint integer intervals"""
+    result = []
+    for start, end in intervals:
+        if end < low or start > high:
+            result.append((start, end))
+            continue
+        if start < low:
+            result.append((start, low - 1))
+        if end > high:
+            result.append((high + 1, end))
+    return result
+
+def intersect(intervals, low, high):
+    """The parts of the intervals inside [low, high]"""
+    return [(max(start, low), min(end, high)) for start, end in intervals if end >= low and start <= high]
+
+class GraphBuilder:
+    """Finds the jumps between a level's platforms by stepping the player's physics
+
+    For every pair within the jump envelope it tries a small family of input
+    programs (double jump frame, release frame, direction) and, for each, sweeps
+    the whole range of take-off positions at once: every frame of the jump rules
+    out the x positions whose rect would hit something, and keeps the ones that
+    land on the target. The collision rules mirror Player.update (horizontal
+    check against the previous height, one-way platforms only catch a falling
+    player in their top 10 pixels, bumping a head counts as a miss).
+    """
+    def __init__(self, level, double_jump=True):
+        self.level = level
+        self.double_jump = double_jump
+        self.platforms = list(level.platforms())
+        self.double_jump_frames = DOUBLE_JUMP_FRAMES if double_jump else (None,)
+
+        self.grid = SpatialGrid()
+        for index, spec in enumerate(self.platforms):
+            self.grid.insert(spec["x"], spec["y"], spec["width"], spec["height"], index)
+
+        self.envelopes = {}
+        self.heights = {}
+        self.travels = {}
+        self.standing = {}
+
+    def take_off_speed(self, spec):
+        """Vertical speed leaving a platform (bouncy ones launch the player by themselves)"""
+        if spec["type"] == "bouncy":
+            return PLAYER_JUMP_SPEED * spec["bounce_strength"]
+        return PLAYER_JUMP_SPEED
+
+    def envelope(self, speed):
+        if speed not in self.envelopes:
+            self.envelopes[speed] = JumpEnvelope(self.double_jump, take_off_speed=speed)
+        return self.envelopes[speed]
+
+    def get_heights(self, start_y, speed, double_jump_frame):
+        key = (start_y, speed, double_jump_frame)
+        if key not in self.heights:
+            self.heights[key] = step_heights(start_y, speed, double_jump_frame)
+        return self.heights[key]
+
+    def get_travel(self, direction, release_frame):
+        key = (direction, release_frame)
+        if key not in self.travels:
+            self.travels[key] = step_travel(direction, release_frame)
+        return self.travels[key]
+
+    def standing_range(self, index):
+        """Player rect.x values that stand on a platform without overlapping anything else"""
+        if index not in self.standing:
+            spec = self.platforms[index]
+            top = spec["y"] - PLAYER_HEIGHT
+            intervals = [(max(0, spec["x"] - PLAYER_WIDTH + 1),
+                          min(self.level.world_width - PLAYER_WIDTH, spec["x"] + spec["width"] - 1))]
+            for other in self.grid.owners(spec["x"] - PLAYER_WIDTH, top, spec["width"] + PLAYER_WIDTH * 2, PLAYER_HEIGHT):
+                if other != index:
+                    blocker = self.platforms[other]
+                    intervals = subtract(intervals, blocker["x"] - PLAYER_WIDTH + 1, blocker["x"] + blocker["width"] - 1)
+            self.standing[index] = [(start, end) for start, end in intervals if start <= end]
+        return self.standing[index]
+
+    def candidates(self, index):
+        """Platforms within the jump envelope of a platform"""
+        source = self.platforms[index]
+        envelope = self.envelope(self.take_off_speed(source))
+        reach = envelope.reach(-envelope.max_drop)
+        top = source["y"] - envelope.max_rise - PLAYER_HEIGHT
+        owners = self.grid.owners(source["x"] - reach - PLAYER_WIDTH, top,
+                                  source["width"] + (reach + PLAYER_WIDTH) * 2,
+                                  envelope.max_rise + envelope.max_drop + PLAYER_HEIGHT)
+        for target in sorted(owners):
+            if target == index:
+                continue
+            other = self.platforms[target]
+            gap = max(other["x"] - (source["x"] + source["width"]), source["x"] - (other["x"] + other["width"]), 0)
+            # A little slack: the envelope is only used to skip hopeless pairs
+            if gap <= envelope.reach(source["y"] - other["y"] - 2) + PLAYER_SPEED:
+                yield target
+
+    def find_edge(self, index, target):
+        """The input program with the widest take-off window from one platform to another"""
+        source = self.platforms[index]
+        goal = self.platforms[target]
+        stand = self.standing_range(index)
+        if not stand:
+            return None
+
+        speed = self.take_off_speed(source)
+        start_y = source["y"] - PLAYER_HEIGHT
+        goal_left, goal_right = goal["x"], goal["x"] + goal["width"]
+        goal_top, goal_bottom = goal["y"], goal["y"] + goal["height"]
+        one_way = goal["type"] == "oneway"
+
+        # Everything the player can touch on the way: between the two platforms, up to the apex
+        rise = self.envelope(speed).max_rise
+        left = min(source["x"], goal_left) - PLAYER_WIDTH - PLAYER_SPEED
+        right = max(source["x"] + source["width"], goal_right) + PLAYER_WIDTH + PLAYER_SPEED
+        top = min(source["y"], goal_top) - rise - PLAYER_HEIGHT - PLAYER_MAX_FALL_SPEED
+        bottom = max(source["y"], goal_bottom) + PLAYER_MAX_FALL_SPEED
+        obstacles = [(self.platforms[other], other == target)
+                     for other in sorted(self.grid.owners(left, top, right - left, bottom - top))]
+
+        if goal_left >= source["x"] + source["width"]:
+            directions = (1,)
+        elif goal_right <= source["x"]:
+            directions = (-1,)
+        else:
+            directions = (1, -1)
+
+        # The most any program could get: the whole stand, or every x that overlaps the target
+        best_possible = min(sum(end - start + 1 for start, end in stand), goal["width"] + PLAYER_WIDTH - 1)
+        enough = min(GOOD_WINDOW, best_possible)
+
+        # A single jump is tried first; double jumps only when it leaves a narrow window
+        tiers = (range(1), range(1, len(self.double_jump_frames)))
+        landing = {}
+        events = {}
+        best = None
+        best_width = 0
+        budget = MAX_SWEEPS
+        for tier in tiers:
+            if best_width >= enough or budget <= 0:
+                break
+            # Collect the programs that can put the player over the target from this platform, with
+            # an upper bound on their window (positions over the target on a frame it could catch them)
+            programs = []
+            for order in tier:
+                double_jump_frame = self.double_jump_frames[order]
+                heights = self.get_heights(start_y, speed, double_jump_frame)
+
+                # Frames on which the target could catch the player (height alone decides)
+                landing_frames = []
+                for frame, (dy, vel_y) in enumerate(heights):
+                    y = start_y + dy
+                    if vel_y > 0 and y + PLAYER_HEIGHT > goal_top and y < goal_bottom:
+                        if one_way:
+                            if y + PLAYER_HEIGHT <= goal_top + 10:
+                                landing_frames.append(frame)
+                        else:
+                            landing_frames.append(frame)
+                            break  # Lower down it would hit the target's side
+                if not landing_frames:
+                    continue
+                landing[double_jump_frame] = (heights, landing_frames)
+
+                for direction in directions:
+                    for release_order, release_frame in enumerate(RELEASE_FRAMES):
+                        if release_frame == 0 and direction < 0:
+                            continue  # Never steering is the same either way
+                        travel = self.get_travel(direction, release_frame)
+                        bound = 0
+                        for frame in landing_frames:
+                            for start, end in intersect(stand, goal_left - PLAYER_WIDTH + 1 - travel[frame], goal_right - 1 - travel[frame]):
+                                bound += end - start + 1
+                        if bound:
+                            # Programs that might be good enough come first, simplest first
+                            programs.append((-min(bound, enough), order, release_order, direction, double_jump_frame, release_frame))
+
+            for key, _, _, direction, double_jump_frame, release_frame in sorted(programs)[:budget]:
+                if best_width >= -key:
+                    break  # Nothing left can do better
+                heights, landing_frames = landing[double_jump_frame]
+                if double_jump_frame not in events:
+                    events[double_jump_frame] = self.frame_events(heights, start_y, obstacles, landing_frames[-1])
+                window = self.sweep(stand, events[double_jump_frame], self.get_travel(direction, release_frame))
+                if window is not None and window[1] - window[0] + 1 > best_width:
+                    low, high, frame = window
+                    best_width = high - low + 1
+                    best = {
+                        "target": target,
+                        "direction": direction if release_frame != 0 else 0,
+                        "takeoff": [low, high],
+                        "double_jump": double_jump_frame,
+                        "release": release_frame,
+                        "frames": frame + 1
+                    }
+            budget -= min(len(programs), budget)
+        return best
+
+    def frame_events(self, heights, start_y, obstacles, last_frame):
+        """What each frame of a jump can touch, as spans of player rect.x before travel
+
+        Returns one (blocked, vertical, fatal) per frame: spans the horizontal check
+        hits, (span, lands) pairs for the vertical check in group order, and whether
+        the player reaches the deadly ground. Only heights matter here, so the
+        result is shared by every direction and release frame.
+        """
+        solids = [(spec["y"] - PLAYER_HEIGHT, spec["y"] + spec["height"],
+                   (spec["x"] - PLAYER_WIDTH + 1, spec["x"] + spec["width"] - 1),
+                   spec["type"] == "oneway", is_target)
+                  for spec, is_target in obstacles]
+        ground = self.level.ground_y - PLAYER_HEIGHT
+        events = []
+        previous_y = start_y
+        for frame in range(last_frame + 1):
+            dy, vel_y = heights[frame]
+            y = start_y + dy
+            blocked = []
+            vertical = []
+            # (rect.y ranges: above - PLAYER_HEIGHT < y < bottom overlaps the platform)
+            for above, bottom, span, one_way, is_target in solids:
+                if above < previous_y < bottom:
+                    blocked.append(span)
+                if above < y < bottom:
+                    if one_way and not (vel_y > 0 and y <= above + 10):
+                        continue
+                    vertical.append((span, is_target and vel_y > 0))
+            events.append((blocked, vertical, y >= ground))
+            previous_y = y
+        return events
+
+    def sweep(self, stand, events, travel):
+        """Step one program for every take-off x at once; the widest landing run as (low, high, frame)"""
+        # The world edge clamps the player, which throws the jump off (travel only grows one way)
+        last = len(events) - 1
+        alive = intersect(stand, -min(travel[0], travel[last]),
+                          self.level.world_width - PLAYER_WIDTH - max(travel[0], travel[last]))
+        landed = []
+        for frame, (blocked, vertical, fatal) in enumerate(events):
+            dx = travel[frame]
+
+            # Horizontal check (at the previous height): any overlap snaps the player aside
+            for low, high in blocked:
+                alive = subtract(alive, low - dx, high - dx)
+
+            # Vertical check: landing on the target succeeds, touching anything else fails
+            for (low, high), lands in vertical:
+                if lands:
+                    landed.extend((start, end, frame) for start, end in intersect(alive, low - dx, high - dx))
+                alive = subtract(alive, low - dx, high - dx)
+
+            if not alive or fatal:
+                break
+
+        if not landed:
+            return None
+        return max(landed, key=lambda run: run[1] - run[0])
+
+    def build(self):
+        """Find every edge: {source index: [edge, ...]}"""
+        edges = {}
+        for index in range(len(self.platforms)):
+            self.heights.clear()  # Heights depend on the source's y, so only keep them per source
+            found = []
+            for target in self.candidates(index):
+                edge = self.find_edge(index, target)
+                if edge is not None:
+                    found.append(edge)
+            if found:
+                edges[index] = found
+        return edges
+
+class PlatformGraph:
+    """Directed graph of the jumps between a level's platforms, with the inputs for each
+
+    Node i is platform i of the level. An edge from i says: stand on platform i
+    with the player's rect.x anywhere in `takeoff`, press jump while holding
+    `direction` (0: none), press jump again on airborne frame `double_jump` (if
+    set), let go of the direction from frame `release` on (if set), and after
+    `frames` frames the player lands on `target`. Moving platforms are taken at
+    their resting positions, so edges touching them are approximate.
+    """
+    def __init__(self, level, fingerprint, edges):
+        self.level = level
+        self.fingerprint = fingerprint
+        self.edges = edges
+        self.platforms = list(level.platforms())
+        self.edge_count = sum(len(found) for found in edges.values())
+        self.spawn_platform = self.platform_below(*level.spawn)
+
+        # Platforms the player can stand on inside the victory zone, with the rect.x values that do
+        zone = pygame.Rect(level.victory_zone)
+        builder = GraphBuilder(level)  # Only its standing ranges are used
+        self.goal_spans = {}
+        for index, spec in enumerate(self.platforms):
+            top = spec["y"] - PLAYER_HEIGHT
+            if top >= zone.bottom or spec["y"] <= zone.top:
+                continue
+            for start, end in builder.standing_range(index):
+                low, high = max(start, zone.left - PLAYER_WIDTH + 1), min(end, zone.right - 1)
+                if low <= high:
+                    self.goal_spans[index] = (low, high)
+                    break
+        self.goal_platforms = set(self.goal_spans)
+
+    def platform_below(self, x, y):
+        """Index of the platform a player at (x, y) lands on by falling straight down (None if none)"""
+        best = None
+        for index, spec in enumerate(self.platforms):
+            if spec["x"] < x + PLAYER_WIDTH and x < spec["x"] + spec["width"] and spec["y"] >= y + PLAYER_HEIGHT - 1:
+                if best is None or spec["y"] < self.platforms[best]["y"]:
+                    best = index
+        return best
+
+    def neighbours(self, index):
+        return self.edges.get(index, [])
+
+    def reachable(self, start=None):
+        """Set of platforms reachable from start (the spawn platform by default)"""
+        if start is None:
+            start = self.spawn_platform
+        if start is None:
+            return set()
+        reached = {start}
+        frontier = deque([start])
+        while frontier:
+            for edge in self.neighbours(frontier.popleft()):
+                if edge["target"] not in reached:
+                    reached.add(edge["target"])
+                    frontier.append(edge["target"])
+        return reached
+
+    def is_solvable(self):
+        """Check the victory zone can be reached from the spawn"""
+        return bool(self.reachable() & self.goal_platforms)
+
+def level_fingerprint(level, double_jump=True):
+    """Hash of everything the graph depends on: the level geometry and the physics constants"""
+    physics = [PLAYER_SPEED, PLAYER_JUMP_SPEED, PLAYER_GRAVITY, PLAYER_MAX_FALL_SPEED, FRICTION,
+               PLAYER_WIDTH, PLAYER_HEIGHT, MAX_JUMPS, double_jump, GRAPH_VERSION]
+    world = [level.world_width, level.world_height, level.ground_y]
+    digest = hashlib.sha1(json.dumps([physics, world], separators=(",", ":")).encode("utf-8"))
+    for spec in level.platforms():
+        digest.update(json.dumps(spec, sort_keys=True, separators=(",", ":")).encode("utf-8"))
+    return digest.hexdigest()
+
+def save_graph(path, graph):
+    """Write a graph as compressed JSON (edges packed into lists)"""
+    rows = [[source, edge["target"], edge["direction"], edge["takeoff"][0], edge["takeoff"][1],
+             edge["double_jump"], edge["release"], edge["frames"]]
+            for source, found in graph.edges.items() for edge in found]
+    data = json.dumps({"fingerprint": graph.fingerprint, "edges": rows}, separators=(",", ":"))
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as f:
+        f.write(zlib.compress(data.encode("utf-8"), 9))
+
+def load_graph(path, level, fingerprint):
+    """Read a graph written by save_graph (None if it belongs to another level)"""
+    with open(path, "rb") as f:
+        data = json.loads(zlib.decompress(f.read()).decode("utf-8"))
+    if data["fingerprint"] != fingerprint:
+        return None
+    edges = {}
+    for source, target, direction, low, high, double_jump, release, frames in data["edges"]:
+        edges.setdefault(source, []).append({
+            "target": target,
+            "direction": direction,
+            "takeoff": [low, high],
+            "double_jump": double_jump,
+            "release": release,
+            "frames": frames
+        })
+    return PlatformGraph(level, fingerprint, edges)
+
+_graphs = {}
+
+def get_platform_graph(level, double_jump=True):
+    """Graph for a level: from memory, the GRAPH_DIR cache, or built (and cached) now"""
+    fingerprint = level_fingerprint(level, double_jump)
+    if fingerprint in _graphs:
+        return _graphs[fingerprint]
+
+    path = os.path.join(GRAPH_DIR, fingerprint + ".graph")
+    graph = None
+    if os.path.exists(path):
+        try:
+            graph = load_graph(path, level, fingerprint)
+        except (OSError, ValueError, zlib.error) as e:
+            game_log.warning("level", f"Warning: Ignoring cached platform graph {path}: {e}")
+    if graph is None:
+        graph = PlatformGraph(level, fingerprint, GraphBuilder(level, double_jump).build())
+        try:
+            save_graph(path, graph)
+        except OSError as e:
+            game_log.warning("level", f"Warning: Could not cache platform graph {path}: {e}")
+
+    _graphs[fingerprint] = graph
+    return graph
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Build a level's platform reachability graph")
+    parser.add_argument("level", nargs="?", default="staircase", help="level name or file (default staircase)")
+    parser.add_argument("--generate", type=int, metavar="SEED", help="analyze a generated level instead")
+    parser.add_argument("--platforms", type=int, default=500, help="platform count for --generate")
+    parser.add_argument("--no-double-jump", action="store_true", help="only use single jumps")
+    parser.add_argument("--rebuild", action="store_true", help="ignore the cached graph")
+    args = parser.parse_args()
+
+    if args.generate is not None:
+        from level_generator import generate_level
+        level = level_from_dict(generate_level(args.generate, args.platforms))
+    else:
+        level = load_level(args.level)
+
+    start = time.perf_counter()
+    if args.rebuild:
+        graph = PlatformGraph(level, level_fingerprint(level, not args.no_double_jump),
+                              GraphBuilder(level, not args.no_double_jump).build())
+        save_graph(os.path.join(GRAPH_DIR, graph.fingerprint + ".graph"), graph)
+    else:
+        graph = get_platform_graph(level, not args.no_double_jump)
+    elapsed = time.perf_counter() - start
+
+    reached = graph.reachable()
+    print(f"🕸️ '{level.name}': {len(graph.platforms)} platforms, {graph.edge_count} jumps "
+          f"({elapsed * 1000:.0f}ms, fingerprint {graph.fingerprint[:12]})")
+    print(f"   {len(reached)} platforms reachable from the spawn platform {graph.spawn_platform}")
+    if graph.is_solvable():
+        print("✅ The victory zone can be reached")
+    else:
+        print("❌ The victory zone can't be reached from the spawn")
+    sys.exit(0 if graph.is_solvable() else 1)
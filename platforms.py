@@ -1,18 +1,46 @@
 import pygame
 import math
+import game_log
 from settings import *
+from timers import Scheduler
+from simulation import (PlatformBody, MovingPlatformBody, DisappearingPlatformBody, VerticalMovingPlatformBody,
+                        RotatingPlatformBody, OneWayPlatformBody, BouncyPlatformBody, IcePlatformBody,
+                        TeleporterElevatorBody, AwakePlatforms)
 
-class Platform(pygame.sprite.Sprite):
+# The full-size platform image is only ever scaled from, so every platform shares one copy
+_platform_image_cache = {}
+
+# Color of the clear corners around a rotating platform (not one of its own colors)
+ROTATING_PLATFORM_KEY = (255, 0, 255)
+
+# How long a bouncy platform bobs after being bounced on: half a sine wave at 8 radians per second
+BOUNCE_TIME = math.pi / 8
+
+def load_platform_image():
+    """Load the platform image once per process (None if it can't be loaded)"""
+    if "platform" not in _platform_image_cache:
+        try:
+            _platform_image_cache["platform"] = pygame.image.load("Assets/All porpuse platform.png").convert_alpha()
+        except Exception as e:
+            # Fallback to colored rectangles if image fails
+            _platform_image_cache["platform"] = None
+            game_log.warning("assets", f"Warning: Could not load platform image: {e}")
+    return _platform_image_cache["platform"]
+
+class Platform(PlatformBody, pygame.sprite.Sprite):
+    """A PlatformBody with its image (see simulation.py); each type below is its body plus this"""
+    
     def __init__(self, x, y, width, height, theme=None):
-        super().__init__()
+        PlatformBody.__init__(self, x, y, width, height)
+        self.init_view(theme)
+    
+    def init_view(self, theme):
+        """Make it a sprite, with an image the size of its rect"""
+        pygame.sprite.Sprite.__init__(self)
+        width, height = self.rect.size
         
         # Load platform image - RESTORED FOR RAINBOW EFFECT
-        try:
-            self.base_platform_image = pygame.image.load("Assets/All porpuse platform.png").convert_alpha()
-        except Exception as e:
-            # Fallback to colored rectangle if image fails
-            self.base_platform_image = None
-            print(f"Warning: Could not load platform image: {e}")
+        self.base_platform_image = load_platform_image()
         
         # Use theme colors if provided, otherwise use fallback
         if theme:
@@ -35,10 +63,6 @@ class Platform(pygame.sprite.Sprite):
             # Add a simple border for visual appeal
             border_color = (max(0, color[0]-30), max(0, color[1]-30), max(0, color[2]-30))
             pygame.draw.rect(self.image, border_color, (0, 0, width, height), 2)
-        
-        self.rect = self.image.get_rect()
-        self.rect.x = x
-        self.rect.y = y
     
     def apply_theme_coloring(self, theme_color):
         """Apply theme-based coloring to the platform image"""
@@ -67,25 +91,23 @@ class Platform(pygame.sprite.Sprite):
                        max(0, theme_color[2] - 30))
         pygame.draw.line(self.image, shadow_color, (0, height-1), (width, height-1), 1)
     
-    def update(self, dt=0):
-        """Update platform (override in subclasses for dynamic behavior)"""
-        pass
+    def snapshot(self):
+        """Its body's state and its image, for restore()"""
+        return (PlatformBody.snapshot(self), self.image)
+    
+    def restore(self, state):
+        body, self.image = state
+        PlatformBody.restore(self, body)
     
     def draw(self, screen):
         """Draw the platform on the screen"""
         screen.blit(self.image, self.rect)
 
-class MovingPlatform(Platform):
+class MovingPlatform(MovingPlatformBody, Platform):
     """Horizontal moving platform that carries the player"""
     def __init__(self, start_x, y, width, height, end_x, speed=30, theme=None):
-        super().__init__(start_x, y, width, height, theme)
-        
-        # Movement properties
-        self.start_x = start_x
-        self.end_x = end_x
-        self.speed = speed  # pixels per second
-        self.direction = 1  # 1 for right, -1 for left
-        self.last_x = self.rect.x  # For calculating player movement
+        MovingPlatformBody.__init__(self, start_x, y, width, height, end_x, speed)
+        self.init_view(theme)
         
         # Add visual indicator (simple blue border)
         self.add_movement_indicator()
@@ -102,52 +124,25 @@ class MovingPlatform(Platform):
         pygame.draw.circle(self.image, border_color, (self.rect.width - corner_size, corner_size), corner_size)
         pygame.draw.circle(self.image, border_color, (corner_size, self.rect.height - corner_size), corner_size)
         pygame.draw.circle(self.image, border_color, (self.rect.width - corner_size, self.rect.height - corner_size), corner_size)
-    
-    def update(self, dt):
-        """Update platform movement"""
-        self.last_x = self.rect.x
-        
-        # Move platform
-        self.rect.x += self.direction * self.speed * dt
-        
-        # Check bounds and reverse direction
-        if self.direction > 0 and self.rect.x >= self.end_x:
-            self.rect.x = self.end_x
-            self.direction = -1
-        elif self.direction < 0 and self.rect.x <= self.start_x:
-            self.rect.x = self.start_x
-            self.direction = 1
-    
-    def get_movement_delta(self):
-        """Get how much the platform moved this frame"""
-        return self.rect.x - self.last_x
 
-class DisappearingPlatform(Platform):
+class DisappearingPlatform(DisappearingPlatformBody, Platform):
     """Platform that disappears after being stepped on"""
     def __init__(self, x, y, width, height, theme=None, disappear_time=3.0):
-        super().__init__(x, y, width, height, theme)
-        
-        # Disappearing properties
-        self.disappear_time = disappear_time  # Time before disappearing
-        self.fade_time = 1.0  # Time to fade out
-        self.activated = False
-        self.timer = 0.0
+        DisappearingPlatformBody.__init__(self, x, y, width, height, disappear_time)
+        self.init_view(theme)
         self.original_image = self.image.copy()
-        self.is_solid = True  # Whether player can land on it
     
-    def activate(self):
-        """Start the disappearing countdown"""
-        if not self.activated:
-            self.activated = True
-            self.timer = 0.0
+    def disappear(self):
+        """Platform is now invisible and non-solid, and never needs updating again"""
+        DisappearingPlatformBody.disappear(self)
+        self.image = pygame.Surface((self.rect.width, self.rect.height), pygame.SRCALPHA)
     
     def update(self, dt):
-        """Update disappearing behavior"""
-        if self.activated:
-            self.timer += dt
-            
+        """Update the flashing and fading (only while the countdown runs)"""
+        DisappearingPlatformBody.update(self, dt)
+        if self.activated and self.is_solid:
             # Warning phase (flash)
-            if self.timer < self.disappear_time - self.fade_time:
+            if not self.fading:
                 # Flash faster as time runs out
                 flash_speed = 3 + (self.timer / (self.disappear_time - self.fade_time)) * 5
                 if int(self.timer * flash_speed) % 2:
@@ -161,8 +156,8 @@ class DisappearingPlatform(Platform):
                     self.image = self.original_image.copy()
             
             # Fading phase
-            elif self.timer < self.disappear_time:
-                fade_progress = (self.timer - (self.disappear_time - self.fade_time)) / self.fade_time
+            else:
+                fade_progress = max(0, min(1, (self.timer - (self.disappear_time - self.fade_time)) / self.fade_time))
                 alpha = int(255 * (1 - fade_progress))
                 
                 # Create fading image
@@ -171,15 +166,12 @@ class DisappearingPlatform(Platform):
                 fade_surface.fill((255, 255, 255, alpha))
                 fading_image.blit(fade_surface, (0, 0), special_flags=pygame.BLEND_ALPHA_SDL2)
                 self.image = fading_image
-            
-            # Disappeared phase
-            else:
-                self.is_solid = False
-                self.image = pygame.Surface((self.rect.width, self.rect.height), pygame.SRCALPHA)
-                # Platform is now invisible and non-solid
 
 class Ground(Platform):
     """Special platform class for themed animated death zones"""
+    animated = True
+    state_fields = ("animation_timer",)
+    
     def __init__(self, x, y, width, theme=None):
         # Identify theme and set up animation properties
         if theme:
@@ -211,8 +203,11 @@ class Ground(Platform):
         width = self.rect.width
         height = self.rect.height
         
-        # Create base surface
-        self.image = pygame.Surface((width, height), pygame.SRCALPHA)
+        # Create base surface (opaque, except the cyber grid which lets the background show through)
+        if self.theme_name == "cyber":
+            self.image = pygame.Surface((width, height), pygame.SRCALPHA)
+        else:
+            self.image = pygame.Surface((width, height))
         
         if self.theme_name == "ancient":
             self.create_lava_ground(width, height)
@@ -362,20 +357,11 @@ class Ground(Platform):
         # Recreate the animated ground
         self.create_themed_ground()
 
-class VerticalMovingPlatform(Platform):
+class VerticalMovingPlatform(VerticalMovingPlatformBody, Platform):
     """Vertical moving platform (elevator-style)"""
     def __init__(self, x, start_y, width, height, end_y, speed=40, wait_time=2.0, theme=None):
-        super().__init__(x, start_y, width, height, theme)
-        
-        # Movement properties
-        self.start_y = start_y
-        self.end_y = end_y
-        self.speed = speed  # pixels per second
-        self.direction = 1 if end_y > start_y else -1  # 1 for down, -1 for up
-        self.wait_time = wait_time  # Time to wait at each end
-        self.current_wait = 0.0
-        self.is_waiting = False
-        self.last_y = self.rect.y
+        VerticalMovingPlatformBody.__init__(self, x, start_y, width, height, end_y, speed, wait_time)
+        self.init_view(theme)
         
         # Add visual indicator (green border for vertical)
         self.add_movement_indicator()
@@ -395,54 +381,22 @@ class VerticalMovingPlatform(Platform):
         pygame.draw.polygon(self.image, border_color, [
             (center_x, self.rect.height - 2), (center_x - 4, self.rect.height - 8), (center_x + 4, self.rect.height - 8)
         ])
-    
-    def update(self, dt):
-        """Update vertical platform movement"""
-        self.last_y = self.rect.y
-        
-        if self.is_waiting:
-            self.current_wait += dt
-            if self.current_wait >= self.wait_time:
-                self.is_waiting = False
-                self.current_wait = 0.0
-                self.direction *= -1  # Reverse direction
-        else:
-            # Move platform
-            self.rect.y += self.direction * self.speed * dt
-            
-            # Check bounds and start waiting
-            if self.direction > 0 and self.rect.y >= self.end_y:  # Moving down, hit bottom
-                self.rect.y = self.end_y
-                self.is_waiting = True
-            elif self.direction < 0 and self.rect.y <= self.start_y:  # Moving up, hit top
-                self.rect.y = self.start_y
-                self.is_waiting = True
-    
-    def get_movement_delta_y(self):
-        """Get how much the platform moved vertically this frame"""
-        return self.rect.y - self.last_y
 
-class RotatingPlatform(Platform):
+class RotatingPlatform(RotatingPlatformBody, Platform):
     """Small circular platform that rotates slowly"""
     def __init__(self, x, y, radius=30, rotation_speed=45, theme=None):
-        # Create a square surface to contain the circle
-        size = radius * 2 + 10
-        super().__init__(x - size//2, y - size//2, size, size, theme)
-        
-        self.radius = radius
-        self.rotation_speed = rotation_speed  # degrees per second
-        self.angle = 0.0
-        self.center_x = x
-        self.center_y = y
+        RotatingPlatformBody.__init__(self, x, y, radius, rotation_speed)
+        self.init_view(theme)
         
         # Create the rotating platform visual
         self.create_rotating_visual()
     
     def create_rotating_visual(self):
         """Create the circular rotating platform"""
-        # Create a fresh transparent surface every time
-        self.image = pygame.Surface((self.rect.width, self.rect.height), pygame.SRCALPHA)
-        self.image.fill((0, 0, 0, 0))  # Transparent
+        # Create a fresh transparent surface every time (the circle is solid, so a colorkey will do)
+        self.image = pygame.Surface((self.rect.width, self.rect.height))
+        self.image.fill(ROTATING_PLATFORM_KEY)
+        self.image.set_colorkey(ROTATING_PLATFORM_KEY)
         
         # Draw the circular platform
         center = (self.rect.width // 2, self.rect.height // 2)
@@ -463,18 +417,16 @@ class RotatingPlatform(Platform):
     
     def update(self, dt):
         """Update rotation"""
-        self.angle += self.rotation_speed * dt
-        if self.angle >= 360:
-            self.angle -= 360
+        RotatingPlatformBody.update(self, dt)
         
         # Recreate the visual with new rotation
         self.create_rotating_visual()
 
-class OneWayPlatform(Platform):
+class OneWayPlatform(OneWayPlatformBody, Platform):
     """Platform you can jump through from below but land on from above"""
     def __init__(self, x, y, width, height, theme=None):
-        super().__init__(x, y, width, height, theme)
-        self.one_way = True  # Flag for special collision handling
+        OneWayPlatformBody.__init__(self, x, y, width, height)
+        self.init_view(theme)
         
         # Add visual indicator (yellow border with up arrows)
         self.add_movement_indicator()
@@ -491,12 +443,17 @@ class OneWayPlatform(Platform):
                 (x, 2), (x - 3, 8), (x + 3, 8)
             ])
 
-class BouncyPlatform(Platform):
+class BouncyPlatform(BouncyPlatformBody, Platform):
     """Platform that gives extra jump height when landed on"""
+    state_fields = ("bounce_animation_timer", "resting_image", "settle_event")
+    
     def __init__(self, x, y, width, height, bounce_strength=1.5, theme=None):
-        super().__init__(x, y, width, height, theme)
-        self.bounce_strength = bounce_strength  # Multiplier for jump height
+        BouncyPlatformBody.__init__(self, x, y, width, height, bounce_strength)
+        self.init_view(theme)
         self.bounce_animation_timer = 0.0
+        self.resting_image = None  # Its image while it bobs (None when still)
+        self.bounce_frames = {}    # bob offset -> the image shifted down by it
+        self.settle_event = None
         
         # Add visual indicator (orange with bounce effect)
         self.add_movement_indicator()
@@ -522,30 +479,42 @@ class BouncyPlatform(Platform):
             pygame.draw.circle(self.image, border_color, (i + 6, self.rect.height - 3), 3)
     
     def update(self, dt):
-        """Update bounce animation"""
+        """Update bounce animation (only while it bobs)"""
         self.bounce_animation_timer += dt * 8
         
         # Create a subtle bouncing visual effect
-        if self.bounce_animation_timer < 3.14:  # One bounce cycle
-            bounce_offset = int(math.sin(self.bounce_animation_timer) * 2)
-            if bounce_offset != 0:
-                # Recreate image with bounce offset
-                original_image = super().image if hasattr(super(), 'image') else self.image
-                self.image = pygame.Surface((self.rect.width, self.rect.height), pygame.SRCALPHA)
-                self.image.blit(original_image, (0, bounce_offset))
-        
-        if self.bounce_animation_timer > 6.28:  # Reset after full cycle
-            self.bounce_animation_timer = 0.0
+        bounce_offset = max(0, int(math.sin(self.bounce_animation_timer) * 2))
+        if bounce_offset == 0:
+            self.image = self.resting_image
+            return
+        # The shifted images are made once and reused for every bounce
+        frame = self.bounce_frames.get(bounce_offset)
+        if frame is None:
+            frame = self.bounce_frames[bounce_offset] = pygame.Surface((self.rect.width, self.rect.height), pygame.SRCALPHA)
+            frame.blit(self.resting_image, (0, bounce_offset))
+        self.image = frame
     
     def trigger_bounce(self):
-        """Trigger the bounce animation"""
+        """Trigger the bounce animation: it bobs once, then settles until bounced on again"""
         self.bounce_animation_timer = 0.0
+        if self.resting_image is None:
+            self.resting_image = self.image
+            self.wake()
+        if self.platform_group is not None:
+            self.platform_group.timers.cancel(self.settle_event)
+        self.settle_event = self.after(BOUNCE_TIME, self.settle)
+    
+    def settle(self):
+        self.image = self.resting_image
+        self.resting_image = None
+        self.settle_event = None
+        self.sleep()
 
-class IcePlatform(Platform):
+class IcePlatform(IcePlatformBody, Platform):
     """Slippery platform with reduced friction"""
     def __init__(self, x, y, width, height, theme=None):
-        super().__init__(x, y, width, height, theme)
-        self.ice_friction = 0.02  # Much lower friction than normal
+        IcePlatformBody.__init__(self, x, y, width, height)
+        self.init_view(theme)
         
         # Add visual indicator (light blue with ice crystals)
         self.add_movement_indicator()
@@ -570,23 +539,11 @@ class IcePlatform(Platform):
         ice_overlay.fill((*ice_color, 30))  # Semi-transparent ice
         self.image.blit(ice_overlay, (0, 0))
 
-class TeleporterElevator(Platform):
+class TeleporterElevator(TeleporterElevatorBody, Platform):
     """Tutorial-friendly elevator that teleports player along with platform"""
     def __init__(self, x, start_y, width, height, end_y, speed=40, wait_time=2.0, theme=None):
-        super().__init__(x, start_y, width, height, theme)
-        
-        # Movement properties
-        self.start_y = start_y
-        self.end_y = end_y
-        self.speed = speed  # pixels per second
-        self.direction = 1 if end_y > start_y else -1  # 1 for down, -1 for up
-        self.wait_time = wait_time  # Time to wait at each end
-        self.current_wait = 0.0
-        self.is_waiting = False
-        self.last_y = self.rect.y
-        
-        # Player riding system
-        self.rider = None  # Will store reference to player on platform
+        TeleporterElevatorBody.__init__(self, x, start_y, width, height, end_y, speed, wait_time)
+        self.init_view(theme)
         
         # Add visual indicator (bright green border for teleporter)
         self.add_movement_indicator()
@@ -613,47 +570,20 @@ class TeleporterElevator(Platform):
         # More teleporter dots
         for i in range(3):
             pygame.draw.circle(self.image, border_color, (center_x - 6 + i * 6, self.rect.height - 18), 2)
+
+class PlatformGroup(AwakePlatforms, pygame.sprite.Group):
+    """Sprite group of platforms that only updates the ones that change (see AwakePlatforms)"""
+    def __init__(self, *sprites):
+        self.timers = Scheduler()  # Replaced by the world's own
+        self.awake = {}  # Platforms to update every frame (a dict used as an ordered set)
+        super().__init__(*sprites)
     
-    def update(self, dt):
-        """Update teleporter elevator movement"""
-        self.last_y = self.rect.y
-        
-        if self.is_waiting:
-            self.current_wait += dt
-            if self.current_wait >= self.wait_time:
-                self.is_waiting = False
-                self.current_wait = 0.0
-                self.direction *= -1  # Reverse direction
-        else:
-            # Move platform
-            old_y = self.rect.y
-            self.rect.y += self.direction * self.speed * dt
-            movement_delta = self.rect.y - old_y
-            
-            # Move any rider along with the platform (TELEPORTER STYLE!)
-            if self.rider:
-                self.rider.rect.y += movement_delta
-            
-            # Check bounds and start waiting
-            if self.direction > 0 and self.rect.y >= self.end_y:  # Moving down, hit bottom
-                self.rect.y = self.end_y
-                if self.rider:
-                    self.rider.rect.y += (self.end_y - old_y - movement_delta)  # Adjust rider position
-                self.is_waiting = True
-            elif self.direction < 0 and self.rect.y <= self.start_y:  # Moving up, hit top
-                self.rect.y = self.start_y
-                if self.rider:
-                    self.rider.rect.y += (self.start_y - old_y - movement_delta)  # Adjust rider position
-                self.is_waiting = True
-    
-    def set_rider(self, player):
-        """Set the player as riding this elevator"""
-        self.rider = player
-    
-    def remove_rider(self):
-        """Remove the player from riding this elevator"""
-        self.rider = None
+    def add_internal(self, sprite, layer=None):
+        super().add_internal(sprite, layer)
+        if isinstance(sprite, PlatformBody):
+            self.track(sprite)
     
-    def get_movement_delta_y(self):
-        """Get how much the platform moved vertically this frame"""
-        return self.rect.y - self.last_y
\ No newline at end of file
+    def remove_internal(self, sprite):
+        super().remove_internal(sprite)
+        if isinstance(sprite, PlatformBody):
+            self.untrack(sprite)
@@ -1,35 +1,37 @@
 import pygame
 import math
+import game_log
 from settings import *
+from surfaces import normalize
+from simulation import PlayerBody
 
-class Player(pygame.sprite.Sprite):
-    def __init__(self, x, y, character_config):
-        super().__init__()
+# Finished character sprites by look (theme, pattern, accessory), shared by every Player that wears it
+_character_sprites = {}
+
+def character_look(character_config):
+    return (character_config['theme'], character_config['pattern'], character_config['accessory'])
+
+class Player(PlayerBody, pygame.sprite.Sprite):
+    """A PlayerBody with its character sprite, particles and walking animation (see simulation.py)"""
+    _layer = 3  # Drawn on top of everything in the level (see render_queue.py)
+    
+    def __init__(self, x, y, character_config, timers=None):
+        PlayerBody.__init__(self, x, y, timers)
+        pygame.sprite.Sprite.__init__(self)
         
         # Store character configuration
         self.character_config = character_config
         self.theme = THEMES[character_config['theme']]
         
-        # Load base humanoid sprite
-        self.base_humanoid_image = self.load_base_sprite()
+        # Create the character sprite once per look (recoloring it touches every pixel)
+        self.base_humanoid_image = None  # Base sprite, loaded only if this look has to be built
+        look = character_look(character_config)
+        if look not in _character_sprites:
+            _character_sprites[look], _ = normalize(self.create_character_sprite())
         
-        # Create player surface and rect
-        self.base_image = self.create_character_sprite()
+        # Create player surface
+        self.base_image = _character_sprites[look]
         self.image = self.base_image.copy()
-        self.rect = self.image.get_rect()
-        self.rect.x = x
-        self.rect.y = y
-        
-        # Physics variables
-        self.vel_x = 0
-        self.vel_y = 0
-        self.on_ground = False
-        self.jump_count = 0
-        self.max_jumps = 2  # Allow double jump
-        
-        # Input state
-        self.moving_left = False
-        self.moving_right = False
         
         # Visual effects
         self.particle_timer = 0
@@ -38,15 +40,6 @@ class Player(pygame.sprite.Sprite):
         
         # Animation state
         self.animation_timer = 0
-        self.is_moving = False
-        self.facing_right = True
-        
-        # Power-up system
-        self.active_powerups = {}  # {effect_type: time_remaining}
-        
-        # Moving platform interaction
-        self.on_moving_platform = None
-        self.platform_velocity_x = 0
     
     def load_base_sprite(self):
         """Load and prepare the base humanoid sprite"""
@@ -59,7 +52,7 @@ class Player(pygame.sprite.Sprite):
             
             return sprite
         except Exception as e:
-            print(f"Warning: Could not load player sprite: {e}")
+            game_log.warning("assets", f"Warning: Could not load player sprite: {e}")
             # Fallback to simple humanoid shape if image fails to load
             return self.create_fallback_humanoid()
     
@@ -163,7 +156,7 @@ class Player(pygame.sprite.Sprite):
             
             return themed_sprite
         except Exception as e:
-            print(f"Warning: Could not apply color theme: {e}")
+            game_log.warning("assets", f"Warning: Could not apply color theme: {e}")
             return sprite
     
     def apply_pattern_effect(self, sprite):
@@ -207,7 +200,7 @@ class Player(pygame.sprite.Sprite):
             
             return patterned_sprite
         except Exception as e:
-            print(f"Warning: Could not apply pattern effect: {e}")
+            game_log.warning("assets", f"Warning: Could not apply pattern effect: {e}")
             return sprite
     
     def add_accessories(self, sprite):
@@ -268,13 +261,15 @@ class Player(pygame.sprite.Sprite):
             
             return accessorized_sprite
         except Exception as e:
-            print(f"Warning: Could not add accessories: {e}")
+            game_log.warning("assets", f"Warning: Could not add accessories: {e}")
             return sprite
     
     def create_character_sprite(self):
         """Create the complete character sprite with theme, pattern, and accessories"""
         try:
             # Start with the base humanoid sprite
+            if self.base_humanoid_image is None:
+                self.base_humanoid_image = self.load_base_sprite()
             sprite = self.base_humanoid_image.copy()
             
             # Apply theme colors
@@ -288,54 +283,10 @@ class Player(pygame.sprite.Sprite):
             
             return sprite
         except Exception as e:
-            print(f"Warning: Could not create character sprite: {e}")
+            game_log.warning("assets", f"Warning: Could not create character sprite: {e}")
             # Return a basic fallback sprite
             return self.create_fallback_humanoid()
     
-    def handle_input(self, keys):
-        """Handle player input for movement and jumping"""
-        # Reset movement flags
-        self.moving_left = False
-        self.moving_right = False
-        self.is_moving = False
-        
-        # Horizontal movement
-        if keys[pygame.K_LEFT] or keys[pygame.K_a]:
-            self.moving_left = True
-            self.is_moving = True
-            self.facing_right = False
-            self.vel_x = -PLAYER_SPEED
-        elif keys[pygame.K_RIGHT] or keys[pygame.K_d]:
-            self.moving_right = True
-            self.is_moving = True
-            self.facing_right = True
-            self.vel_x = PLAYER_SPEED
-        else:
-            # Apply friction when not moving
-            self.vel_x *= (1 - FRICTION)
-            if abs(self.vel_x) < 0.1:
-                self.vel_x = 0
-        
-        # Jumping
-        if keys[pygame.K_SPACE] or keys[pygame.K_UP] or keys[pygame.K_w]:
-            self.jump()
-    
-    def jump(self):
-        """Handle jumping logic including double jump and power-ups"""
-        if self.on_ground or self.jump_count < self.max_jumps:
-            # Calculate jump strength (enhanced by power-ups)
-            jump_strength = PLAYER_JUMP_SPEED
-            if self.has_powerup("jump_boost"):
-                jump_strength *= 1.5  # 50% higher jumps
-            
-            self.vel_y = jump_strength
-            self.on_ground = False
-            if not self.on_ground:
-                self.jump_count += 1
-            
-            # Add jump particles (enhanced for power-ups)
-            self.add_jump_particles()
-    
     def add_jump_particles(self):
         """Add particle effects when jumping"""
         # Enhanced particles for jump boost
@@ -384,6 +335,10 @@ class Player(pygame.sprite.Sprite):
             if particle['life'] <= 0:
                 self.particles.remove(particle)
     
+    def update_view(self, dt):
+        self.update_particles(dt)
+        self.update_animation(dt)
+    
     def update_animation(self, dt):
         """Update character animations"""
         self.animation_timer += dt * 5  # Animation speed
@@ -403,131 +358,6 @@ class Player(pygame.sprite.Sprite):
         if not self.facing_right:
             self.image = pygame.transform.flip(self.image, True, False)
     
-    def update(self, platforms):
-        """Update player position and handle physics"""
-        dt = 1/60  # Assuming 60 FPS for particle effects
-        
-        # Update power-ups
-        self.update_powerups(dt)
-        
-        # Store previous on_ground state for landing detection
-        was_on_ground = self.on_ground
-        
-        # Apply gravity
-        self.vel_y += PLAYER_GRAVITY
-        
-        # Limit falling speed
-        if self.vel_y > PLAYER_MAX_FALL_SPEED:
-            self.vel_y = PLAYER_MAX_FALL_SPEED
-        
-        # Update horizontal position
-        self.rect.x += self.vel_x
-        
-        # Check horizontal collisions with platforms
-        self.check_horizontal_collisions(platforms)
-        
-        # Update vertical position
-        self.rect.y += self.vel_y
-        
-        # Check vertical collisions with platforms (including moving platforms)
-        self.check_vertical_collisions(platforms)
-        
-        # Handle moving platform interaction
-        if self.on_moving_platform:
-            # Move with the platform (horizontal)
-            if hasattr(self.on_moving_platform, 'get_movement_delta'):
-                platform_delta = self.on_moving_platform.get_movement_delta()
-                self.rect.x += platform_delta
-            
-            # Move with the platform (vertical)
-            if hasattr(self.on_moving_platform, 'get_movement_delta_y'):
-                platform_delta_y = self.on_moving_platform.get_movement_delta_y()
-                self.rect.y += platform_delta_y
-        
-        # Apply ice friction if on ice platform, otherwise normal friction
-        if not self.apply_ice_friction(platforms):
-            # Apply normal friction when not moving
-            if not (self.moving_left or self.moving_right):
-                self.vel_x *= (1 - FRICTION)
-                if abs(self.vel_x) < 0.1:
-                    self.vel_x = 0
-        
-        # Add landing particles if just landed
-        if not was_on_ground and self.on_ground:
-            self.add_landing_particles()
-        
-        # Keep player within world bounds (not just screen bounds!)
-        if self.rect.left < 0:
-            self.rect.left = 0
-        elif self.rect.right > WORLD_WIDTH:
-            self.rect.right = WORLD_WIDTH
-        
-        # Update visual effects
-        self.update_particles(dt)
-        self.update_animation(dt)
-    
-    def check_horizontal_collisions(self, platforms):
-        """Check and handle horizontal collisions with platforms"""
-        for platform in platforms:
-            if self.rect.colliderect(platform.rect):
-                if self.vel_x > 0:  # Moving right
-                    self.rect.right = platform.rect.left
-                elif self.vel_x < 0:  # Moving left
-                    self.rect.left = platform.rect.right
-                self.vel_x = 0
-    
-    def check_vertical_collisions(self, platforms):
-        """Check and handle vertical collisions with platforms (including special platform types)"""
-        self.on_ground = False
-        self.on_moving_platform = None
-        
-        for platform in platforms:
-            # Skip non-solid platforms (like disappeared platforms)
-            if hasattr(platform, 'is_solid') and not platform.is_solid:
-                continue
-            
-            # Special handling for one-way platforms
-            if hasattr(platform, 'one_way') and platform.one_way:
-                # Only collide if falling down and player is above the platform
-                if self.vel_y > 0 and self.rect.bottom <= platform.rect.top + 10:
-                    if self.rect.colliderect(platform.rect):
-                        self.rect.bottom = platform.rect.top
-                        self.vel_y = 0
-                        self.on_ground = True
-                        self.jump_count = 0
-                continue
-                
-            if self.rect.colliderect(platform.rect):
-                if self.vel_y > 0:  # Falling down
-                    self.rect.bottom = platform.rect.top
-                    self.vel_y = 0
-                    self.on_ground = True
-                    self.jump_count = 0  # Reset jump count when landing
-                    
-                    # Handle special platform effects
-                    if hasattr(platform, 'bounce_strength'):  # Bouncy platform
-                        self.vel_y = PLAYER_JUMP_SPEED * platform.bounce_strength
-                        self.on_ground = False
-                        platform.trigger_bounce()  # Trigger bounce animation
-                        self.add_bounce_particles()
-                    
-                    # Check if this is a moving platform
-                    if hasattr(platform, 'get_movement_delta'):
-                        self.on_moving_platform = platform
-                    
-                    # Check if this is a teleporter elevator
-                    if hasattr(platform, 'set_rider'):
-                        platform.set_rider(self)  # Register as rider for teleporter
-                        self.on_moving_platform = platform  # Also treat as moving platform
-                    
-                    # Activate disappearing platforms
-                    if hasattr(platform, 'activate'):
-                        platform.activate()
-                        
-                elif self.vel_y < 0:  # Jumping up
-                    self.rect.top = platform.rect.bottom
-                    self.vel_y = 0
-    
     def add_bounce_particles(self):
         """Add special particle effects for bouncy platforms"""
         for i in range(12):
@@ -547,18 +377,6 @@ class Player(pygame.sprite.Sprite):
             }
             self.particles.append(particle)
     
-    def apply_ice_friction(self, platforms):
-        """Apply special ice friction when on ice platforms"""
-        if self.on_ground:
-            for platform in platforms:
-                if (hasattr(platform, 'ice_friction') and 
-                    self.rect.colliderect(platform.rect) and 
-                    self.rect.bottom <= platform.rect.top + 5):
-                    # Apply ice friction instead of normal friction
-                    self.vel_x *= (1 - platform.ice_friction)
-                    return True
-        return False
-    
     def draw(self, screen):
         """Draw the player and effects on the screen"""
         # Draw shadow
@@ -583,21 +401,12 @@ class Player(pygame.sprite.Sprite):
         # Draw the player
         screen.blit(self.image, self.rect)
     
-    def add_powerup(self, powerup_type, duration):
-        """Add a power-up effect"""
-        self.active_powerups[powerup_type] = duration
     
-    def has_powerup(self, powerup_type):
-        """Check if player has an active power-up"""
-        return powerup_type in self.active_powerups
+    def snapshot(self):
+        """Its body and animation, for restore() (particles and the image aren't kept)"""
+        return (PlayerBody.snapshot(self), self.animation_timer)
     
-    def update_powerups(self, dt):
-        """Update power-up timers"""
-        expired = []
-        for powerup_type, time_left in self.active_powerups.items():
-            self.active_powerups[powerup_type] = time_left - dt
-            if self.active_powerups[powerup_type] <= 0:
-                expired.append(powerup_type)
-        
-        for powerup_type in expired:
-            del self.active_powerups[powerup_type]
\ No newline at end of file
+    def restore(self, state):
+        body, self.animation_timer = state
+        PlayerBody.restore(self, body)
+        self.particles = []
@@ -4,6 +4,8 @@ from settings import *
 
 class PowerUp(pygame.sprite.Sprite):
     """Base class for all power-ups"""
+    _layer = 1  # Drawn above platforms (see render_queue.py)
+    
     def __init__(self, x, y, powerup_type, theme=None):
         super().__init__()
         
@@ -96,32 +98,49 @@ class PowerUp(pygame.sprite.Sprite):
         self.rect = self.image.get_rect()
         self.rect.center = (old_center[0], old_center[1] + float_offset)
     
+    def snapshot(self):
+        """Its animation and whether it's been collected, for restore()"""
+        return (self.rect.copy(), self.image, self.float_timer, self.rotation_timer, self.pulse_timer, self.collected)
+    
+    def restore(self, state):
+        rect, self.image, self.float_timer, self.rotation_timer, self.pulse_timer, self.collected = state
+        self.rect = rect.copy()
+    
     def collect(self):
         """Mark power-up as collected"""
         self.collected = True
         # Add collection particle effect here if desired
 
 class PowerUpManager:
-    """Manages active power-up effects on the player"""
-    def __init__(self):
-        self.active_effects = {}
+    """Manages active power-up effects on the player
+
+    Each effect's expiry is an event on the world's Scheduler (timers.py), so
+    nothing ticks while effects run.
+    """
+    def __init__(self, timers):
+        self.timers = timers
+        self.active_effects = {}  # {effect_type: expiry event}
     
     def add_effect(self, effect_type, duration):
-        """Add a temporary effect"""
-        self.active_effects[effect_type] = duration
+        """Add a temporary effect (picking one up again restarts its time)"""
+        self.timers.cancel(self.active_effects.get(effect_type))
+        self.active_effects[effect_type] = self.timers.after(duration, self.expire, effect_type)
     
-    def update(self, dt):
-        """Update all active effects"""
-        # Decrease timers
-        expired_effects = []
-        for effect_type, time_left in self.active_effects.items():
-            self.active_effects[effect_type] = time_left - dt
-            if self.active_effects[effect_type] <= 0:
-                expired_effects.append(effect_type)
-        
-        # Remove expired effects
-        for effect_type in expired_effects:
-            del self.active_effects[effect_type]
+    def expire(self, effect_type):
+        del self.active_effects[effect_type]
+    
+    def clear(self):
+        """Remove every effect now"""
+        for event in self.active_effects.values():
+            self.timers.cancel(event)
+        self.active_effects.clear()
+    
+    def snapshot(self):
+        """The active effects (their expiry events are restored with the world's timers)"""
+        return dict(self.active_effects)
+    
+    def restore(self, state):
+        self.active_effects = dict(state)
     
     def has_effect(self, effect_type):
         """Check if an effect is currently active"""
@@ -129,4 +148,5 @@ class PowerUpManager:
     
     def get_time_left(self, effect_type):
         """Get remaining time for an effect"""
-        return self.active_effects.get(effect_type, 0) 
\ No newline at end of file
+        event = self.active_effects.get(effect_type)
+        return self.timers.time_left(event) if event is not None else 0
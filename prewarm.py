@@ -0,0 +1,111 @@
+import os
+import json
+import queue
+import threading
+import pygame
+import game_log
+from settings import *
+from player import Player, character_look
+from enemy_manager import EnemyManager
+
+# The level normal play and the demo start on (generated levels stream in instead)
+PREWARM_LEVEL = "staircase"
+# Longest close() waits for the job in progress to finish (seconds)
+CLOSE_TIMEOUT = 1.0
+
+class Prewarmer:
+    """Builds what the highlighted character will need while the character select menu sits idle
+
+    request() is called every menu frame with the current selection. Each new
+    selection queues work for a background thread: the themed character sprite
+    (kept in player.py's per-look cache) and the staircase level's sprites for the
+    theme. Once the demo is toggled on, it also queues the demo's own copy of the
+    level and ai_learning_data.json. The game picks the results up with take_level()
+    and take_learning_data(); anything not ready yet is simply built on the spot as before.
+    """
+    def __init__(self):
+        self.requested = set()     # Jobs already queued
+        self.levels = {}           # (level name, theme key, "game" or "demo") -> (level, all_sprites, platforms, powerups, enemies)
+        self.learning_data = None  # Parsed ai_learning_data.json
+        self.lock = threading.Lock()
+
+        self.requests = queue.Queue()
+        self.worker = threading.Thread(target=self.prewarm_worker, name="prewarm", daemon=True)
+        self.worker.start()
+
+    def request(self, character_config):
+        """Queue the work for a selection (jobs already queued are skipped)"""
+        theme, pattern, accessory = character_look(character_config)
+        jobs = [("character", theme, pattern, accessory), ("level", PREWARM_LEVEL, theme, "game")]
+        if character_config.get('start_demo', False):
+            jobs += [("level", PREWARM_LEVEL, theme, "demo"), ("learning_data",)]
+        for job in jobs:
+            if job not in self.requested:
+                self.requested.add(job)
+                self.requests.put(job)
+
+    def prewarm_worker(self):
+        """Background thread: run queued jobs until given None"""
+        while True:
+            job = self.requests.get()
+            if job is None:
+                return
+            try:
+                self.run_job(job)
+            except Exception as e:
+                game_log.warning("prewarm", f"Warning: Could not prewarm {job[0]}: {e}")
+
+    def run_job(self, job):
+        kind = job[0]
+        if kind == "character":
+            _, theme, pattern, accessory = job
+            Player(0, 0, {'theme': theme, 'pattern': pattern, 'accessory': accessory})
+        elif kind == "level":
+            from level_format import load_level, build_level
+            from platforms import PlatformGroup
+            _, name, theme, purpose = job
+            level = load_level(name)
+            groups = [pygame.sprite.Group(), PlatformGroup(), pygame.sprite.Group(), EnemyManager()]
+            all_sprites, platforms, powerups, enemies = groups
+            # The demo's copy has no enemies (see DemoLevel)
+            build_level(level, THEMES[theme], platforms, all_sprites, powerups,
+                        enemies if purpose == "game" else None)
+            with self.lock:
+                self.levels[(name, theme, purpose)] = (level, *groups)
+        elif kind == "learning_data":
+            if not os.path.exists("ai_learning_data.json"):
+                return  # The demo starts fresh
+            with open("ai_learning_data.json", "r") as f:
+                data = json.load(f)
+            with self.lock:
+                self.learning_data = data
+
+    def take_level(self, name, theme, purpose="game"):
+        """(level, all_sprites, platforms, powerups, enemies) built for a theme, or None if not ready"""
+        with self.lock:
+            prebuilt = self.levels.pop((name, theme, purpose), None)
+            # Other themes' builds won't be used
+            for key in [key for key in self.levels if key[1] != theme]:
+                del self.levels[key]
+        return prebuilt
+
+    def take_learning_data(self):
+        """The learning data read ahead of time, or None if it isn't ready"""
+        with self.lock:
+            data = self.learning_data
+            self.learning_data = None
+        return data
+
+    def close(self, timeout=CLOSE_TIMEOUT):
+        """Stop the background thread (the menu is over), dropping the jobs not started yet
+
+        Waits up to timeout seconds for the job in progress, so nothing is still
+        being built when pygame shuts down (0 to return at once).
+        """
+        while True:
+            try:
+                self.requests.get_nowait()
+            except queue.Empty:
+                break
+        self.requests.put(None)
+        self.worker.join(timeout)
@@ -0,0 +1,281 @@
+import random
+from array import array
+from collections import deque
+
+# The AI's actions, in Q-table column order
+ACTIONS = ("move_right", "move_left", "jump_right", "jump_left", "jump_only", "wait")
+ACTION_COUNT = len(ACTIONS)
+
+class QTable:
+    """Q-values for (state key, action) pairs
+
+    States are numbered in the order they are first seen; row r's values for the
+    six actions are values[r * ACTION_COUNT:(r + 1) * ACTION_COUNT].
+    """
+    def __init__(self, initial=0.0):
+        self.initial = initial
+        self.rows = {}  # state key -> row
+        self.keys = []  # row -> state key
+        self.values = array("d")
+
+    def __len__(self):
+        return len(self.keys)
+
+    def row(self, key):
+        """Row of a state, adding it if it is new"""
+        row = self.rows.get(key)
+        if row is None:
+            row = len(self.keys)
+            self.rows[key] = row
+            self.keys.append(key)
+            self.values.extend([self.initial] * ACTION_COUNT)
+        return row
+
+    def best_value(self, row):
+        start = row * ACTION_COUNT
+        return max(self.values[start:start + ACTION_COUNT])
+
+    def best_action(self, row):
+        """Highest-valued action of a row (ties broken at random)"""
+        start = row * ACTION_COUNT
+        values = self.values[start:start + ACTION_COUNT]
+        best = max(values)
+        return random.choice([action for action, value in enumerate(values) if value == best])
+
+class ReplayBuffer:
+    """Fixed-capacity ring buffer of (state, action, reward, next state, done) transitions
+
+    States are Q-table rows and each field lives in its own array; a done
+    transition stores next state -1. Once full, the oldest transition is
+    overwritten. With prioritized=True transitions are sampled in proportion to
+    (|TD error| + floor) ** alpha, kept in a sum tree so sampling and updates
+    are O(log n); new transitions get the highest priority seen so far.
+    """
+    def __init__(self, capacity=20000, prioritized=True, alpha=0.6, floor=0.01):
+        self.capacity = capacity
+        self.prioritized = prioritized
+        self.alpha = alpha
+        self.floor = floor
+
+        self.states = array("l", [0]) * capacity
+        self.actions = array("b", [0]) * capacity
+        self.rewards = array("d", [0.0]) * capacity
+        self.next_states = array("l", [0]) * capacity
+        self.size = 0
+        self.position = 0  # Slot the next transition goes in
+
+        # Sum tree: leaves at [capacity, 2 * capacity), node i holds the sum of nodes 2i and 2i + 1
+        self.tree = array("d", [0.0]) * (2 * capacity) if prioritized else None
+        self.max_priority = 1.0
+
+    def __len__(self):
+        return self.size
+
+    def add(self, state, action, reward, next_state):
+        """Store a transition (next_state -1 when done), overwriting the oldest once full"""
+        slot = self.position
+        self.states[slot] = state
+        self.actions[slot] = action
+        self.rewards[slot] = reward
+        self.next_states[slot] = next_state
+        if self.prioritized:
+            self.set_priority(slot, self.max_priority)
+        self.position = (slot + 1) % self.capacity
+        self.size = min(self.size + 1, self.capacity)
+
+    def set_priority(self, slot, priority):
+        tree = self.tree
+        node = slot + self.capacity
+        change = priority - tree[node]
+        while node:
+            tree[node] += change
+            node //= 2
+
+    def update_priority(self, slot, error):
+        """Re-prioritize a sampled transition by its latest TD error"""
+        if self.prioritized:
+            priority = (abs(error) + self.floor) ** self.alpha
+            self.max_priority = max(self.max_priority, priority)
+            self.set_priority(slot, priority)
+
+    def sample(self, count):
+        """Slots of count transitions (with replacement)"""
+        if not self.prioritized:
+            return [random.randrange(self.size) for _ in range(count)]
+
+        tree = self.tree
+        capacity = self.capacity
+        slots = []
+        for _ in range(count):
+            # Walk down from the root toward the leaf holding this point of the total
+            point = random.random() * tree[1]
+            node = 1
+            while node < capacity:
+                node *= 2
+                if point >= tree[node] and tree[node + 1] > 0:
+                    point -= tree[node]
+                    node += 1
+            slots.append(node - capacity)
+        return slots
+
+    def clear(self):
+        self.size = 0
+        self.position = 0
+        if self.prioritized:
+            self.tree = array("d", [0.0]) * (2 * self.capacity)
+            self.max_priority = 1.0
+
+class QLearner:
+    """Tabular Q-learning with n-step returns and value-iteration sweeps between episodes
+
+    During an episode each step is backed up toward its n-step return as soon as
+    n later rewards are known. Every transition also goes into an empirical model
+    (visits, reward sum, terminal count and successor counts per state-action), and
+    end_episode() runs value iteration over that model, spreading what the last
+    episode found to every state that leads there.
+
+    Transitions are also kept in a ReplayBuffer. Each step replays a small
+    minibatch of one-step updates, and each episode ends with a larger batch,
+    so every simulated step is learned from several times.
+    """
+    def __init__(self, alpha=0.2, gamma=0.97, n_steps=8, epsilon=0.3, min_epsilon=0.02,
+                 epsilon_decay=0.9, sweeps=20, replay_capacity=20000, prioritized=True,
+                 step_batch=8, episode_batch=256):
+        self.alpha = alpha
+        self.gamma = gamma
+        self.n_steps = n_steps
+        self.epsilon = epsilon
+        self.min_epsilon = min_epsilon
+        self.epsilon_decay = epsilon_decay
+        self.sweeps = sweeps
+        self.step_batch = step_batch
+        self.episode_batch = episode_batch
+
+        self.table = QTable()
+        self.pending = deque()  # (row, action, reward) steps still waiting for their n-step return
+
+        # (row, action) -> [visits, reward sum, terminal count, {next row: count}]
+        self.model = {}
+
+        # Experience replay (replay_capacity 0 turns it off)
+        self.replay = ReplayBuffer(replay_capacity, prioritized) if replay_capacity else None
+
+        self.episodes = 0
+
+    def choose(self, key):
+        """Epsilon-greedy action index for a state key"""
+        row = self.table.row(key)
+        if random.random() < self.epsilon:
+            return random.randrange(ACTION_COUNT)
+        return self.table.best_action(row)
+
+    def observe(self, key, action, reward, next_key, done):
+        """Learn from one step (next_key is ignored when done)"""
+        row = self.table.row(key)
+        next_row = None if done else self.table.row(next_key)
+
+        entry = self.model.get((row, action))
+        if entry is None:
+            entry = self.model[(row, action)] = [0, 0.0, 0, {}]
+        entry[0] += 1
+        entry[1] += reward
+        if next_row is None:
+            entry[2] += 1
+        else:
+            entry[3][next_row] = entry[3].get(next_row, 0) + 1
+
+        self.pending.append((row, action, reward))
+        if done:
+            while self.pending:
+                self.backup(None)
+        elif len(self.pending) >= self.n_steps:
+            self.backup(next_row)
+
+        if self.replay is not None:
+            self.replay.add(row, action, reward, -1 if next_row is None else next_row)
+            self.learn_from_replay(self.step_batch)
+
+    def backup(self, bootstrap_row):
+        """Move the oldest pending step toward its n-step return"""
+        target = 0.0
+        discount = 1.0
+        for _, _, reward in self.pending:
+            target += discount * reward
+            discount *= self.gamma
+        if bootstrap_row is not None:
+            target += discount * self.table.best_value(bootstrap_row)
+
+        row, action, _ = self.pending.popleft()
+        index = row * ACTION_COUNT + action
+        self.table.values[index] += self.alpha * (target - self.table.values[index])
+
+    def learn_from_replay(self, count):
+        """One-step Q-learning updates on count transitions sampled from the replay buffer"""
+        replay = self.replay
+        if replay is None or not replay.size:
+            return
+        values = self.table.values
+        best_value = self.table.best_value
+        for slot in replay.sample(count):
+            next_row = replay.next_states[slot]
+            target = replay.rewards[slot]
+            if next_row >= 0:
+                target += self.gamma * best_value(next_row)
+            index = replay.states[slot] * ACTION_COUNT + replay.actions[slot]
+            error = target - values[index]
+            values[index] += self.alpha * error
+            replay.update_priority(slot, error)
+
+    def forget_pending(self):
+        """Drop steps that can't be followed up (the player was moved)"""
+        self.pending.clear()
+
+    def sweep(self):
+        """One value-iteration pass over the observed transitions; returns the largest change"""
+        values = self.table.values
+        best_value = self.table.best_value
+        gamma = self.gamma
+        largest = 0.0
+        for (row, action), (visits, reward_sum, _, successors) in self.model.items():
+            expected = 0.0
+            for next_row, count in successors.items():
+                expected += count * best_value(next_row)
+            # Terminal transitions contribute their reward only
+            value = (reward_sum + gamma * expected) / visits
+            index = row * ACTION_COUNT + action
+            largest = max(largest, abs(value - values[index]))
+            values[index] = value
+        return largest
+
+    def end_episode(self):
+        """Sweep the model and explore a little less next episode"""
+        for _ in range(self.sweeps):
+            if self.sweep() < 1e-4:
+                break
+        self.learn_from_replay(self.episode_batch)
+        self.episodes += 1
+        self.epsilon = max(self.min_epsilon, self.epsilon * self.epsilon_decay)
+
+    def get_data(self):
+        """Q-table in a JSON-friendly form (the model and replay buffer refill from new experience)"""
+        return {
+            "states": self.table.keys,
+            "values": list(self.table.values),
+            "episodes": self.episodes,
+            "epsilon": self.epsilon
+        }
+
+    def load_data(self, data):
+        """Replace the Q-table with data from get_data"""
+        self.table = QTable()
+        for key in data.get("states", []):
+            self.table.row(key)
+        values = data.get("values", [])
+        if len(values) == len(self.table.values):
+            self.table.values = array("d", values)
+        self.pending.clear()
+        self.model = {}
+        if self.replay is not None:
+            self.replay.clear()  # Its rows belonged to the old table
+        self.episodes = data.get("episodes", 0)
+        self.epsilon = data.get("epsilon", self.epsilon)
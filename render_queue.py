@@ -0,0 +1,51 @@
+class RenderQueue:
+    """Collects (surface, screen position) pairs and draws them all with one Surface.blits call
+
+    Everything is drawn in layers, lowest first. A sprite's layer is its `_layer`
+    attribute (pygame's own convention, 0 when missing), so the player stays on top of
+    platforms that stream in after it; within a layer sprites keep their group order.
+    Each group's sprites are sorted into layers once and re-sorted only when its members
+    change. Positions are plain (x, y) tuples from the sprite rect and the camera offset,
+    with no Rect made per sprite; blits truncates them exactly as the camera's Rects did.
+    """
+    def __init__(self, screen):
+        self.screen = screen
+        self.layers = {}  # layer -> [(surface, position)] queued this frame
+        self.orders = {}  # group -> (its sprites when sorted, [(layer, sprites in that layer)])
+
+    def add(self, surface, position, layer=0):
+        self.layers.setdefault(layer, []).append((surface, position))
+
+    def extend(self, entries, layer=0):
+        """Queue a list of (surface, position) pairs in one layer"""
+        self.layers.setdefault(layer, []).extend(entries)
+
+    def layer_order(self, sprites):
+        """The group's sprites split into layers, cached while its members stay the same"""
+        members = sprites.sprites()
+        cached = self.orders.get(sprites)
+        if cached is None or cached[0] != members:
+            by_layer = {}
+            for sprite in members:
+                by_layer.setdefault(getattr(sprite, "_layer", 0), []).append(sprite)
+            if len(self.orders) > 8:
+                self.orders.clear()  # Groups of worlds that are gone
+            cached = self.orders[sprites] = (members, list(by_layer.items()))
+        return cached[1]
+
+    def add_sprites(self, sprites, camera=None):
+        """Queue each sprite in a group at its rect, shifted by the camera"""
+        cx, cy = (camera.x, camera.y) if camera is not None else (0, 0)
+        for layer, members in self.layer_order(sprites):
+            self.layers.setdefault(layer, []).extend(
+                [(sprite.image, (sprite.rect.x - cx, sprite.rect.y - cy)) for sprite in members])
+
+    def draw(self):
+        """Draw everything queued, lowest layer first, and empty the queue"""
+        layers = self.layers
+        if len(layers) == 1:
+            batch, = layers.values()
+        else:
+            batch = [entry for layer in sorted(layers) for entry in layers[layer]]
+        self.screen.blits(batch, doreturn=False)
+        self.layers = {}
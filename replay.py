@@ -0,0 +1,225 @@
+import os
+import sys
+import json
+import time
+import zlib
+import random
+import struct
+import contextlib
+import game_log
+
+# Recording file layout:
+#   MAGIC | version (u8) | header length (u32) | JSON header | zlib(ticks)
+# Each tick is TICK_FORMAT: dt in ms, control/hotkey bits, player x, player y
+MAGIC = b"PFRP"
+VERSION = 1
+TICK_FORMAT = "<HBii"
+TICK_SIZE = struct.calcsize(TICK_FORMAT)
+
+# Control bits
+BIT_LEFT = 1
+BIT_RIGHT = 2
+BIT_JUMP = 4
+
+# Demo hotkey bits (keys that change the simulation, see DemoLevel.handle_controls)
+BIT_RESTART = 8
+BIT_PAUSE = 16
+BIT_ERASE = 32
+
+class ReplayDivergence(Exception):
+    """Raised when a replayed session leaves the recorded trajectory"""
+    pass
+
+def pack_controls(controls):
+    """Pack a ControlState into control bits"""
+    bits = 0
+    if controls.left:
+        bits |= BIT_LEFT
+    if controls.right:
+        bits |= BIT_RIGHT
+    if controls.jump:
+        bits |= BIT_JUMP
+    return bits
+
+def unpack_controls(bits, controls):
+    """Write control bits into a ControlState"""
+    controls.left = bool(bits & BIT_LEFT)
+    controls.right = bool(bits & BIT_RIGHT)
+    controls.jump = bool(bits & BIT_JUMP)
+
+class SessionRecorder:
+    """Records one game session (level, seed and per-tick inputs) to a compact binary file"""
+    def __init__(self, path):
+        self.path = path
+        self.header = None
+        self.ticks = bytearray()
+        self.tick_count = 0
+        self.active = False
+        self.finished = False
+
+    def start(self, mode, level_id, character_config, seed, level_params=None, controller=None, ghosts=0, frontier=False):
+        """Begin recording a session (the caller seeds random with the same seed)"""
+        self.header = {
+            "mode": mode,
+            "level": level_id,
+            "level_params": level_params,  # Generator arguments for procedural levels
+            "controller": controller,  # Demo controller (see DEMO_CONTROLLERS in settings.py)
+            "ghosts": ghosts,  # Demo ghost agents (their seeds come from the session seed)
+            "frontier": frontier,  # Demo attempts start from frontier snapshots
+            "seed": seed,
+            "character": {
+                "theme": character_config['theme'],
+                "pattern": character_config['pattern'],
+                "accessory": character_config['accessory']
+            },
+            "learning_data": None
+        }
+        self.ticks = bytearray()
+        self.tick_count = 0
+        self.active = True
+
+    def set_learning_data(self, learning_data):
+        """Store the AI's starting memory so a demo replay can re-run the same decisions"""
+        # Round-trip through JSON now so later learning can't mutate the snapshot
+        self.header["learning_data"] = json.loads(json.dumps(learning_data))
+
+    def record_tick(self, dt_ms, bits, player_rect):
+        """Record one simulation tick"""
+        self.ticks += struct.pack(TICK_FORMAT, min(dt_ms, 0xFFFF), bits, player_rect.x, player_rect.y)
+        self.tick_count += 1
+
+    def finish(self):
+        """Write the recording to disk"""
+        if not self.active:
+            return
+        self.active = False
+        self.finished = True
+        save_recording(self.path, self.header, bytes(self.ticks))
+        game_log.info("replay", f"🎬 Recorded {self.tick_count} ticks of {self.header['mode']} on '{self.header['level']}' to {self.path}")
+
+def save_recording(path, header, ticks):
+    """Write a header and packed ticks to a recording file"""
+    header_bytes = json.dumps(header, separators=(",", ":")).encode("utf-8")
+    with open(path, "wb") as f:
+        f.write(MAGIC)
+        f.write(struct.pack("<BI", VERSION, len(header_bytes)))
+        f.write(header_bytes)
+        f.write(zlib.compress(ticks, 9))
+
+def load_recording(path):
+    """Read a recording file, returning (header, list of (dt_ms, bits, x, y))"""
+    with open(path, "rb") as f:
+        data = f.read()
+
+    if data[:4] != MAGIC:
+        raise ValueError(f"{path} is not a session recording")
+    version, header_length = struct.unpack_from("<BI", data, 4)
+    if version != VERSION:
+        raise ValueError(f"Unsupported recording version {version}")
+
+    offset = 4 + struct.calcsize("<BI")
+    header = json.loads(data[offset:offset + header_length].decode("utf-8"))
+    ticks = zlib.decompress(data[offset + header_length:])
+    return header, list(struct.iter_unpack(TICK_FORMAT, ticks))
+
+def replay_session(path, quiet=True):
+    """Re-run a recorded session headlessly at full speed and check the trajectory
+
+    Returns a dict of replay statistics; raises ReplayDivergence on the first
+    tick whose player position (or, for demos, AI controls) differs from the recording.
+    """
+    # Headless display before pygame initializes
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+    import pygame
+    from settings import GAME_STATE_PLAYING, GAME_STATE_TUTORIAL, GAME_STATE_DEMO
+    from main import Game
+
+    header, ticks = load_recording(path)
+    mode = header["mode"]
+
+    output = open(os.devnull, "w") if quiet else sys.stdout
+    game = None
+    try:
+        with contextlib.redirect_stdout(output), (game_log.quiet() if quiet else contextlib.nullcontext()):
+            game = Game(generate=header.get("level_params"))
+            game.character_config = dict(header["character"], start_tutorial=False, start_demo=False)
+
+            # Rebuild the session in the same order Game.update does
+            if mode == GAME_STATE_DEMO:
+                game.init_game_world(use_generated=False)
+                random.seed(header["seed"])
+                from demo import DemoLevel
+                game.demo_level = DemoLevel(game.screen, game.character_config, game,
+                                            learning_data=header["learning_data"] or {},
+                                            controller=header.get("controller") or "learning",
+                                            ghosts=header.get("ghosts", 0),
+                                            frontier=header.get("frontier", False))
+                game.demo_level.ai.persist_to_disk = False
+                player = game.demo_level.player
+            elif mode == GAME_STATE_TUTORIAL:
+                random.seed(header["seed"])
+                from tutorial import TutorialLevel
+                game.tutorial_level = TutorialLevel(game.screen, game.character_config)
+                game.camera.set_world_size(game.tutorial_level.world_width, game.tutorial_level.world_height)
+                player = game.tutorial_level.player
+            elif mode == GAME_STATE_PLAYING:
+                game.init_game_world()
+                random.seed(header["seed"])
+                player = game.player
+            else:
+                raise ValueError(f"Unknown recording mode '{mode}'")
+            game.state = mode
+
+            level_id = game.tutorial_level.level_id if mode == GAME_STATE_TUTORIAL else game.level_id
+            if header["level"] != level_id:
+                raise ReplayDivergence(f"Recording is for level '{header['level']}', this build has '{level_id}'")
+
+            hotkeys = ((BIT_RESTART, pygame.K_r), (BIT_PAUSE, pygame.K_p), (BIT_ERASE, pygame.K_e))
+            start_time = time.perf_counter()
+
+            for tick, (dt_ms, bits, expected_x, expected_y) in enumerate(ticks):
+                game.input.begin_frame()
+                if mode == GAME_STATE_DEMO:
+                    for bit, key in hotkeys:
+                        if bits & bit:
+                            game.input.just_pressed.add(key)
+                else:
+                    unpack_controls(bits, game.input.controls)
+
+                game.update(dt_ms)
+
+                if mode == GAME_STATE_DEMO and pack_controls(player.controls) != bits & (BIT_LEFT | BIT_RIGHT | BIT_JUMP):
+                    raise ReplayDivergence(f"Tick {tick}: AI chose different controls than recorded")
+                if (player.rect.x, player.rect.y) != (expected_x, expected_y):
+                    raise ReplayDivergence(f"Tick {tick}: player at {player.rect.topleft}, recorded ({expected_x}, {expected_y})")
+
+            elapsed = time.perf_counter() - start_time
+    finally:
+        if game is not None and game.streamer is not None:
+            game.streamer.close()
+        if quiet:
+            output.close()
+
+    return {
+        "mode": mode,
+        "level": header["level"],
+        "ticks": len(ticks),
+        "seconds": elapsed,
+        "ticks_per_second": len(ticks) / elapsed if elapsed > 0 else float("inf")
+    }
+
+if __name__ == "__main__":
+    if len(sys.argv) != 2:
+        print("Usage: python replay.py SESSION_FILE")
+        sys.exit(2)
+
+    try:
+        stats = replay_session(sys.argv[1])
+    except ReplayDivergence as e:
+        print(f"❌ Replay diverged: {e}")
+        sys.exit(1)
+
+    print(f"✅ Replayed {stats['ticks']} ticks of {stats['mode']} on '{stats['level']}' "
+          f"in {stats['seconds']:.2f}s ({stats['ticks_per_second']:.0f} ticks/s) - trajectory identical")
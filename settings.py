@@ -121,4 +121,8 @@ GAME_STATE_DEMO = "demo"
 GAME_STATE_PLAYING = "playing"
 GAME_STATE_PAUSED = "paused"
 GAME_STATE_GAME_OVER = "game_over"
-GAME_STATE_VICTORY = "victory"
\ No newline at end of file
+GAME_STATE_VICTORY = "victory"
+
+# Demo controllers: the learning AI, the graph planner, the learning AI guided by the planner,
+# or the learning AI with its Q-learning backend
+DEMO_CONTROLLERS = ("learning", "planner", "guided", "qlearning")
@@ -0,0 +1,583 @@
+import pygame
+from settings import *
+from controls import ControlState
+from powerups import PowerUpManager
+from timers import Scheduler
+
+class PlayerBody:
+    """The player as the simulation sees it: a rect, its velocity and its controls
+
+    Everything the physics needs and nothing it draws, so it needs no display and
+    is cheap to make and copy (clone()). Player (player.py) is a body with a sprite
+    on top: the view hooks at the end of this class are where it draws particles
+    and animates.
+    """
+    __slots__ = ("rect", "vel_x", "vel_y", "on_ground", "jump_count", "max_jumps", "world_width",
+                 "controls", "moving_left", "moving_right", "is_moving", "facing_right",
+                 "effects", "on_moving_platform", "platform_velocity_x")
+    touches_platforms = True  # Landing sets off bouncy, disappearing and teleporter platforms (not for ghosts.Ghost)
+
+    def __init__(self, x, y, timers=None):
+        self.rect = pygame.Rect(x, y, PLAYER_WIDTH, PLAYER_HEIGHT)
+
+        # Physics variables
+        self.vel_x = 0
+        self.vel_y = 0
+        self.on_ground = False
+        self.jump_count = 0
+        self.max_jumps = 2  # Allow double jump
+        self.world_width = WORLD_WIDTH  # Right edge of the current level (set by the level)
+
+        # Input state
+        self.controls = ControlState()  # Written by the human input layer or the AI
+        self.moving_left = False
+        self.moving_right = False
+        self.is_moving = False
+        self.facing_right = True
+
+        # Power-up system (expiry runs on the world's timers; a body on its own gets a clock nothing advances)
+        self.effects = PowerUpManager(timers if timers is not None else Scheduler())
+
+        # Moving platform interaction
+        self.on_moving_platform = None
+        self.platform_velocity_x = 0
+
+    def clone(self):
+        """A headless copy to simulate ahead with; its power-ups run on a clock of its own"""
+        body = PlayerBody(0, 0)
+        body.restore(PlayerBody.snapshot(self))
+        body.max_jumps = self.max_jumps
+        body.world_width = self.world_width
+        body.controls.left, body.controls.right, body.controls.jump = self.controls.left, self.controls.right, self.controls.jump
+        body.effects.restore({})
+        for effect_type in self.effects.active_effects:
+            body.effects.add_effect(effect_type, self.effects.get_time_left(effect_type))
+        return body
+
+    def snapshot(self):
+        """Its physics, movement and power-ups, for restore()"""
+        return (self.rect.topleft, self.vel_x, self.vel_y, self.on_ground, self.jump_count,
+                self.moving_left, self.moving_right, self.is_moving, self.facing_right,
+                self.on_moving_platform, self.platform_velocity_x, self.effects.snapshot())
+
+    def restore(self, state):
+        (self.rect.topleft, self.vel_x, self.vel_y, self.on_ground, self.jump_count,
+         self.moving_left, self.moving_right, self.is_moving, self.facing_right,
+         self.on_moving_platform, self.platform_velocity_x, effects) = state
+        self.effects.restore(effects)
+
+    def handle_input(self, keys):
+        """Handle raw key-array input for movement and jumping"""
+        self.controls.set_from_keys(keys)
+        self.apply_controls()
+
+    def apply_controls(self, controls=None):
+        """Apply abstract left/right/jump controls (defaults to self.controls)"""
+        if controls is None:
+            controls = self.controls
+
+        # Reset movement flags
+        self.moving_left = False
+        self.moving_right = False
+        self.is_moving = False
+
+        # Horizontal movement
+        if controls.left:
+            self.moving_left = True
+            self.is_moving = True
+            self.facing_right = False
+            self.vel_x = -PLAYER_SPEED
+        elif controls.right:
+            self.moving_right = True
+            self.is_moving = True
+            self.facing_right = True
+            self.vel_x = PLAYER_SPEED
+        else:
+            # Apply friction when not moving
+            self.vel_x *= (1 - FRICTION)
+            if abs(self.vel_x) < 0.1:
+                self.vel_x = 0
+
+        # Jumping
+        if controls.jump:
+            self.jump()
+
+    def jump(self):
+        """Handle jumping logic including double jump and power-ups"""
+        if self.on_ground or self.jump_count < self.max_jumps:
+            # Calculate jump strength (enhanced by power-ups)
+            jump_strength = PLAYER_JUMP_SPEED
+            if self.has_powerup("jump_boost"):
+                jump_strength *= 1.5  # 50% higher jumps
+
+            self.vel_y = jump_strength
+            self.on_ground = False
+            if not self.on_ground:
+                self.jump_count += 1
+
+            # Add jump particles (enhanced for power-ups)
+            self.add_jump_particles()
+
+    def update(self, platforms):
+        """Update player position and handle physics"""
+        dt = 1/60  # Assuming 60 FPS for particle effects
+
+        # Store previous on_ground state for landing detection
+        was_on_ground = self.on_ground
+
+        # Apply gravity
+        self.vel_y += PLAYER_GRAVITY
+
+        # Limit falling speed
+        if self.vel_y > PLAYER_MAX_FALL_SPEED:
+            self.vel_y = PLAYER_MAX_FALL_SPEED
+
+        # Update horizontal position
+        self.rect.x += self.vel_x
+
+        # Check horizontal collisions with platforms
+        self.check_horizontal_collisions(platforms)
+
+        # Update vertical position
+        self.rect.y += self.vel_y
+
+        # Check vertical collisions with platforms (including moving platforms)
+        self.check_vertical_collisions(platforms)
+
+        # Handle moving platform interaction
+        if self.on_moving_platform:
+            # Move with the platform (horizontal)
+            if hasattr(self.on_moving_platform, 'get_movement_delta'):
+                platform_delta = self.on_moving_platform.get_movement_delta()
+                self.rect.x += platform_delta
+
+            # Move with the platform (vertical)
+            if hasattr(self.on_moving_platform, 'get_movement_delta_y'):
+                platform_delta_y = self.on_moving_platform.get_movement_delta_y()
+                self.rect.y += platform_delta_y
+
+        # Apply ice friction if on ice platform, otherwise normal friction
+        if not self.apply_ice_friction(platforms):
+            # Apply normal friction when not moving
+            if not (self.moving_left or self.moving_right):
+                self.vel_x *= (1 - FRICTION)
+                if abs(self.vel_x) < 0.1:
+                    self.vel_x = 0
+
+        # Add landing particles if just landed
+        if not was_on_ground and self.on_ground:
+            self.add_landing_particles()
+
+        # Keep player within world bounds (not just screen bounds!)
+        if self.rect.left < 0:
+            self.rect.left = 0
+        elif self.rect.right > self.world_width:
+            self.rect.right = self.world_width
+
+        # Update visual effects
+        self.update_view(dt)
+
+    def check_horizontal_collisions(self, platforms):
+        """Check and handle horizontal collisions with platforms"""
+        for platform in platforms:
+            if self.rect.colliderect(platform.rect):
+                if self.vel_x > 0:  # Moving right
+                    self.rect.right = platform.rect.left
+                elif self.vel_x < 0:  # Moving left
+                    self.rect.left = platform.rect.right
+                self.vel_x = 0
+
+    def check_vertical_collisions(self, platforms):
+        """Check and handle vertical collisions with platforms (including special platform types)"""
+        self.on_ground = False
+        self.on_moving_platform = None
+
+        for platform in platforms:
+            # Skip non-solid platforms (like disappeared platforms)
+            if hasattr(platform, 'is_solid') and not platform.is_solid:
+                continue
+
+            # Special handling for one-way platforms
+            if hasattr(platform, 'one_way') and platform.one_way:
+                # Only collide if falling down and player is above the platform
+                if self.vel_y > 0 and self.rect.bottom <= platform.rect.top + 10:
+                    if self.rect.colliderect(platform.rect):
+                        self.rect.bottom = platform.rect.top
+                        self.vel_y = 0
+                        self.on_ground = True
+                        self.jump_count = 0
+                continue
+
+            if self.rect.colliderect(platform.rect):
+                if self.vel_y > 0:  # Falling down
+                    self.rect.bottom = platform.rect.top
+                    self.vel_y = 0
+                    self.on_ground = True
+                    self.jump_count = 0  # Reset jump count when landing
+
+                    # Handle special platform effects
+                    if hasattr(platform, 'bounce_strength'):  # Bouncy platform
+                        self.vel_y = PLAYER_JUMP_SPEED * platform.bounce_strength
+                        self.on_ground = False
+                        if self.touches_platforms:
+                            platform.trigger_bounce()  # Trigger bounce animation
+                        self.add_bounce_particles()
+
+                    # Check if this is a moving platform
+                    if hasattr(platform, 'get_movement_delta'):
+                        self.on_moving_platform = platform
+
+                    # Check if this is a teleporter elevator
+                    if hasattr(platform, 'set_rider'):
+                        if self.touches_platforms:
+                            platform.set_rider(self)  # Register as rider for teleporter
+                        self.on_moving_platform = platform  # Also treat as moving platform
+
+                    # Activate disappearing platforms
+                    if hasattr(platform, 'activate') and self.touches_platforms:
+                        platform.activate()
+
+                elif self.vel_y < 0:  # Jumping up
+                    self.rect.top = platform.rect.bottom
+                    self.vel_y = 0
+
+    def apply_ice_friction(self, platforms):
+        """Apply special ice friction when on ice platforms"""
+        if self.on_ground:
+            for platform in platforms:
+                if (hasattr(platform, 'ice_friction') and
+                    self.rect.colliderect(platform.rect) and
+                    self.rect.bottom <= platform.rect.top + 5):
+                    # Apply ice friction instead of normal friction
+                    self.vel_x *= (1 - platform.ice_friction)
+                    return True
+        return False
+
+    def add_powerup(self, powerup_type, duration):
+        """Add a power-up effect"""
+        self.effects.add_effect(powerup_type, duration)
+
+    def has_powerup(self, powerup_type):
+        """Check if player has an active power-up"""
+        return self.effects.has_effect(powerup_type)
+
+    # View hooks: a body alone shows nothing (Player draws particles and animates)
+    def add_jump_particles(self):
+        pass
+
+    def add_landing_particles(self):
+        pass
+
+    def add_bounce_particles(self):
+        pass
+
+    def update_view(self, dt):
+        pass
+
+class PlatformBody:
+    """A platform as the simulation sees it: a rect, plus its type's state in the subclasses
+
+    Platform (platforms.py) is a body with a sprite image on top; headless
+    simulations use the bodies alone, in a PlatformBodies.
+    """
+    __slots__ = ("rect", "platform_group")
+    animated = False  # Changes every frame, so its group always updates it
+    state_fields = ()  # Attributes that change as it plays, kept by snapshot() (none: it never changes)
+
+    def __init__(self, x, y, width, height):
+        self.rect = pygame.Rect(x, y, width, height)
+        self.platform_group = None  # The PlatformGroup or PlatformBodies it is in (its timers are the world's)
+
+    def update(self, dt=0):
+        """Update platform (override in subclasses for dynamic behavior)"""
+        pass
+
+    def wake(self):
+        """Have its group update it every frame until it sleeps"""
+        if self.platform_group is not None:
+            self.platform_group.awake[self] = None
+
+    def sleep(self):
+        if self.platform_group is not None:
+            self.platform_group.awake.pop(self, None)
+
+    def after(self, delay, callback, *args):
+        """Schedule callback on the world's timers (None outside a group, where nothing runs)"""
+        if self.platform_group is None:
+            return None
+        return self.platform_group.timers.after(delay, callback, *args)
+
+    def snapshot(self):
+        """Its position and state_fields, for restore()"""
+        return (self.rect.topleft, tuple([getattr(self, name) for name in self.state_fields]))
+
+    def restore(self, state):
+        self.rect.topleft, values = state
+        for name, value in zip(self.state_fields, values):
+            setattr(self, name, value)
+
+class MovingPlatformBody(PlatformBody):
+    """Horizontal moving platform that carries the player"""
+    __slots__ = ("start_x", "end_x", "speed", "direction", "last_x")
+    animated = True
+    state_fields = ("direction", "last_x")
+
+    def __init__(self, start_x, y, width, height, end_x, speed=30):
+        PlatformBody.__init__(self, start_x, y, width, height)
+        self.start_x = start_x
+        self.end_x = end_x
+        self.speed = speed  # pixels per second
+        self.direction = 1  # 1 for right, -1 for left
+        self.last_x = self.rect.x  # For calculating player movement
+
+    def update(self, dt):
+        """Update platform movement"""
+        self.last_x = self.rect.x
+
+        # Move platform
+        self.rect.x += self.direction * self.speed * dt
+
+        # Check bounds and reverse direction
+        if self.direction > 0 and self.rect.x >= self.end_x:
+            self.rect.x = self.end_x
+            self.direction = -1
+        elif self.direction < 0 and self.rect.x <= self.start_x:
+            self.rect.x = self.start_x
+            self.direction = 1
+
+    def get_movement_delta(self):
+        """Get how much the platform moved this frame"""
+        return self.rect.x - self.last_x
+
+class DisappearingPlatformBody(PlatformBody):
+    """Platform that disappears after being stepped on"""
+    __slots__ = ("disappear_time", "fade_time", "activated", "fading", "timer", "is_solid")
+    state_fields = ("activated", "fading", "timer", "is_solid")
+
+    def __init__(self, x, y, width, height, disappear_time=3.0):
+        PlatformBody.__init__(self, x, y, width, height)
+        self.disappear_time = disappear_time  # Time before disappearing
+        self.fade_time = 1.0  # Time to fade out
+        self.activated = False
+        self.fading = False
+        self.timer = 0.0
+        self.is_solid = True  # Whether player can land on it
+
+    def activate(self):
+        """Start the disappearing countdown: it flashes, fades, then disappears"""
+        if not self.activated:
+            self.activated = True
+            self.timer = 0.0
+            self.wake()
+            self.after(self.disappear_time - self.fade_time, self.start_fading)
+            self.after(self.disappear_time, self.disappear)
+
+    def start_fading(self):
+        self.fading = True
+
+    def disappear(self):
+        """Platform is now non-solid, and never needs updating again"""
+        self.is_solid = False
+        self.sleep()
+
+    def update(self, dt):
+        """Count down (only while the countdown runs)"""
+        if self.activated and self.is_solid:
+            self.timer += dt
+
+class VerticalMovingPlatformBody(PlatformBody):
+    """Vertical moving platform (elevator-style)"""
+    __slots__ = ("start_y", "end_y", "speed", "direction", "wait_time", "is_waiting", "last_y")
+    animated = True
+    state_fields = ("direction", "is_waiting", "last_y")
+
+    def __init__(self, x, start_y, width, height, end_y, speed=40, wait_time=2.0):
+        PlatformBody.__init__(self, x, start_y, width, height)
+        self.start_y = start_y
+        self.end_y = end_y
+        self.speed = speed  # pixels per second
+        self.direction = 1 if end_y > start_y else -1  # 1 for down, -1 for up
+        self.wait_time = wait_time  # Time to wait at each end
+        self.is_waiting = False  # Until the timer set on reaching an end fires
+        self.last_y = self.rect.y
+
+    def update(self, dt):
+        """Update vertical platform movement"""
+        self.last_y = self.rect.y
+
+        if not self.is_waiting:
+            # Move platform
+            self.rect.y += self.direction * self.speed * dt
+
+            # Check bounds and start waiting
+            if self.direction > 0 and self.rect.y >= self.end_y:  # Moving down, hit bottom
+                self.rect.y = self.end_y
+                self.start_waiting()
+            elif self.direction < 0 and self.rect.y <= self.start_y:  # Moving up, hit top
+                self.rect.y = self.start_y
+                self.start_waiting()
+
+    def start_waiting(self):
+        self.is_waiting = True
+        self.after(self.wait_time, self.stop_waiting)
+
+    def stop_waiting(self):
+        self.is_waiting = False
+        self.direction *= -1  # Reverse direction
+
+    def get_movement_delta_y(self):
+        """Get how much the platform moved vertically this frame"""
+        return self.rect.y - self.last_y
+
+class RotatingPlatformBody(PlatformBody):
+    """Small circular platform that rotates slowly (x, y is its centre)"""
+    __slots__ = ("radius", "rotation_speed", "angle", "center_x", "center_y")
+    animated = True
+    state_fields = ("angle",)
+
+    def __init__(self, x, y, radius=30, rotation_speed=45):
+        # A square around the circle
+        size = radius * 2 + 10
+        PlatformBody.__init__(self, x - size//2, y - size//2, size, size)
+        self.radius = radius
+        self.rotation_speed = rotation_speed  # degrees per second
+        self.angle = 0.0
+        self.center_x = x
+        self.center_y = y
+
+    def update(self, dt):
+        """Update rotation"""
+        self.angle += self.rotation_speed * dt
+        if self.angle >= 360:
+            self.angle -= 360
+
+class OneWayPlatformBody(PlatformBody):
+    """Platform you can jump through from below but land on from above"""
+    __slots__ = ()
+    one_way = True  # Flag for special collision handling
+
+class BouncyPlatformBody(PlatformBody):
+    """Platform that gives extra jump height when landed on"""
+    __slots__ = ("bounce_strength",)
+
+    def __init__(self, x, y, width, height, bounce_strength=1.5):
+        PlatformBody.__init__(self, x, y, width, height)
+        self.bounce_strength = bounce_strength  # Multiplier for jump height
+
+    def trigger_bounce(self):
+        pass  # Only its view bobs
+
+class IcePlatformBody(PlatformBody):
+    """Slippery platform with reduced friction"""
+    __slots__ = ("ice_friction",)
+
+    def __init__(self, x, y, width, height):
+        PlatformBody.__init__(self, x, y, width, height)
+        self.ice_friction = 0.02  # Much lower friction than normal
+
+class TeleporterElevatorBody(VerticalMovingPlatformBody):
+    """Elevator that carries its rider along with it, even off the top"""
+    __slots__ = ("rider",)
+    state_fields = ("direction", "is_waiting", "last_y", "rider")
+
+    def __init__(self, x, start_y, width, height, end_y, speed=40, wait_time=2.0):
+        VerticalMovingPlatformBody.__init__(self, x, start_y, width, height, end_y, speed, wait_time)
+        self.rider = None  # Will store reference to player on platform
+
+    def update(self, dt):
+        """Update teleporter elevator movement"""
+        self.last_y = self.rect.y
+
+        if not self.is_waiting:
+            # Move platform
+            old_y = self.rect.y
+            self.rect.y += self.direction * self.speed * dt
+            movement_delta = self.rect.y - old_y
+
+            # Move any rider along with the platform (TELEPORTER STYLE!)
+            if self.rider:
+                self.rider.rect.y += movement_delta
+
+            # Check bounds and start waiting
+            if self.direction > 0 and self.rect.y >= self.end_y:  # Moving down, hit bottom
+                self.rect.y = self.end_y
+                if self.rider:
+                    self.rider.rect.y += (self.end_y - old_y - movement_delta)  # Adjust rider position
+                self.start_waiting()
+            elif self.direction < 0 and self.rect.y <= self.start_y:  # Moving up, hit top
+                self.rect.y = self.start_y
+                if self.rider:
+                    self.rider.rect.y += (self.start_y - old_y - movement_delta)  # Adjust rider position
+                self.start_waiting()
+
+    def set_rider(self, player):
+        """Set the player as riding this elevator"""
+        self.rider = player
+
+    def remove_rider(self):
+        """Remove the player from riding this elevator"""
+        self.rider = None
+
+class AwakePlatforms:
+    """A set of platforms that only updates the ones that change
+
+    Animated platforms (moving, rotating, elevators, the ground) are updated
+    every frame. The rest sleep, costing nothing, until something wakes them: a
+    disappearing platform stepped on or a bouncy one bounced on. Their phases
+    then run on `timers`, the world's Scheduler, and they go back to sleep when
+    they are done. Shared by PlatformGroup (sprites) and PlatformBodies (headless).
+    """
+    def track(self, platform):
+        platform.platform_group = self
+        if platform.animated:
+            self.awake[platform] = None
+
+    def untrack(self, platform):
+        self.awake.pop(platform, None)
+        if platform.platform_group is self:
+            platform.platform_group = None
+
+    def update(self, dt):
+        """Update the awake platforms, and let a teleporter's rider go once they're off it"""
+        for platform in list(self.awake):
+            platform.update(dt)
+            rider = getattr(platform, 'rider', None)
+            if rider is not None and not rider.rect.colliderect(platform.rect):
+                platform.remove_rider()
+
+    def snapshot(self):
+        """Every changing platform's state and which ones are awake, for restore()"""
+        return ([(platform, platform.snapshot()) for platform in self if platform.state_fields], list(self.awake))
+
+    def restore(self, state):
+        platforms, awake = state
+        for platform, platform_state in platforms:
+            platform.restore(platform_state)
+        self.awake = dict.fromkeys(awake)
+
+class PlatformBodies(AwakePlatforms):
+    """Platform bodies without sprites, for simulating a level with no display (see level_format.build_level_bodies)"""
+    def __init__(self, bodies=()):
+        self.timers = Scheduler()  # Replaced by the world's own
+        self.awake = {}  # Platforms to update every frame (a dict used as an ordered set)
+        self.bodies = []
+        self.add(*bodies)
+
+    def __iter__(self):
+        return iter(self.bodies)
+
+    def __len__(self):
+        return len(self.bodies)
+
+    def sprites(self):
+        """Every body, as a list (named like a sprite group's, for code that takes either)"""
+        return list(self.bodies)
+
+    def add(self, *bodies):
+        for body in bodies:
+            self.bodies.append(body)
+            self.track(body)
+
+    def remove(self, body):
+        self.bodies.remove(body)
+        self.untrack(body)
@@ -0,0 +1,82 @@
+import collections
+import pygame
+import game_log
+
+# Colors tried, in order, for the transparent pixels of colorkey surfaces (one the image doesn't use)
+COLORKEY_CANDIDATES = [(255, 0, 255), (0, 255, 255), (1, 254, 3)]
+
+def transparency(surface):
+    """"opaque", "binary" (every pixel fully opaque or fully clear) or "alpha" (some in between)"""
+    width, height = surface.get_size()
+    if surface.get_flags() & pygame.SRCALPHA:
+        opaque = pygame.mask.from_surface(surface, 254).count()
+        if opaque == width * height:
+            return "opaque"
+        if opaque == pygame.mask.from_surface(surface, 0).count():
+            return "binary"
+        return "alpha"
+    return "binary" if surface.get_colorkey() is not None else "opaque"
+
+def in_display_format(surface):
+    display = pygame.display.get_surface()
+    return (display is not None and surface.get_bitsize() == display.get_bitsize()
+            and surface.get_masks()[:3] == display.get_masks()[:3])
+
+def colorkey_copy(surface, opaque_count):
+    """Copy of a binary-transparency surface in the display format with a colorkey; None if every key is used"""
+    for key in COLORKEY_CANDIDATES:
+        flat = pygame.Surface(surface.get_size()).convert()
+        flat.fill(key)
+        flat.blit(surface, (0, 0))
+        flat.set_colorkey(key, pygame.RLEACCEL)
+        # Opaque pixels that happen to be the key color would turn clear
+        if pygame.mask.from_surface(flat).count() == opaque_count:
+            return flat
+    return None
+
+def normalize(surface):
+    """The surface in the fastest format that looks the same, and which kind it is
+
+    Opaque surfaces (including per-pixel-alpha ones whose pixels are all opaque)
+    become plain display-format surfaces, ones whose pixels are either opaque or
+    clear get a colorkey with RLE acceleration, and only real translucency keeps
+    per-pixel alpha. Without a display the surface is returned unchanged.
+    """
+    if pygame.display.get_surface() is None:
+        return surface, transparency(surface)
+    kind = transparency(surface)
+    if kind == "opaque":
+        if surface.get_flags() & pygame.SRCALPHA or not in_display_format(surface):
+            surface = surface.convert()
+    elif kind == "binary":
+        if surface.get_flags() & pygame.SRCALPHA:
+            flat = colorkey_copy(surface, pygame.mask.from_surface(surface, 254).count())
+            if flat is not None:
+                return flat, kind
+            kind = "alpha"
+        else:
+            surface = surface.convert()
+            surface.set_colorkey(surface.get_colorkey(), pygame.RLEACCEL)
+    if kind == "alpha" and not in_display_format(surface):
+        surface = surface.convert_alpha()
+    return surface, kind
+
+def normalize_sprites(sprites, where="level"):
+    """Normalize each sprite's image in place and log which sprites still need per-pixel alpha
+
+    Returns a Counter of (sprite class name, kind).
+    """
+    kinds = collections.Counter()
+    for sprite in sprites:
+        sprite.image, kind = normalize(sprite.image)
+        kinds[(type(sprite).__name__, kind)] += 1
+
+    if kinds:
+        fast = sum(count for (_, kind), count in kinds.items() if kind != "alpha")
+        slow = [f"{name} x{count}" for (name, kind), count in sorted(kinds.items()) if kind == "alpha"]
+        message = f"🎨 {where}: {fast}/{sum(kinds.values())} sprites on the fast blit path"
+        if slow:
+            game_log.info("surfaces", f"{message}; per-pixel alpha: {', '.join(slow)}")
+        else:
+            game_log.debug("surfaces", message)
+    return kinds
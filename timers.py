@@ -0,0 +1,64 @@
+import heapq
+import itertools
+
+class Scheduler:
+    """Callbacks due at set times on one world's simulation clock, kept in a heap
+
+    Each world (the game, the tutorial, the AI demo) has one and advances it once
+    per frame with the frame's dt. after() returns the event, which cancel() and
+    time_left() take. Only events that have come due are looked at, so something
+    waiting on a timer costs nothing per frame until it fires. Events due at the
+    same time fire in the order they were scheduled.
+    """
+    def __init__(self):
+        self.now = 0.0  # Seconds of simulation so far
+        self.events = []  # Heap of [due time, order scheduled, callback, args]; callback is None once cancelled or fired
+        self.order = itertools.count()
+
+    def __len__(self):
+        return len(self.events)
+
+    def after(self, delay, callback, *args):
+        """Call callback(*args) once delay seconds have passed"""
+        event = [self.now + delay, next(self.order), callback, args]
+        heapq.heappush(self.events, event)
+        return event
+
+    def cancel(self, event):
+        """Stop an event from firing (events that already fired, and None, are ignored)"""
+        if event is not None:
+            event[2] = None
+
+    def pending(self, event):
+        return event is not None and event[2] is not None
+
+    def time_left(self, event):
+        """Seconds until an event fires (0 once it has)"""
+        return max(0.0, event[0] - self.now) if self.pending(event) else 0.0
+
+    def snapshot(self):
+        """The clock and every waiting event, for restore()"""
+        return (self.now, [(event, tuple(event)) for event in self.events])
+
+    def restore(self, state):
+        """Put the clock and its events back as they were at snapshot()
+
+        Events come back as the same lists, so whoever kept one from after() (and
+        is restored along with the clock) can still cancel it. Events scheduled
+        since are dropped.
+        """
+        self.now, events = state
+        for event, fields in events:
+            event[:] = fields
+        self.events = [event for event, _ in events]  # Still in heap order
+
+    def advance(self, dt):
+        """Move the clock on and fire every event that has come due, earliest first"""
+        self.now += dt
+        events = self.events
+        while events and events[0][0] <= self.now:
+            event = heapq.heappop(events)
+            callback, args = event[2], event[3]
+            if callback is not None:
+                event[2] = None
+                callback(*args)
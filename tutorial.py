@@ -2,35 +2,50 @@ import pygame
 import math
 from settings import *
 from player import Player
-from platforms import (Platform, Ground, MovingPlatform, DisappearingPlatform, 
-                      VerticalMovingPlatform, RotatingPlatform, OneWayPlatform, 
-                      BouncyPlatform, IcePlatform, TeleporterElevator)
-from powerups import PowerUp
+from level_format import load_level, build_level
+from render_queue import RenderQueue
+from enemy_manager import EnemyManager
+from platforms import PlatformGroup
+from timers import Scheduler
+from assets import backgrounds
 
 class TutorialLevel:
+    level_id = "tutorial"  # Level identity for session recordings
+    
     def __init__(self, screen, character_config):
         self.screen = screen
         self.character_config = character_config
-        self.theme = THEMES[character_config['theme']]
+        self.theme_key = character_config['theme']
+        self.theme = THEMES[self.theme_key]
         
         # Tutorial state
         self.current_section = 0
         self.sections_completed = [False] * 11  # Track completion of each section
         self.tutorial_complete = False
         
-        # Create sprite groups
+        # Create sprite groups, with every timer in the tutorial on one clock
+        self.timers = Scheduler()
         self.all_sprites = pygame.sprite.Group()
-        self.platforms = pygame.sprite.Group()
+        self.platforms = PlatformGroup()
+        self.platforms.timers = self.timers
         self.powerups = pygame.sprite.Group()
+        self.enemies = EnemyManager()
+        self.enemies.timers = self.timers
         
         # Create tutorial world
         self.create_tutorial_world()
         
         # Create player
-        self.player = Player(100, WORLD_HEIGHT - 200, character_config)
+        start_x, start_y = self.level.spawn
+        self.player = Player(start_x, start_y, character_config, self.timers)
+        self.player.world_width = self.world_width
         self.all_sprites.add(self.player)
+        self.render_queue = RenderQueue(self.screen)
         
         # UI elements
+        self.ui_bg = pygame.Surface((SCREEN_WIDTH, 150)).convert()  # Semi-transparent panel behind the text
+        self.ui_bg.fill(BLACK)
+        self.ui_bg.set_alpha(150)
         self.font_large = pygame.font.Font(None, 36)
         self.font_medium = pygame.font.Font(None, 28)
         self.font_small = pygame.font.Font(None, 22)
@@ -96,133 +111,14 @@ class TutorialLevel:
     
     def create_tutorial_world(self):
         """Create a guided tutorial world with each mechanic introduced separately"""
-        theme = self.theme
-        
-        # Ground platform
-        ground = Ground(0, WORLD_HEIGHT - 50, WORLD_WIDTH, theme)
-        self.platforms.add(ground)
-        self.all_sprites.add(ground)
-        
-        # Section 0-1: Basic platforms for movement practice - MUCH EASIER JUMPS
-        basic_platforms = [
-            (50, WORLD_HEIGHT - 150, 200, 25),    # Starting platform
-            (280, WORLD_HEIGHT - 180, 150, 25),   # Very close jump
-            (450, WORLD_HEIGHT - 210, 120, 25),   # Very close jump
-        ]
-        
-        for x, y, width, height in basic_platforms:
-            platform = Platform(x, y, width, height, theme)
-            self.platforms.add(platform)
-            self.all_sprites.add(platform)
-        
-        # Section 2: Moving platform introduction - MUCH FASTER & EASIER REACH
-        moving_platform = MovingPlatform(600, WORLD_HEIGHT - 250, 140, 25, 900, 60, theme)  # Faster speed, bigger platform, easier reach
-        self.platforms.add(moving_platform)
-        self.all_sprites.add(moving_platform)
-        
-        # Landing platform after moving platform - VERY CLOSE
-        platform = Platform(950, WORLD_HEIGHT - 280, 160, 25, theme)  # Much closer and bigger
-        self.platforms.add(platform)
-        self.all_sprites.add(platform)
-        
-        # Section 3: Bouncy platform demonstration - CLOSER & EASIER
-        bouncy_platform = BouncyPlatform(1130, WORLD_HEIGHT - 320, 120, 25, 1.8, theme)  # Much closer, bigger
-        self.platforms.add(bouncy_platform)
-        self.all_sprites.add(bouncy_platform)
-        
-        # High platform to reach with bouncy - MUCH EASIER HEIGHT
-        platform = Platform(1300, WORLD_HEIGHT - 420, 140, 25, theme)  # Much closer, lower height
-        self.platforms.add(platform)
-        self.all_sprites.add(platform)
-        
-        # Section 4: One-way platform - EASIER POSITIONING + SUPPORTING PLATFORMS
-        # First, add a platform to get TO the one-way area
-        platform = Platform(1480, WORLD_HEIGHT - 450, 100, 25, theme)  # Lead-up platform
-        self.platforms.add(platform)
-        self.all_sprites.add(platform)
-        
-        # The one-way platform itself
-        oneway_platform = OneWayPlatform(1600, WORLD_HEIGHT - 480, 120, 20, theme)  # Easier positioning
-        self.platforms.add(oneway_platform)
-        self.all_sprites.add(oneway_platform)
-        
-        # Platform above for demonstration - EASIER
-        platform = Platform(1550, WORLD_HEIGHT - 550, 120, 25, theme)  # Above, easier reach
-        self.platforms.add(platform)
-        self.all_sprites.add(platform)
-        
-        # CRITICAL: Platform BELOW the one-way for demonstration (was missing!)
-        platform = Platform(1620, WORLD_HEIGHT - 400, 100, 25, theme)  # Below the one-way
-        self.platforms.add(platform)
-        self.all_sprites.add(platform)
-        
-        # EASIER ACCESS: Add ramp/steps to get under the yellow platform
-        platform = Platform(1500, WORLD_HEIGHT - 350, 80, 25, theme)   # Step 1 to get under
-        self.platforms.add(platform)
-        self.all_sprites.add(platform)
-        platform = Platform(1420, WORLD_HEIGHT - 300, 80, 25, theme)   # Step 2 to get under  
-        self.platforms.add(platform)
-        self.all_sprites.add(platform)
+        # One short section per mechanic, laid out left to right (levels/tutorial.json)
+        self.level = load_level(self.level_id)
         
-        # Continue path after one-way
-        platform = Platform(1750, WORLD_HEIGHT - 520, 120, 25, theme)  # Continue
-        self.platforms.add(platform)
-        self.all_sprites.add(platform)
+        # Level bounds: the tutorial runs past the default world width (last platform ends at x=3650)
+        self.world_width = self.level.world_width
+        self.world_height = self.level.world_height
         
-        # Section 5: Rotating platform - NEW SECTION
-        rotating_platform = RotatingPlatform(1950, WORLD_HEIGHT - 560, 35, 60, theme)  # Higher rotation speed: 60 degrees/sec
-        self.platforms.add(rotating_platform)
-        self.all_sprites.add(rotating_platform)
-        
-        # Platform to land on after rotating platform
-        platform = Platform(2100, WORLD_HEIGHT - 590, 120, 25, theme)
-        self.platforms.add(platform)
-        self.all_sprites.add(platform)
-        
-        # Section 6: Disappearing platform - MUCH EASIER (moved to section 6)
-        disappearing_platform = DisappearingPlatform(2250, WORLD_HEIGHT - 630, 120, 25, theme, 8.0)  # Longer time, bigger platform
-        self.platforms.add(disappearing_platform)
-        self.all_sprites.add(disappearing_platform)
-        
-        # Safe platform to land on - MUCH CLOSER
-        platform = Platform(2400, WORLD_HEIGHT - 670, 140, 25, theme)  # Much closer and bigger
-        self.platforms.add(platform)
-        self.all_sprites.add(platform)
-        
-        # Section 7: Teleporter elevator - EASIER REACH (moved to section 7)
-        teleporter = TeleporterElevator(2570, WORLD_HEIGHT - 720, 120, 25, WORLD_HEIGHT - 870, 40, 2.0, theme)  # Bigger platform
-        self.platforms.add(teleporter)
-        self.all_sprites.add(teleporter)
-        
-        # Platform at elevator top - MUCH EASIER
-        platform = Platform(2520, WORLD_HEIGHT - 920, 160, 25, theme)  # Bigger, easier positioning
-        self.platforms.add(platform)
-        self.all_sprites.add(platform)
-        
-        # Section 8: Ice platform - EASIER REACH AND EXIT (moved to section 8)
-        ice_platform = IcePlatform(2750, WORLD_HEIGHT - 960, 160, 25, theme)  # Bigger, easier reach
-        self.platforms.add(ice_platform)
-        self.all_sprites.add(ice_platform)
-        
-        # CRITICAL: Make jump after ice MUCH easier
-        platform = Platform(2950, WORLD_HEIGHT - 990, 140, 25, theme)  # Much closer and slightly higher for easier jump
-        self.platforms.add(platform)
-        self.all_sprites.add(platform)
-        
-        # Section 9: Power-up demonstration - EASIER REACH (moved to section 9)
-        jump_boost = PowerUp(3130, WORLD_HEIGHT - 1020, "jump_boost", theme)  # Much closer
-        self.powerups.add(jump_boost)
-        self.all_sprites.add(jump_boost)
-        
-        # High platform to reach with power-up - EASIER
-        platform = Platform(3250, WORLD_HEIGHT - 1120, 140, 25, theme)  # Much closer, not as high
-        self.platforms.add(platform)
-        self.all_sprites.add(platform)
-        
-        # Final platform - EASIER REACH
-        platform = Platform(3430, WORLD_HEIGHT - 1150, 220, 25, theme)  # Much closer, bigger
-        self.platforms.add(platform)
-        self.all_sprites.add(platform)
+        build_level(self.level, self.theme, self.platforms, self.all_sprites, self.powerups, self.enemies)
     
     def update_tutorial_progress(self):
         """Check if player has reached the next section"""
@@ -236,29 +132,27 @@ class TutorialLevel:
                     self.sections_completed[self.current_section] = True
                     self.current_section += 1
     
-    def update(self, dt):
+    def update(self, dt, controls):
         """Update tutorial logic"""
+        # Fire the timers that came due this frame
+        self.timers.advance(dt)
+        
         # Handle player input
-        keys = pygame.key.get_pressed()
-        self.player.handle_input(keys)
+        self.player.apply_controls(controls)
         
         # Update player
         self.player.update(self.platforms)
         
-        # Update platforms
-        for platform in self.platforms:
-            platform.update(dt)
-            
-            # Special handling for teleporter elevator
-            if hasattr(platform, 'rider') and platform.rider:
-                # Check if rider is still on the platform
-                if not self.player.rect.colliderect(platform.rect):
-                    platform.remove_rider()  # Remove rider if no longer touching
+        # Update the platforms that are moving or mid-effect
+        self.platforms.update(dt)
         
         # Update power-ups
         for powerup in self.powerups:
             powerup.update(dt)
         
+        # Update enemies and their projectiles (which don't hurt the player yet)
+        self.enemies.update(dt, self.platforms, self.player.rect)
+        
         # Check power-up collection
         collected_powerups = pygame.sprite.spritecollide(self.player, self.powerups, False)
         for powerup in collected_powerups:
@@ -279,9 +173,7 @@ class TutorialLevel:
     def draw_tutorial_ui(self):
         """Draw tutorial instructions and progress"""
         # Semi-transparent background for text
-        ui_bg = pygame.Surface((SCREEN_WIDTH, 150), pygame.SRCALPHA)
-        ui_bg.fill((0, 0, 0, 150))
-        self.screen.blit(ui_bg, (0, 0))
+        self.screen.blit(self.ui_bg, (0, 0))
         
         if self.current_section < len(self.sections):
             section = self.sections[self.current_section]
@@ -308,19 +200,19 @@ class TutorialLevel:
         skip_text = self.font_small.render("Press ESC to skip tutorial", True, LIGHT_GRAY)
         self.screen.blit(skip_text, (SCREEN_WIDTH - 200, SCREEN_HEIGHT - 40))
     
-    def draw_background(self):
+    def draw_background(self, camera):
         """Draw themed background"""
-        self.screen.fill(self.theme['bg_color'])
+        backgrounds.renderer(self.theme_key).draw(self.screen, camera)
     
     def draw(self, camera):
         """Draw the tutorial level"""
         # Draw background
-        self.draw_background()
+        self.draw_background(camera)
         
         # Draw all sprites with camera offset
-        for sprite in self.all_sprites:
-            sprite_rect = camera.apply(sprite.rect)
-            self.screen.blit(sprite.image, sprite_rect)
+        self.render_queue.add_sprites(self.all_sprites, camera)
+        self.enemies.projectiles.queue_draw(self.render_queue, camera)
+        self.render_queue.draw()
         
         # Draw tutorial UI on top
         self.draw_tutorial_ui()
@@ -331,4 +223,4 @@ class TutorialLevel:
     
     def should_skip(self, keys_just_pressed):
         """Check if player wants to skip tutorial"""
-        return keys_just_pressed.get(pygame.K_ESCAPE, False) 
\ No newline at end of file
+        return pygame.K_ESCAPE in keys_just_pressed 
\ No newline at end of file
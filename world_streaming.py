@@ -0,0 +1,178 @@
+import queue
+import threading
+import pygame
+from settings import *
+from platforms import Ground
+from level_format import create_platform_sprite, create_powerup_sprite, create_enemy_sprite
+from surfaces import normalize_sprites
+
+# Levels with more platforms than this stream in; smaller ones are built all at once
+EAGER_PLATFORM_LIMIT = 500
+
+# Distances (pixels) around the camera view and the player:
+ACTIVE_MARGIN = 512      # Chunks in here are in the sprite groups (must exceed the widest platform)
+PREFETCH_MARGIN = 1536   # Chunks in here are built ahead of time on the background thread
+RELEASE_MARGIN = 2560    # Chunks outside this are dropped (gap to PREFETCH_MARGIN avoids thrashing)
+
+class ChunkStreamer:
+    """Streams a level's platforms, power-ups and enemies into sprite groups chunk by chunk
+
+    The level (see level_format.Level) buckets objects by the chunk holding their
+    top-left corner and decodes a chunk's platforms on request. A background
+    thread builds the sprites (and their surfaces) for chunks near the
+    camera; a chunk joins the groups only once it is within ACTIVE_MARGIN of the
+    view or the player, so what the simulation sees depends on position alone and
+    recordings replay the same. A chunk that is needed before its build finished is
+    built on the spot (counted in `stalls`). Far chunks are released, so memory
+    stays flat however big the world is. Released chunks are rebuilt fresh, so
+    moving and disappearing platforms reset when they stream back in, and
+    collected power-ups come back.
+    """
+    def __init__(self, level, theme, platforms, all_sprites, powerups=None, enemies=None, threaded=True):
+        self.level = level
+        self.theme = theme
+        self.platforms = platforms
+        self.all_sprites = all_sprites
+        self.powerups = powerups
+        self.enemies = enemies
+        self.chunk_size = level.chunk_size
+        self.world_width = level.world_width
+        self.world_height = level.world_height
+        self.ground_row = level.ground_y // self.chunk_size
+
+        self.active = {}      # key -> sprites in the groups
+        self.ready = {}       # key -> sprites built ahead of time
+        self.pending = set()  # keys queued on the background thread
+        self.stalls = 0       # Chunks that had to be built on the main thread
+
+        self.requests = queue.Queue()
+        self.results = queue.Queue()
+        self.worker = None
+        if threaded:
+            self.worker = threading.Thread(target=self.build_worker, name="chunk-streamer", daemon=True)
+            self.worker.start()
+
+    def build_worker(self):
+        """Background thread: build requested chunks until given None"""
+        while True:
+            key = self.requests.get()
+            if key is None:
+                return
+            self.results.put((key, self.build_chunk(key)))
+
+    def build_chunk(self, key):
+        """Create the sprites for one chunk: (platforms, power-ups, enemies)"""
+        level = self.level
+        platforms = [create_platform_sprite(spec, self.theme) for spec in level.platforms_in_chunk(key)]
+
+        # The deadly ground is split into one segment per chunk column
+        cx, cy = key
+        if cy == self.ground_row:
+            left = cx * self.chunk_size
+            width = min(self.chunk_size, self.world_width - left)
+            if width > 0:
+                platforms.append(Ground(left, level.ground_y, width, self.theme))
+
+        powerups = []
+        if self.powerups is not None:
+            powerups = [create_powerup_sprite(spec, self.theme) for spec in level.powerups_in_chunk(key)]
+        enemies = []
+        if self.enemies is not None:
+            enemies = [create_enemy_sprite(spec, self.theme) for spec in level.enemies_in_chunk(key)]
+        normalize_sprites(platforms + powerups + enemies, f"chunk {key}")
+        return platforms, powerups, enemies
+
+    def has_content(self, key):
+        """Check if a chunk holds anything (most of a big world is empty air)"""
+        return key in self.level.chunk_keys or key[1] == self.ground_row
+
+    def chunks_near(self, rects, margin):
+        """Keys of the non-empty chunks within margin of any of the rects"""
+        size = self.chunk_size
+        max_cx = (self.world_width - 1) // size
+        max_cy = (self.world_height - 1) // size
+        keys = set()
+        for rect in rects:
+            left = max(0, int(rect.left - margin) // size)
+            right = min(max_cx, int(rect.right + margin) // size)
+            top = max(0, int(rect.top - margin) // size)
+            bottom = min(max_cy, int(rect.bottom + margin) // size)
+            for cx in range(left, right + 1):
+                for cy in range(top, bottom + 1):
+                    if self.has_content((cx, cy)):
+                        keys.add((cx, cy))
+        return keys
+
+    def update(self, camera, player_rect):
+        """Activate, prefetch and release chunks around the camera view and the player
+
+        Returns the number of chunks that joined the sprite groups.
+        """
+        focus = (pygame.Rect(int(camera.x), int(camera.y), SCREEN_WIDTH, SCREEN_HEIGHT), player_rect)
+
+        # Collect finished background builds
+        while True:
+            try:
+                key, sprites = self.results.get_nowait()
+            except queue.Empty:
+                break
+            self.pending.discard(key)
+            if key not in self.active:
+                self.ready[key] = sprites
+
+        # Chunks the simulation needs now
+        activated = 0
+        for key in self.chunks_near(focus, ACTIVE_MARGIN):
+            if key not in self.active:
+                activated += 1
+                sprites = self.ready.pop(key, None)
+                if sprites is None:
+                    self.stalls += 1
+                    sprites = self.build_chunk(key)
+                self.activate(key, sprites)
+
+        # Build upcoming chunks in the background
+        for key in self.chunks_near(focus, PREFETCH_MARGIN):
+            if key not in self.active and key not in self.ready and key not in self.pending:
+                if self.worker is None:
+                    self.ready[key] = self.build_chunk(key)
+                else:
+                    self.pending.add(key)
+                    self.requests.put(key)
+
+        # Release far chunks
+        keep = self.chunks_near(focus, RELEASE_MARGIN)
+        for key in [key for key in self.active if key not in keep]:
+            self.deactivate(key)
+        for key in [key for key in self.ready if key not in keep]:
+            del self.ready[key]
+        return activated
+
+    def activate(self, key, sprites):
+        """Add a chunk's sprites to the world"""
+        self.active[key] = sprites
+        platforms, powerups, enemies = sprites
+        self.platforms.add(*platforms)
+        self.all_sprites.add(*platforms)
+        if powerups:
+            self.powerups.add(*powerups)
+            self.all_sprites.add(*powerups)
+        if enemies:
+            self.enemies.add(*enemies)
+            self.all_sprites.add(*enemies)
+
+    def deactivate(self, key):
+        """Take a chunk's sprites out of the world (collected power-ups are already gone)"""
+        platforms, powerups, enemies = self.active.pop(key)
+        self.platforms.remove(*platforms)
+        self.all_sprites.remove(*platforms, *powerups, *enemies)
+        if powerups:
+            self.powerups.remove(*powerups)
+        if enemies:
+            self.enemies.remove(*enemies)
+
+    def close(self):
+        """Stop the background thread"""
+        if self.worker is not None:
+            self.requests.put(None)
+            self.worker = None